@@ -21,7 +21,7 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.db.base_class import Base
-from app.db.models import User, Event, EventPermission, EventVersion, EventChangeLog
+from app.db.models import User, Event, EventPermission, EventVersion, EventChangeLog, OutboxMessage, ImportJob, UserEventAccess, PendingChange, IdempotencyKey, EventStats
 
 target_metadata = Base.metadata
 
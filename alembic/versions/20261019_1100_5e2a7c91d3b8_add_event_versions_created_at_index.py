@@ -0,0 +1,25 @@
+"""Add (event_id, created_at) index to event_versions
+
+Revision ID: 5e2a7c91d3b8
+Revises: 9c4d2e6f1b70
+Create Date: 2026-10-19 11:00:12.480553+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a7c91d3b8'
+down_revision: Union[str, None] = '9c4d2e6f1b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_versions_event_id_created_at', 'event_versions', ['event_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_versions_event_id_created_at', table_name='event_versions')
@@ -0,0 +1,49 @@
+"""Add user_event_access table
+
+Revision ID: a41f6b0e8c27
+Revises: 5e2a7c91d3b8
+Create Date: 2026-10-19 11:30:27.118406+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6b0e8c27'
+down_revision: Union[str, None] = '5e2a7c91d3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_event_access',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('role', postgresql.ENUM('OWNER', 'EDITOR', 'VIEWER', name='userrole', create_type=False), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'event_id')
+    )
+    op.create_index(op.f('ix_user_event_access_event_id'), 'user_event_access', ['event_id'], unique=False)
+    op.create_index('ix_user_event_access_user_start', 'user_event_access', ['user_id', 'start_time', 'event_id'], unique=False)
+    op.execute(
+        "INSERT INTO user_event_access (user_id, event_id, role, start_time) "
+        "SELECT owner_id, id, 'OWNER', start_time FROM events WHERE owner_id IS NOT NULL"
+    )
+    op.execute(
+        "INSERT INTO user_event_access (user_id, event_id, role, start_time) "
+        "SELECT p.user_id, p.event_id, p.role, e.start_time FROM event_permissions p "
+        "JOIN events e ON e.id = p.event_id "
+        "WHERE p.user_id IS NOT NULL AND p.role IS NOT NULL AND p.user_id <> e.owner_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_event_access_user_start', table_name='user_event_access')
+    op.drop_index(op.f('ix_user_event_access_event_id'), table_name='user_event_access')
+    op.drop_table('user_event_access')
@@ -0,0 +1,41 @@
+"""Add pending_changes table
+
+Revision ID: c7d94e2b5a13
+Revises: a41f6b0e8c27
+Create Date: 2026-10-19 12:30:45.207931+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d94e2b5a13'
+down_revision: Union[str, None] = 'a41f6b0e8c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('pending_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=True),
+    sa.Column('version_number', sa.Integer(), nullable=True),
+    sa.Column('changes', sa.JSON(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pending_changes_id'), 'pending_changes', ['id'], unique=False)
+    op.create_index(op.f('ix_pending_changes_event_id'), 'pending_changes', ['event_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pending_changes_event_id'), table_name='pending_changes')
+    op.drop_index(op.f('ix_pending_changes_id'), table_name='pending_changes')
+    op.drop_table('pending_changes')
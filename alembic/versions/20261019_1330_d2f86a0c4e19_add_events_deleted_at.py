@@ -0,0 +1,28 @@
+"""Add events.deleted_at
+
+Revision ID: d2f86a0c4e19
+Revises: c7d94e2b5a13
+Create Date: 2026-10-19 13:30:12.518204+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f86a0c4e19'
+down_revision: Union[str, None] = 'c7d94e2b5a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_events_deleted_at'), 'events', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_events_deleted_at'), table_name='events')
+    op.drop_column('events', 'deleted_at')
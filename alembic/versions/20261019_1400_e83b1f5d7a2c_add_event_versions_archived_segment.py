@@ -0,0 +1,28 @@
+"""Add event_versions.archived_segment
+
+Revision ID: e83b1f5d7a2c
+Revises: d2f86a0c4e19
+Create Date: 2026-10-19 14:00:27.604117+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b1f5d7a2c'
+down_revision: Union[str, None] = 'd2f86a0c4e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('event_versions', sa.Column('archived_segment', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # Archived versions keep their data in the segment files only; restore
+    # them into the table before downgrading.
+    op.drop_column('event_versions', 'archived_segment')
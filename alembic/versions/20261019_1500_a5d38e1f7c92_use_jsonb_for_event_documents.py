@@ -0,0 +1,53 @@
+"""Use JSONB for event documents
+
+Revision ID: a5d38e1f7c92
+Revises: f94c2a6e8b31
+Create Date: 2026-10-19 15:00:41.207356+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d38e1f7c92'
+down_revision: Union[str, None] = 'f94c2a6e8b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOCUMENT_COLUMNS = [
+    ('events', 'recurrence_pattern'),
+    ('event_versions', 'data'),
+    ('event_changelog', 'old_value'),
+    ('event_changelog', 'new_value'),
+]
+RECURRENCE_FREQUENCY = (
+    "lower(coalesce(CAST(recurrence_pattern ->> 'frequency' AS VARCHAR), "
+    "CAST(recurrence_pattern ->> 'freq' AS VARCHAR), CAST(recurrence_pattern ->> 'repeat' AS VARCHAR)))"
+)
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_changelog_event_id_field_name', 'event_changelog', ['event_id', 'field_name'], unique=False)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Rewrites each table; run during a maintenance window on large databases.
+    for table, column in DOCUMENT_COLUMNS:
+        op.alter_column(table, column, type_=postgresql.JSONB(), postgresql_using=f'{column}::jsonb')
+    op.create_index('ix_events_recurrence_frequency', 'events', [sa.text(RECURRENCE_FREQUENCY)], unique=False)
+    op.create_index(
+        'ix_event_changelog_new_value', 'event_changelog', ['new_value'], unique=False,
+        postgresql_using='gin', postgresql_ops={'new_value': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_event_changelog_new_value', table_name='event_changelog')
+        op.drop_index('ix_events_recurrence_frequency', table_name='events')
+        for table, column in DOCUMENT_COLUMNS:
+            op.alter_column(table, column, type_=postgresql.JSON(), postgresql_using=f'{column}::json')
+    op.drop_index('ix_event_changelog_event_id_field_name', table_name='event_changelog')
@@ -0,0 +1,58 @@
+"""Add event_stats table
+
+Revision ID: b16e4f9d2a58
+Revises: a5d38e1f7c92
+Create Date: 2026-10-19 15:30:08.914266+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b16e4f9d2a58'
+down_revision: Union[str, None] = 'a5d38e1f7c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_stats',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('version_count', sa.Integer(), nullable=False),
+    sa.Column('collaborator_count', sa.Integer(), nullable=False),
+    sa.Column('last_modified_by', sa.Integer(), nullable=True),
+    sa.Column('last_modified_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['last_modified_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    # Same rows as `python -m app.cli stats rebuild`.
+    op.execute("""
+        INSERT INTO event_stats (event_id, version_count, collaborator_count, last_modified_by, last_modified_at)
+        SELECT events.id, coalesce(latest.version_count, 0), coalesce(collaborators.collaborator_count, 0),
+               latest.created_by, latest.created_at
+        FROM events
+        LEFT OUTER JOIN (
+            SELECT event_id, created_by, created_at,
+                   count(*) OVER (PARTITION BY event_id) AS version_count,
+                   row_number() OVER (PARTITION BY event_id ORDER BY version_number DESC) AS rank
+            FROM (
+                SELECT event_id, version_number, created_by, created_at FROM event_versions
+                UNION ALL
+                SELECT event_id, version_number, created_by, created_at FROM pending_changes
+            ) AS history
+        ) AS latest ON latest.event_id = events.id AND latest.rank = 1
+        LEFT OUTER JOIN (
+            SELECT event_permissions.event_id, count(*) AS collaborator_count
+            FROM event_permissions JOIN events ON events.id = event_permissions.event_id
+            WHERE event_permissions.user_id != events.owner_id
+            GROUP BY event_permissions.event_id
+        ) AS collaborators ON collaborators.event_id = events.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('event_stats')
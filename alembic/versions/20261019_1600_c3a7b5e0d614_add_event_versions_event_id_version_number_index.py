@@ -0,0 +1,26 @@
+"""Add event_versions (event_id, version_number) index
+
+Revision ID: c3a7b5e0d614
+Revises: b16e4f9d2a58
+Create Date: 2026-10-19 16:00:52.130477+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7b5e0d614'
+down_revision: Union[str, None] = 'b16e4f9d2a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_versions_event_id_version_number', 'event_versions', ['event_id', 'version_number'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_versions_event_id_version_number', table_name='event_versions')
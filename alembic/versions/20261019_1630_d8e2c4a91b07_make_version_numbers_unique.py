@@ -0,0 +1,54 @@
+"""Make version numbers unique per event
+
+Revision ID: d8e2c4a91b07
+Revises: c3a7b5e0d614
+Create Date: 2026-10-19 16:30:17.548203+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2c4a91b07'
+down_revision: Union[str, None] = 'c3a7b5e0d614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent updates of one event could take the same number. Renumber
+    # the versions of affected events in (number, id) order, then number
+    # pending changes after each event's last version.
+    op.execute("""
+        UPDATE event_versions SET version_number = renumbered.n
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY event_id ORDER BY version_number, id) AS n
+            FROM event_versions
+            WHERE event_id IN (
+                SELECT event_id FROM event_versions GROUP BY event_id, version_number HAVING count(*) > 1
+            )
+        ) AS renumbered
+        WHERE event_versions.id = renumbered.id
+    """)
+    op.execute("""
+        UPDATE pending_changes SET version_number = renumbered.n
+        FROM (
+            SELECT pending.id,
+                   coalesce((SELECT max(v.version_number) FROM event_versions v WHERE v.event_id = pending.event_id), 0)
+                   + row_number() OVER (PARTITION BY pending.event_id ORDER BY pending.id) AS n
+            FROM pending_changes AS pending
+        ) AS renumbered
+        WHERE pending_changes.id = renumbered.id
+    """)
+    op.drop_index('ix_event_versions_event_id_version_number', table_name='event_versions')
+    op.create_index('ix_event_versions_event_id_version_number', 'event_versions', ['event_id', 'version_number'], unique=True)
+    op.create_index('ix_pending_changes_event_id_version_number', 'pending_changes', ['event_id', 'version_number'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_changes_event_id_version_number', table_name='pending_changes')
+    op.drop_index('ix_event_versions_event_id_version_number', table_name='event_versions')
+    op.create_index('ix_event_versions_event_id_version_number', 'event_versions', ['event_id', 'version_number'], unique=False)
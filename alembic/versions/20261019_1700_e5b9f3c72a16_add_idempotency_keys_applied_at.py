@@ -0,0 +1,26 @@
+"""Add idempotency_keys.applied_at
+
+Revision ID: e5b9f3c72a16
+Revises: d8e2c4a91b07
+Create Date: 2026-10-19 17:00:41.902375+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9f3c72a16'
+down_revision: Union[str, None] = 'd8e2c4a91b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('applied_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('idempotency_keys', 'applied_at')
@@ -1,27 +1,61 @@
+import secrets
+from functools import lru_cache
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from app.core.config import settings
-from app.core.security import verify_password
+from app.core.config import API_V1_STR, settings
+from app.core import ratelimit
+from app.core.profiling import ProfileStore
+from app.core.security import bearer_subject, verify_password
 from app.db.session import SessionLocal
 from app.db.models import User, Event, EventPermission, UserRole
 from app.schemas.user import TokenPayload
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_V1_STR}/auth/login")
 
 
-def get_db() -> Generator:
+def get_db(request: Request) -> Generator:
     try:
         db = SessionLocal()
+        db.info["read_only"] = request.method in ("GET", "HEAD")
+        # Known before the first query, which picks the session's replica.
+        subject = bearer_subject(request.headers.get("authorization", ""))
+        db.info["user_id"] = int(subject) if subject is not None and subject.isdigit() else None
+        claim = getattr(request.state, "idempotency_claim", None)
+        if claim is not None:
+            db.info["idempotency_claim"] = claim
         yield db
     finally:
         db.close()
 
 
+def rate_limit(request: Request) -> None:
+    """
+    Router-level dependency, so it runs before the endpoint's own dependencies:
+    a rejected request never opens a session or hashes a password. Clients
+    with a valid token are limited per user, everyone else per address.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return
+    subject = bearer_subject(request.headers.get("authorization", ""))
+    if subject is not None:
+        identity = f"user:{subject}"
+    else:
+        identity = f"ip:{request.client.host if request.client else 'unknown'}"
+    retry_after = ratelimit.check(route.name, identity)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
@@ -38,6 +72,7 @@ def get_current_user(
     user = db.query(User).filter(User.id == token_data.sub).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    db.info["user_id"] = user.id
     return user
 
 
@@ -55,7 +90,7 @@ def check_event_permission(
     user_id: int,
     required_role: UserRole = UserRole.VIEWER,
 ) -> bool:
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = db.query(Event.owner_id).filter(Event.id == event_id, Event.deleted_at.is_(None)).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
@@ -97,7 +132,22 @@ def get_event_with_permission(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = db.query(Event).filter(Event.id == event_id, Event.deleted_at.is_(None)).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event 
\ No newline at end of file
+    return event 
+
+
+@lru_cache()
+def get_profile_store() -> ProfileStore:
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_ENTRIES)
+
+
+def verify_profiling_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    if not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not x_profile_token or not secrets.compare_digest(x_profile_token, settings.PROFILING_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid profiling token",
+        )
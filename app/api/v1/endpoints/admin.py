@@ -0,0 +1,26 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import get_profile_store, verify_profiling_token
+from app.core.profiling import ProfileStore
+
+router = APIRouter(dependencies=[Depends(verify_profiling_token)])
+
+
+@router.get("/profiles", response_model=List[Dict[str, Any]])
+def list_profiles(store: ProfileStore = Depends(get_profile_store)) -> Any:
+    """
+    List captured request profiles, newest first.
+    """
+    return store.list()
+
+
+@router.get("/profiles/{profile_id}", response_model=Dict[str, Any])
+def get_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)) -> Any:
+    """
+    Get a captured profile with its cumulative-time report.
+    """
+    profile = store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
@@ -4,13 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, rate_limit
 from app.core.config import settings
+from app.core.profiling import ProfilingRoute
 from app.core.security import create_access_token, get_password_hash, verify_password
 from app.db.models import User
 from app.schemas.user import User as UserSchema, UserCreate, Token
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute, dependencies=[Depends(rate_limit)])
 
 
 @router.post("/register", response_model=UserSchema)
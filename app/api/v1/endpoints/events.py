@@ -1,7 +1,14 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, case, func, or_, select
 from fastapi.encoders import jsonable_encoder
 
 from app.api.deps import (
@@ -9,21 +16,109 @@ from app.api.deps import (
     get_current_active_user,
     get_event_with_permission,
     check_event_permission,
+    rate_limit,
 )
-from app.db.models import User, Event, EventPermission, EventVersion, EventChangeLog, UserRole
+from app.core import access, archive, purge, stats, versioning
+from app.core.config import settings
+from app.core.ical import iter_calendar
+from app.core.idempotency import IdempotentRoute
+from app.core.importer import detect_format, run_import
+from app.core.pubsub import event_channel, get_broker, iter_messages
+from app.core.recurrence import FREQUENCIES
+from app.core.scheduling import find_free_slots
+from app.core.versioning import changelog_message
+from app.db.documents import json_matches, recurrence_frequency
+from app.db.models import User, Event, EventPermission, EventStats, EventVersion, EventChangeLog, ImportJob, OutboxMessage, UserEventAccess, UserRole
+from app.db.session import SessionLocal
 from app.schemas.event import (
     Event as EventSchema,
+    EventBatchItem,
+    FreeSlot,
+    FreeSlotQuery,
     EventCreate,
     EventUpdate,
     EventPermission as EventPermissionSchema,
     EventPermissionCreate,
     EventPermissionUpdate,
     EventVersion as EventVersionSchema,
+    EventHistoryPage,
+    EventVersionSummary,
     EventChangeLog as EventChangeLogSchema,
     EventDiff,
+    EventSummary,
+    ImportJob as ImportJobSchema,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute, dependencies=[Depends(rate_limit)])
+
+MAX_BATCH_IDS = 100
+MAX_HISTORY_PAGE = 500
+# Busy time is fetched and merged per request, at a few microseconds per
+# event: a month of 50 full calendars stays well under 100 ms, a year does
+# not. Longer ranges are searched one window at a time.
+MAX_FREE_SLOT_WINDOW = timedelta(days=31)
+
+
+def enqueue_event_message(db: Session, event_id: int, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage a change message in the outbox; it commits with the change itself."""
+    payload = jsonable_encoder({"event_id": event_id, **message})
+    db.add(OutboxMessage(event_id=event_id, topic=message["type"], payload=payload))
+    return payload
+
+
+def publish_event_message(event_id: int, message: Dict[str, Any]) -> None:
+    get_broker().publish(event_channel(event_id), jsonable_encoder({"event_id": event_id, **message}))
+
+
+def accessible_events_condition(user_id: int):
+    return and_(Event.deleted_at.is_(None), Event.id.in_(access.accessible_event_ids(user_id)))
+
+
+# Served from event_stats rather than the events table.
+STATS_FIELDS = ("version_count", "collaborator_count", "last_modified_by", "last_modified_at")
+EVENT_FIELDS = (
+    "id", "title", "description", "start_time", "end_time", "location", "is_recurring",
+    "recurrence_pattern", "owner_id", "created_at", "updated_at", "version_number",
+) + STATS_FIELDS
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated ``fields`` parameter; ``id`` is always included."""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EVENT_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(EVENT_FIELDS)}",
+        )
+    return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+
+
+def sparse_query(db: Session, names: List[str]):
+    columns = [getattr(Event, name) for name in names if name != "version_number" and name not in STATS_FIELDS]
+    return db.query(Event).options(load_only(*columns))
+
+
+def sparse_events(db: Session, events: List[Event], names: List[str]) -> List[Dict[str, Any]]:
+    summaries = stats.summaries(db, [event.id for event in events]) if set(names) & set(STATS_FIELDS) else {}
+    rows = []
+    for event in events:
+        row = {}
+        for name in names:
+            if name == "version_number":
+                row[name] = versioning.current_version_number(db, event.id)
+            elif name in STATS_FIELDS:
+                row[name] = getattr(summaries.get(event.id), name, None)
+            else:
+                row[name] = getattr(event, name)
+        rows.append(row)
+    return rows
+
+
+def permission_message(action: str, permission: EventPermission) -> Dict[str, Any]:
+    return {"type": "permission", "action": action, "user_id": permission.user_id, "role": permission.role}
 
 
 @router.post("", response_model=EventSchema)
@@ -35,6 +130,7 @@ def create_event(*, db: Session = Depends(get_db), event_in: EventCreate, curren
                 and_(Event.start_time < event_in.end_time, Event.end_time >= event_in.end_time),
             ),
             Event.owner_id == current_user.id,
+            Event.deleted_at.is_(None),
         )
     ).all()
     if conflicting_events:
@@ -52,46 +148,252 @@ def create_event(*, db: Session = Depends(get_db), event_in: EventCreate, curren
         change_description="Initial version",
     )
     db.add(version)
+    access.grant_owner(db, event)
+    stats.init(db, event.id, current_user.id)
+    db.flush()
+    enqueue_event_message(db, event.id, {"type": "event_created", "version_id": version.id, "data": event_dict})
     db.commit()
     event.version_number = 1
     return event
 
 
 @router.get("", response_model=List[EventSchema])
-def list_events(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user), skip: int = 0, limit: int = 100) -> Any:
+def list_events(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user), skip: int = 0, limit: int = 100, fields: Optional[str] = None, recurrence: Optional[str] = None) -> Any:
+    """
+    List accessible events. ``fields`` (e.g. ``id,title,start_time,end_time``)
+    limits both the response and the columns loaded from the database.
+    ``fields`` may also name the summary fields (``version_count``,
+    ``collaborator_count``, ``last_modified_by``, ``last_modified_at``), which
+    are read from event_stats in one query. ``recurrence`` (daily, weekly,
+    monthly, yearly) keeps only recurring events of that frequency.
+    """
+    names = parse_fields(fields)
+    condition = accessible_events_condition(current_user.id)
+    if recurrence is not None:
+        if recurrence.lower() not in FREQUENCIES:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"recurrence must be one of: {', '.join(FREQUENCIES)}")
+        condition = and_(condition, Event.is_recurring.is_(True), recurrence_frequency(Event.recurrence_pattern) == recurrence.lower())
+    if names is not None:
+        events = (
+            sparse_query(db, names)
+            .filter(condition)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return JSONResponse(jsonable_encoder(sparse_events(db, events, names)))
     events = (
         db.query(Event)
-        .filter(
-            or_(
-                Event.owner_id == current_user.id,
-                Event.id.in_(db.query(EventPermission.event_id).filter(EventPermission.user_id == current_user.id)),
-            )
-        )
+        .filter(condition)
         .offset(skip)
         .limit(limit)
         .all()
     )
     for event in events:
-        latest_version = (
-            db.query(EventVersion)
-            .filter(EventVersion.event_id == event.id)
-            .order_by(EventVersion.version_number.desc())
-            .first()
-        )
-        event.version_number = latest_version.version_number if latest_version else 1
+        event.version_number = versioning.current_version_number(db, event.id)
     return events
 
 
-@router.get("/{event_id}", response_model=EventSchema)
-def get_event(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
-    event = get_event_with_permission(db, event_id, current_user)
-    latest_version = (
+@router.get("/export.ics", response_class=StreamingResponse)
+def export_calendar(*, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user), start: Optional[datetime] = None, end: Optional[datetime] = None) -> Any:
+    """
+    Export every event the user owns or has been shared as an iCalendar file,
+    optionally limited to events overlapping [start, end). Rows are read with a
+    server-side cursor and streamed, so memory use does not grow with the calendar.
+    """
+    if start and end and start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    query = (
+        select(
+            Event.id, Event.title, Event.description, Event.start_time, Event.end_time, Event.location,
+            Event.is_recurring, Event.recurrence_pattern, Event.created_at, Event.updated_at,
+        )
+        .where(accessible_events_condition(current_user.id))
+        .order_by(Event.start_time, Event.id)
+    )
+    if end:
+        query = query.where(Event.start_time < end)
+    if start:
+        # Recurring events may have later occurrences inside the window.
+        query = query.where(or_(Event.end_time > start, Event.is_recurring.is_(True)))
+    rows = db.execute(query.execution_options(yield_per=500))
+    return StreamingResponse(
+        iter_calendar(rows, name=f"{current_user.username} (NeoFi)"),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="calendar.ics"'},
+    )
+
+
+@router.get("/batch", response_model=List[EventBatchItem])
+def get_events_batch(*, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user), ids: str) -> Any:
+    """
+    Fetch up to MAX_BATCH_IDS events by comma-separated id in three queries
+    (events, the caller's roles, current versions). Each id gets a result in
+    request order: found, forbidden or missing.
+    """
+    try:
+        event_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma-separated integers")
+    if not event_ids or len(event_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Request between 1 and {MAX_BATCH_IDS} ids")
+    events = {event.id: event for event in db.query(Event).filter(Event.id.in_(event_ids), Event.deleted_at.is_(None))}
+    roles = dict(
+        db.query(UserEventAccess.event_id, UserEventAccess.role)
+        .filter(UserEventAccess.user_id == current_user.id, UserEventAccess.event_id.in_(list(events)))
+        .all()
+    ) if events else {}
+    versions = versioning.current_version_numbers(db, list(roles)) if roles else {}
+    results = []
+    for event_id in event_ids:
+        event = events.get(event_id)
+        if event is None:
+            results.append(EventBatchItem(id=event_id, status="missing"))
+        elif event_id not in roles:
+            results.append(EventBatchItem(id=event_id, status="forbidden"))
+        else:
+            event.version_number = versions.get(event_id, 1)
+            results.append(EventBatchItem(id=event_id, status="found", role=roles[event_id], event=EventSchema.model_validate(event)))
+    return results
+
+
+@router.post("/free-slots", response_model=List[FreeSlot])
+def find_common_free_slots(*, db: Session = Depends(get_db), query: FreeSlotQuery, current_user: User = Depends(get_current_active_user)) -> Any:
+    """
+    Common free slots of at least ``duration_minutes`` for ``user_ids`` within
+    working hours. Busy time is every event a user owns or has been shared,
+    with recurrences expanded. Only the caller and users who share an event
+    with the caller can be included.
+    """
+    if query.start >= query.end or query.end - query.start > MAX_FREE_SLOT_WINDOW:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"start must be before end and the window at most {MAX_FREE_SLOT_WINDOW.days} days")
+    if query.working_hours_start >= query.working_hours_end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="working_hours_start must be before working_hours_end")
+    try:
+        ZoneInfo(query.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown timezone {query.timezone!r}")
+    user_ids = set(query.user_ids)
+    collaborators = set(db.execute(
+        select(UserEventAccess.user_id)
+        .join(Event, Event.id == UserEventAccess.event_id)
+        .where(
+            UserEventAccess.user_id.in_(user_ids),
+            accessible_events_condition(current_user.id),
+        )
+        .distinct()
+    ).scalars())
+    forbidden = sorted(user_ids - collaborators - {current_user.id})
+    if forbidden:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"No shared events with users {forbidden}")
+    # Driven by the (user_id, start_time) index of user_event_access, as a
+    # subquery: joined instead, SQLite scans events by deleted_at, and an
+    # event shared between several of the users would come back once per user.
+    events = db.execute(
+        select(
+            Event.start_time,
+            Event.end_time,
+            Event.is_recurring,
+            # Only recurring events need their pattern decoded.
+            case((Event.is_recurring.is_(True), Event.recurrence_pattern)).label("recurrence_pattern"),
+        )
+        .where(
+            Event.id.in_(
+                select(UserEventAccess.event_id)
+                .where(UserEventAccess.user_id.in_(user_ids), UserEventAccess.start_time < query.end)
+            ),
+            Event.deleted_at.is_(None),
+            or_(Event.end_time > query.start, Event.is_recurring.is_(True)),
+        )
+    ).all()
+    return find_free_slots(
+        events,
+        query.start,
+        query.end,
+        timedelta(minutes=query.duration_minutes),
+        day_start=query.working_hours_start,
+        day_end=query.working_hours_end,
+        tz=query.timezone,
+        weekdays=query.weekdays,
+        limit=query.limit,
+    )
+
+
+@router.get("/as-of", response_model=List[EventVersionSchema])
+def list_events_as_of(*, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user), at: datetime, skip: int = 0, limit: int = 100) -> Any:
+    """
+    State of every accessible event at ``at``: the latest version of each event
+    created at or before that time, fetched in one query. Access is evaluated
+    as of now, and events that did not exist yet are left out.
+    """
+    if at.tzinfo:
+        at = at.astimezone(timezone.utc)
+    ranked = (
+        select(
+            EventVersion.id,
+            func.row_number().over(
+                partition_by=EventVersion.event_id,
+                order_by=(EventVersion.created_at.desc(), EventVersion.version_number.desc()),
+            ).label("rank"),
+        )
+        .join(Event, Event.id == EventVersion.event_id)
+        .where(EventVersion.created_at <= at, accessible_events_condition(current_user.id))
+        .subquery()
+    )
+    versions = (
         db.query(EventVersion)
-        .filter(EventVersion.event_id == event.id)
-        .order_by(EventVersion.version_number.desc())
-        .first()
+        .join(ranked, ranked.c.id == EventVersion.id)
+        .filter(ranked.c.rank == 1)
+        .order_by(EventVersion.event_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
     )
-    event.version_number = latest_version.version_number if latest_version else 1
+    archive.hydrate(versions)
+    return versions
+
+
+@router.post("/import", response_model=ImportJobSchema, status_code=status.HTTP_202_ACCEPTED)
+def import_events(*, db: Session = Depends(get_db), background_tasks: BackgroundTasks, file: UploadFile = File(...), format: Optional[str] = None, current_user: User = Depends(get_current_active_user)) -> Any:
+    """
+    Import events from an iCalendar (.ics) or CSV file as a background job.
+    Poll GET /events/import/{job_id} for progress and per-row errors.
+    """
+    fmt = format or detect_format(file.filename)
+    if fmt not in ("ics", "csv"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file format, expected .ics or .csv")
+    # The upload is gone once the response is sent, so keep a copy for the job.
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{fmt}") as tmp:
+        shutil.copyfileobj(file.file, tmp)
+    job = ImportJob(owner_id=current_user.id, filename=file.filename, format=fmt, status="pending", errors=[])
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    background_tasks.add_task(
+        run_import, SessionLocal, job.id, tmp.name,
+        batch_size=settings.IMPORT_BATCH_SIZE, max_errors=settings.IMPORT_MAX_ERRORS,
+    )
+    return job
+
+
+@router.get("/import/{job_id}", response_model=ImportJobSchema)
+def get_import_job(*, db: Session = Depends(get_db), job_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
+    job = db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.owner_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return job
+
+
+@router.get("/{event_id}", response_model=EventSchema)
+def get_event(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user), fields: Optional[str] = None) -> Any:
+    names = parse_fields(fields)
+    if names is not None:
+        if not check_event_permission(db, event_id, current_user.id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        event = sparse_query(db, names).filter(Event.id == event_id).one()
+        return JSONResponse(jsonable_encoder(sparse_events(db, [event], names)[0]))
+    event = get_event_with_permission(db, event_id, current_user)
+    event.version_number = versioning.current_version_number(db, event.id)
     return event
 
 
@@ -109,21 +411,35 @@ def update_event(*, db: Session = Depends(get_db), event_id: int, event_in: Even
                 ),
                 Event.id != event_id,
                 Event.owner_id == current_user.id,
+                Event.deleted_at.is_(None),
             )
         ).all()
         if conflicting_events:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Time conflict with existing events")
+    update_data = event_in.model_dump(exclude_unset=True)
+    if settings.DEFERRED_VERSIONING:
+        for field, value in update_data.items():
+            setattr(event, field, value)
+        if "start_time" in update_data:
+            access.move(db, event_id, event.start_time)
+        version_number = versioning.record_change(db, event, update_data, "Event updated", current_user.id)
+        stats.record_version(db, event_id, current_user.id)
+        db.commit()
+        event.version_number = version_number
+        return event
+    versioning.lock_event(db, event_id)
     current_version = (
         db.query(EventVersion)
         .filter(EventVersion.event_id == event_id)
         .order_by(EventVersion.version_number.desc())
         .first()
     )
-    update_data = event_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(event, field, value)
     db.add(event)
-    db.commit()
+    if "start_time" in update_data:
+        access.move(db, event_id, event.start_time)
+    db.flush()
     db.refresh(event)
     new_version_number = current_version.version_number + 1 if current_version is not None else 1
     new_version = EventVersion(
@@ -134,29 +450,74 @@ def update_event(*, db: Session = Depends(get_db), event_id: int, event_in: Even
         change_description="Event updated",
     )
     db.add(new_version)
+    stats.record_version(db, event_id, current_user.id)
     db.flush()  # Ensure new_version.id is available
-    for field, value in update_data.items():
-        old_value = getattr(current_version.data, field, None) if current_version else None
+    changelogs = []
+    for field, value in jsonable_encoder(update_data).items():
+        old_value = current_version.data.get(field) if current_version else None
         if old_value != value:
             changelog = EventChangeLog(
                 event_id=event_id,
                 version_id=new_version.id,
                 field_name=field,
-                old_value=jsonable_encoder(old_value),
-                new_value=jsonable_encoder(value),
+                old_value=old_value,
+                new_value=value,
                 created_by=current_user.id,
             )
             db.add(changelog)
+            changelogs.append(changelog)
+    message = enqueue_event_message(db, event_id, changelog_message(new_version, changelogs))
     db.commit()
+    publish_event_message(event_id, message)
     event.version_number = new_version_number
     return event
 
 
 @router.delete("/{event_id}", response_model=EventSchema)
 def delete_event(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
+    """
+    Mark an event deleted. It can be restored for SOFT_DELETE_RETENTION_HOURS,
+    after which the purge worker removes it and its history.
+    """
     event = get_event_with_permission(db, event_id, current_user, required_role=UserRole.OWNER)
-    db.delete(event)
+    event.deleted_at = datetime.now(timezone.utc)
+    message = enqueue_event_message(db, event_id, {"type": "event_deleted"})
+    db.commit()
+    publish_event_message(event_id, message)
+    db.refresh(event)
+    return event
+
+
+@router.post("/{event_id}/restore", response_model=EventSchema)
+def restore_event(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
+    event = (
+        db.query(Event)
+        .filter(Event.id == event_id, Event.owner_id == current_user.id, Event.deleted_at.is_not(None))
+        .first()
+    )
+    if not event:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deleted event not found")
+    if purge.restore_deadline(event.deleted_at) <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="The event can no longer be restored")
+    conflicting_events = db.query(Event).filter(
+        and_(
+            or_(
+                and_(Event.start_time <= event.start_time, Event.end_time > event.start_time),
+                and_(Event.start_time < event.end_time, Event.end_time >= event.end_time),
+            ),
+            Event.id != event_id,
+            Event.owner_id == current_user.id,
+            Event.deleted_at.is_(None),
+        )
+    ).all()
+    if conflicting_events:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Time conflict with existing events")
+    event.deleted_at = None
+    message = enqueue_event_message(db, event_id, {"type": "event_restored"})
     db.commit()
+    publish_event_message(event_id, message)
+    db.refresh(event)
+    event.version_number = versioning.current_version_number(db, event_id)
     return event
 
 
@@ -175,11 +536,25 @@ def share_event(*, db: Session = Depends(get_db), event_id: int, permission_in:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already has permission for this event")
     permission = EventPermission(event_id=event_id, user_id=permission_in.user_id, role=permission_in.role)
     db.add(permission)
+    access.grant(db, event, permission.user_id, permission.role)
+    stats.add_collaborators(db, event, permission.user_id, 1)
+    message = enqueue_event_message(db, event_id, permission_message("shared", permission))
     db.commit()
     db.refresh(permission)
+    publish_event_message(event_id, message)
     return permission
 
 
+@router.get("/{event_id}/summary", response_model=EventSummary)
+def get_event_summary(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
+    """Version count, collaborator count and last change of an event, without counting its history."""
+    get_event_with_permission(db, event_id, current_user)
+    summary = db.get(EventStats, event_id)
+    if not summary:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Summary not found")
+    return summary
+
+
 @router.get("/{event_id}/permissions", response_model=List[EventPermissionSchema])
 def list_event_permissions(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
     event = get_event_with_permission(db, event_id, current_user)
@@ -195,8 +570,11 @@ def update_event_permission(*, db: Session = Depends(get_db), event_id: int, use
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Permission not found")
     permission.role = permission_in.role
     db.add(permission)
+    access.grant(db, event, user_id, permission.role)
+    message = enqueue_event_message(db, event_id, permission_message("updated", permission))
     db.commit()
     db.refresh(permission)
+    publish_event_message(event_id, message)
     return permission
 
 
@@ -207,29 +585,92 @@ def delete_event_permission(*, db: Session = Depends(get_db), event_id: int, use
     if not permission:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Permission not found")
     db.delete(permission)
+    access.revoke(db, event, user_id)
+    stats.add_collaborators(db, event, user_id, -1)
+    message = enqueue_event_message(db, event_id, permission_message("revoked", permission))
     db.commit()
+    publish_event_message(event_id, message)
     return permission
 
 
+@router.get("/{event_id}/history", response_model=EventHistoryPage)
+def list_event_history(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user), before: Optional[int] = None, limit: int = 100) -> Any:
+    """
+    Version metadata, newest first, ``limit`` (up to MAX_HISTORY_PAGE)
+    versions per page; pass the returned ``next_cursor`` as ``before`` for
+    the next page. Snapshots are not loaded: fetch one with
+    GET /history/{version_number}.
+    """
+    if not 1 <= limit <= MAX_HISTORY_PAGE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"limit must be between 1 and {MAX_HISTORY_PAGE}")
+    get_event_with_permission(db, event_id, current_user)
+    versioning.flush_event(db, event_id)
+    query = (
+        select(EventVersion.id, EventVersion.version_number, EventVersion.created_by, EventVersion.created_at, EventVersion.change_description)
+        .where(EventVersion.event_id == event_id)
+        .order_by(EventVersion.version_number.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        query = query.where(EventVersion.version_number < before)
+    rows = db.execute(query).all()
+    page = rows[:limit]
+    changed: Dict[int, List[str]] = {}
+    if page:
+        for version_id, field_name in db.execute(
+            select(EventChangeLog.version_id, EventChangeLog.field_name)
+            .where(EventChangeLog.event_id == event_id, EventChangeLog.version_id.in_([row.id for row in page]))
+            .order_by(EventChangeLog.id)
+        ):
+            changed.setdefault(version_id, []).append(field_name)
+    return EventHistoryPage(
+        versions=[
+            EventVersionSummary(
+                version_number=row.version_number,
+                created_by=row.created_by,
+                created_at=row.created_at,
+                change_description=row.change_description,
+                changed_fields=changed.get(row.id, []),
+            )
+            for row in page
+        ],
+        next_cursor=page[-1].version_number if len(rows) > limit else None,
+    )
+
+
 @router.get("/{event_id}/history/{version_number}", response_model=EventVersionSchema)
 def get_event_version(*, db: Session = Depends(get_db), event_id: int, version_number: int, current_user: User = Depends(get_current_active_user)) -> Any:
     event = get_event_with_permission(db, event_id, current_user)
+    versioning.flush_event(db, event_id)
     version = db.query(EventVersion).filter(EventVersion.event_id == event_id, EventVersion.version_number == version_number).first()
     if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+    archive.hydrate([version])
     return version
 
 
 @router.post("/{event_id}/rollback/{version_number}", response_model=EventSchema)
 def rollback_event(*, db: Session = Depends(get_db), event_id: int, version_number: int, current_user: User = Depends(get_current_active_user)) -> Any:
     event = get_event_with_permission(db, event_id, current_user, required_role=UserRole.EDITOR)
+    versioning.flush_event(db, event_id)
     version = db.query(EventVersion).filter(EventVersion.event_id == event_id, EventVersion.version_number == version_number).first()
     if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+    archive.hydrate([version])
     for field, value in version.data.items():
         if field != "id" and field != "owner_id":
-            setattr(event, field, value)
+            setattr(event, field, versioning.snapshot_value(field, value))
     db.add(event)
+    access.move(db, event_id, event.start_time)
+    if settings.DEFERRED_VERSIONING:
+        changes = {field: value for field, value in version.data.items() if field not in ("id", "owner_id")}
+        version_number = versioning.record_change(db, event, changes, f"Rolled back to version {version.version_number}", current_user.id)
+        stats.record_version(db, event_id, current_user.id)
+        db.commit()
+        db.refresh(event)
+        event.version_number = version_number
+        return event
+    versioning.lock_event(db, event_id)
     current_version = db.query(EventVersion).filter(EventVersion.event_id == event_id).order_by(EventVersion.version_number.desc()).first()
     new_version = EventVersion(
         event_id=event_id,
@@ -239,45 +680,97 @@ def rollback_event(*, db: Session = Depends(get_db), event_id: int, version_numb
         change_description=f"Rolled back to version {version.version_number}",
     )
     db.add(new_version)
+    stats.record_version(db, event_id, current_user.id)
     db.flush()
+    changelogs = []
     for field, value in version.data.items():
         if field != "id" and field != "owner_id":
-            old_value = getattr(current_version.data, field, None)
+            old_value = current_version.data.get(field)
             if old_value != value:
                 changelog = EventChangeLog(
                     event_id=event_id,
                     version_id=new_version.id,
                     field_name=field,
-                    old_value=jsonable_encoder(old_value),
-                    new_value=jsonable_encoder(value),
+                    old_value=old_value,
+                    new_value=value,
                     created_by=current_user.id,
                 )
                 db.add(changelog)
+                changelogs.append(changelog)
+    message = enqueue_event_message(db, event_id, changelog_message(new_version, changelogs))
     db.commit()
+    publish_event_message(event_id, message)
     db.refresh(event)
     return event
 
 
 @router.get("/{event_id}/changelog", response_model=List[EventChangeLogSchema])
-def get_event_changelog(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
+def get_event_changelog(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user), field: Optional[str] = None, value: Optional[str] = None) -> Any:
+    """
+    Changes to an event, newest first. ``field`` keeps changes to that field
+    and ``value`` those that set it to that value (JSON, e.g. ``true`` or
+    ``{"frequency": "weekly"}``, or else a plain string).
+    """
     event = get_event_with_permission(db, event_id, current_user)
-    changelog = (
+    versioning.flush_event(db, event_id)
+    query = (
         db.query(EventChangeLog)
         .join(EventVersion, EventChangeLog.version_id == EventVersion.id)
         .filter(EventChangeLog.event_id == event_id)
-        .order_by(EventChangeLog.created_at.desc())
-        .all()
     )
-    return changelog
+    if field is not None:
+        query = query.filter(EventChangeLog.field_name == field)
+    if value is not None:
+        try:
+            document = json.loads(value)
+        except ValueError:
+            document = value
+        query = query.filter(json_matches(EventChangeLog.new_value, document))
+    return query.order_by(EventChangeLog.created_at.desc(), EventChangeLog.id.desc()).all()
+
+
+@router.get("/{event_id}/feed")
+async def event_feed(*, db: Session = Depends(get_db), event_id: int, current_user: User = Depends(get_current_active_user)) -> Any:
+    """
+    Server-sent events stream of changelog entries and permission changes for an event.
+    """
+    await run_in_threadpool(get_event_with_permission, db, event_id, current_user)
+    # Release the pooled connection: the stream may stay open for hours.
+    db.close()
+    user_id = current_user.id
+    subscription = get_broker().subscribe(event_channel(event_id))
+
+    async def stream():
+        try:
+            yield ": connected\n\n"
+            async for message in iter_messages(subscription, settings.CHANGE_FEED_KEEPALIVE_SECONDS):
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+                if message["type"] == "event_deleted" or (
+                    message["type"] == "permission" and message["action"] == "revoked" and message["user_id"] == user_id
+                ):
+                    break
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{event_id}/diff/{version_number1}/{version_number2}", response_model=List[EventDiff])
 def get_event_diff(*, db: Session = Depends(get_db), event_id: int, version_number1: int, version_number2: int, current_user: User = Depends(get_current_active_user)) -> Any:
     event = get_event_with_permission(db, event_id, current_user)
+    versioning.flush_event(db, event_id)
     version1 = db.query(EventVersion).filter(EventVersion.event_id == event_id, EventVersion.version_number == version_number1).first()
     version2 = db.query(EventVersion).filter(EventVersion.event_id == event_id, EventVersion.version_number == version_number2).first()
     if not version1 or not version2:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or both versions not found")
+    archive.hydrate([version1, version2])
     diffs = []
     for field, value2 in version2.data.items():
         if field not in ["id", "owner_id"]:
@@ -0,0 +1,105 @@
+"""
+Maintenance commands::
+
+    python -m app.cli access check
+    python -m app.cli access rebuild
+    python -m app.cli stats check
+    python -m app.cli stats rebuild
+    python -m app.cli purge
+    python -m app.cli archive
+"""
+import argparse
+import sys
+from datetime import timedelta
+
+from app.core import access, archive, idempotency, outbox, purge, stats
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+
+def access_check(args) -> int:
+    db = SessionLocal()
+    try:
+        drift = access.check(db)
+    finally:
+        db.close()
+    print(f"user_event_access: {drift['missing']} missing, {drift['unexpected']} unexpected rows")
+    return 1 if any(drift.values()) else 0
+
+
+def access_rebuild(args) -> int:
+    db = SessionLocal()
+    try:
+        rows = access.rebuild(db)
+    finally:
+        db.close()
+    print(f"user_event_access: rebuilt {rows} rows")
+    return 0
+
+
+def stats_check(args) -> int:
+    db = SessionLocal()
+    try:
+        drift = stats.check(db)
+    finally:
+        db.close()
+    print(f"event_stats: {drift['missing']} missing, {drift['unexpected']} unexpected rows")
+    return 1 if any(drift.values()) else 0
+
+
+def stats_rebuild(args) -> int:
+    db = SessionLocal()
+    try:
+        rows = stats.rebuild(db)
+    finally:
+        db.close()
+    print(f"event_stats: rebuilt {rows} rows")
+    return 0
+
+
+def purge_deleted(args) -> int:
+    db = SessionLocal()
+    try:
+        events = purge.purge_deleted(db, args.batch_size)
+        keys = idempotency.purge_expired(db)
+        messages = outbox.purge_dispatched(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"purged {events} deleted events, {keys} expired idempotency keys and {messages} delivered outbox messages")
+    return 0
+
+
+def archive_versions(args) -> int:
+    db = SessionLocal()
+    try:
+        versions = archive.archive_versions(db, timedelta(days=args.older_than_days), args.segment_size)
+    finally:
+        db.close()
+    print(f"archived {versions} versions to {settings.ARCHIVE_DIR}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Maintenance commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    access_parser = commands.add_parser("access", help="user_event_access table")
+    access_commands = access_parser.add_subparsers(dest="action", required=True)
+    access_commands.add_parser("check", help="report rows that disagree with events and permissions").set_defaults(func=access_check)
+    access_commands.add_parser("rebuild", help="recompute the table from events and permissions").set_defaults(func=access_rebuild)
+    stats_parser = commands.add_parser("stats", help="event_stats table")
+    stats_commands = stats_parser.add_subparsers(dest="action", required=True)
+    stats_commands.add_parser("check", help="report rows that disagree with versions and permissions").set_defaults(func=stats_check)
+    stats_commands.add_parser("rebuild", help="recompute the table from versions and permissions").set_defaults(func=stats_rebuild)
+    purge_parser = commands.add_parser("purge", help="remove events deleted longer ago than SOFT_DELETE_RETENTION_HOURS, expired idempotency keys and delivered outbox messages past OUTBOX_RETENTION_HOURS")
+    purge_parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE, help="rows deleted per transaction")
+    purge_parser.set_defaults(func=purge_deleted)
+    archive_parser = commands.add_parser("archive", help="move old version data to cold storage segments")
+    archive_parser.add_argument("--older-than-days", type=float, default=settings.ARCHIVE_AFTER_DAYS)
+    archive_parser.add_argument("--segment-size", type=int, default=settings.ARCHIVE_SEGMENT_SIZE, help="versions per segment")
+    archive_parser.set_defaults(func=archive_versions)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, except_, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Event, EventPermission, UserEventAccess, UserRole
+
+
+def accessible_event_ids(user_id: int):
+    """Subquery of the ids of every event ``user_id`` owns or has been shared."""
+    return select(UserEventAccess.event_id).where(UserEventAccess.user_id == user_id)
+
+
+def grant_owner(db: Session, event: Event) -> None:
+    db.add(UserEventAccess(user_id=event.owner_id, event_id=event.id, role=UserRole.OWNER, start_time=event.start_time))
+
+
+def grant(db: Session, event: Event, user_id: int, role: UserRole) -> None:
+    # The owner's row always says OWNER, whatever they were shared as.
+    if user_id == event.owner_id:
+        return
+    access = db.get(UserEventAccess, (user_id, event.id))
+    if access is None:
+        db.add(UserEventAccess(user_id=user_id, event_id=event.id, role=role, start_time=event.start_time))
+    else:
+        access.role = role
+
+
+def revoke(db: Session, event: Event, user_id: int) -> None:
+    if user_id != event.owner_id:
+        db.execute(delete(UserEventAccess).where(UserEventAccess.user_id == user_id, UserEventAccess.event_id == event.id))
+
+
+def move(db: Session, event_id: int, start_time: Optional[datetime]) -> None:
+    db.execute(update(UserEventAccess).where(UserEventAccess.event_id == event_id).values(start_time=start_time))
+
+
+def expected_rows():
+    """The access rows derived from events and event_permissions."""
+    owners = select(
+        Event.owner_id, Event.id, literal(UserRole.OWNER, UserEventAccess.role.type), Event.start_time
+    ).where(Event.owner_id.is_not(None))
+    shared = (
+        select(EventPermission.user_id, EventPermission.event_id, EventPermission.role, Event.start_time)
+        .join(Event, Event.id == EventPermission.event_id)
+        .where(
+            EventPermission.user_id.is_not(None),
+            EventPermission.role.is_not(None),
+            EventPermission.user_id != Event.owner_id,
+        )
+    )
+    return owners.union_all(shared)
+
+
+def check(db: Session) -> Dict[str, int]:
+    """
+    Compare the table with what events and event_permissions imply. Rows with
+    the wrong role or start time count as both missing and unexpected.
+    """
+    actual = select(UserEventAccess.user_id, UserEventAccess.event_id, UserEventAccess.role, UserEventAccess.start_time)
+    expected = select(expected_rows().subquery())
+
+    def count(query) -> int:
+        return db.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+
+    return {"missing": count(except_(expected, actual)), "unexpected": count(except_(actual, expected))}
+
+
+def rebuild(db: Session) -> int:
+    """Replace the whole table in one transaction. Returns the number of rows written."""
+    db.execute(delete(UserEventAccess))
+    result = db.execute(
+        insert(UserEventAccess).from_select(["user_id", "event_id", "role", "start_time"], expected_rows())
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,205 @@
+"""
+Cold storage for old event versions.
+
+Archiving moves the ``data`` of old versions out of ``event_versions`` into
+append-only segment files under ``ARCHIVE_DIR``; the rows stay, with ``data``
+cleared and ``archived_segment`` set. Each segment is written once and never
+changed:
+
+- ``NNNNNNNN.seg``: zlib-compressed JSON documents, back to back;
+- ``NNNNNNNN.idx``: sorted ``(version id, offset, length)`` records of 20
+  bytes, memory-mapped and binary-searched on reads.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, null, select, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.db.models import EventVersion
+
+logger = logging.getLogger(__name__)
+
+RECORD = struct.Struct("<QQI")
+
+
+def _path(directory: str, segment: int, suffix: str) -> str:
+    return os.path.join(directory, f"{segment:08d}.{suffix}")
+
+
+def _claim_segment(directory: str) -> Tuple[int, int]:
+    """Create the next free segment file exclusively; returns its number and fd."""
+    os.makedirs(directory, exist_ok=True)
+    existing = [int(name[:-4]) for name in os.listdir(directory) if name.endswith(".seg") and name[:-4].isdigit()]
+    segment = max(existing, default=0) + 1
+    while True:
+        try:
+            return segment, os.open(_path(directory, segment, "seg"), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            segment += 1
+
+
+def write_segment(directory: str, documents: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+    """Write ``(version id, data)`` pairs to a new segment and its index; returns the segment number."""
+    segment, fd = _claim_segment(directory)
+    index = []
+    with os.fdopen(fd, "wb") as seg:
+        offset = 0
+        for version_id, data in sorted(documents, key=lambda d: d[0]):
+            blob = zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+            seg.write(blob)
+            index.append(RECORD.pack(version_id, offset, len(blob)))
+            offset += len(blob)
+        seg.flush()
+        os.fsync(seg.fileno())
+    tmp = _path(directory, segment, "idx.tmp")
+    with open(tmp, "wb") as idx:
+        idx.write(b"".join(index))
+        idx.flush()
+        os.fsync(idx.fileno())
+    os.replace(tmp, _path(directory, segment, "idx"))
+    return segment
+
+
+class _Segment:
+    def __init__(self, directory: str, segment: int):
+        with open(_path(directory, segment, "idx"), "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(_path(directory, segment, "seg"), "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = len(self.index) // RECORD.size
+
+    def find(self, version_id: int) -> Optional[Dict[str, Any]]:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, offset, length = RECORD.unpack_from(self.index, mid * RECORD.size)
+            if key == version_id:
+                return json.loads(zlib.decompress(self.data[offset:offset + length]))
+            if key < version_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def close(self) -> None:
+        self.index.close()
+        self.data.close()
+
+
+class ArchiveReader:
+    """Reads archived versions, keeping up to ``max_open`` segments mapped."""
+
+    def __init__(self, directory: str, max_open: int = 64):
+        self.directory = directory
+        self.max_open = max_open
+        self._segments: "OrderedDict[int, _Segment]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _segment(self, segment: int) -> _Segment:
+        with self._lock:
+            mapped = self._segments.get(segment)
+            if mapped is None:
+                mapped = self._segments[segment] = _Segment(self.directory, segment)
+                while len(self._segments) > self.max_open:
+                    self._segments.popitem(last=False)[1].close()
+            else:
+                self._segments.move_to_end(segment)
+            return mapped
+
+    def read(self, segment: int, version_id: int) -> Optional[Dict[str, Any]]:
+        return self._segment(segment).find(version_id)
+
+    def close(self) -> None:
+        with self._lock:
+            for mapped in self._segments.values():
+                mapped.close()
+            self._segments.clear()
+
+
+_reader: Optional[ArchiveReader] = None
+_reader_lock = threading.Lock()
+
+
+def get_reader() -> ArchiveReader:
+    global _reader
+    with _reader_lock:
+        if _reader is None or _reader.directory != settings.ARCHIVE_DIR:
+            if _reader is not None:
+                _reader.close()
+            _reader = ArchiveReader(settings.ARCHIVE_DIR)
+        return _reader
+
+
+def hydrate(versions: Iterable[Optional[EventVersion]]) -> None:
+    """
+    Load ``data`` from the archive for archived versions. The value is set as
+    if loaded from the database, so committing the session does not write it
+    back. Raises 503 if a segment or its entry for the version is missing or
+    unreadable.
+    """
+    for version in versions:
+        if version is not None and version.data is None and version.archived_segment is not None:
+            try:
+                data = get_reader().read(version.archived_segment, version.id)
+            except (OSError, ValueError, zlib.error) as exc:
+                logger.error("Archive segment %s unreadable for version %s: %s", version.archived_segment, version.id, exc)
+                data = None
+            else:
+                if data is None:
+                    logger.error("Archive segment %s has no entry for version %s", version.archived_segment, version.id)
+            if data is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Archived version data is unavailable",
+                )
+            set_committed_value(version, "data", data)
+
+
+def archive_versions(db: Session, older_than: timedelta, segment_size: int = 10000, now: Optional[datetime] = None) -> int:
+    """
+    Move the data of versions created before ``now - older_than`` into new
+    segments of up to ``segment_size`` versions. The latest version of each
+    event stays in the database, since updates read it. Returns the number
+    of versions archived.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - older_than
+    newer = aliased(EventVersion)
+    latest = (
+        select(func.max(newer.version_number)).where(newer.event_id == EventVersion.event_id).scalar_subquery()
+    )
+    archived = 0
+    while True:
+        rows: List[Tuple[int, Dict[str, Any]]] = db.execute(
+            select(EventVersion.id, EventVersion.data)
+            .where(
+                EventVersion.archived_segment.is_(None),
+                EventVersion.created_at < cutoff,
+                EventVersion.version_number < latest,
+            )
+            .order_by(EventVersion.id)
+            .limit(segment_size)
+        ).all()
+        if not rows:
+            return archived
+        # The segment is durable before any row points at it; a crash in
+        # between only leaves an unreferenced segment behind.
+        segment = write_segment(settings.ARCHIVE_DIR, rows)
+        db.execute(
+            update(EventVersion)
+            .where(EventVersion.id.in_([version_id for version_id, _ in rows]))
+            .values(data=null(), archived_segment=segment)
+        )
+        db.commit()
+        archived += len(rows)
@@ -0,0 +1,184 @@
+import time
+import zlib
+from typing import Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.metrics import Counter, Histogram, REGISTRY
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSION_RATIO = REGISTRY.register(Histogram(
+    "http_response_compression_ratio",
+    "Uncompressed over compressed size of compressed responses.",
+    ["encoding"],
+    buckets=(1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 20.0, 50.0),
+))
+COMPRESSION_CPU = REGISTRY.register(Counter(
+    "http_response_compression_cpu_seconds_total", "CPU time spent compressing responses.", ["encoding"]
+))
+COMPRESSION_BYTES = REGISTRY.register(Counter(
+    "http_response_compression_bytes_total", "Response bytes before and after compression.", ["encoding", "stage"]
+))
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml", "application/javascript", "+json", "+xml")
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+# Preferred first when the client weighs encodings equally. Levels favour
+# speed: responses are compressed on the request path.
+CODECS = {"zstd": (_Zstd, 3), "br": (_Brotli, 4), "gzip": (_Gzip, 6)}
+
+
+def available_encodings() -> Sequence[str]:
+    installed = {"zstd": zstandard is not None, "br": brotli is not None, "gzip": True}
+    return [name for name in CODECS if installed[name]]
+
+
+def choose_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """Pick the encoding with the highest ``q`` in ``Accept-Encoding``; ties go to ``encodings`` order."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name.lower()] = q
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return any(t in content_type for t in COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses for clients that accept it. Complete bodies are only
+    compressed from ``minimum_size`` bytes up; streamed bodies are compressed
+    chunk by chunk and flushed after each one, so clients receive data as it
+    is produced.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings: Optional[Sequence[str]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [e for e in (encodings or CODECS) if e in available_encodings()]
+
+    async def __call__(self, scope, receive, send):
+        encoding = None
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+        original = compressed = 0
+        cpu = 0.0
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough, original, compressed, cpu
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=list(start.get("headers", [])))
+                size = len(body) if not more_body else int(headers.get("content-length", self.minimum_size))
+                if not _compressible(headers) or size < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                codec, level = CODECS[encoding]
+                compressor = codec(level)
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                start["headers"] = headers.raw
+                await send(start)
+
+            started = time.thread_time()
+            data = compressor.compress(body) + (compressor.flush() if more_body else compressor.finish())
+            cpu += time.thread_time() - started
+            original += len(body)
+            compressed += len(data)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            if not more_body:
+                COMPRESSION_CPU.labels(encoding).inc(cpu)
+                COMPRESSION_BYTES.labels(encoding, "original").inc(original)
+                COMPRESSION_BYTES.labels(encoding, "compressed").inc(compressed)
+                if compressed:
+                    COMPRESSION_RATIO.labels(encoding).observe(original / compressed)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,25 +1,124 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
 from functools import lru_cache
-import os
+
+API_V1_STR = "/api"
 
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "NeoFi Event Management System"
     VERSION: str = "1.0.0"
-    API_V1_STR: str = "/api"
+    API_V1_STR: str = API_V1_STR
     
     # Security
-    SECRET_KEY: str = os.environ["SECRET_KEY"]
-    ALGORITHM: str = os.environ["ALGORITHM"]
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.environ["ACCESS_TOKEN_EXPIRE_MINUTES"])
+    SECRET_KEY: str
+    ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int
     
     # Database
-    DATABASE_URL: str = os.environ["DATABASE_URL"]
+    DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Total connections all workers may hold; when set, each worker's pool is
+    # sized to DB_CONNECTION_BUDGET // WEB_CONCURRENCY with no overflow.
+    DB_CONNECTION_BUDGET: Optional[int] = None
+    
+    # Read replicas: GET requests are served from these (round-robin), except
+    # for users who wrote within the last REPLICA_STICKY_SECONDS. Recent
+    # writes are tracked per worker ("memory") or across workers through
+    # REDIS_URL ("redis").
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_STICKY_BACKEND: str = "memory"
+    REPLICA_RETRY_SECONDS: float = 10.0
+    
+    # Outbox: change messages are written in the same transaction as the
+    # change and delivered in batches to OUTBOX_SINK_URL (file:// or http(s)://).
+    # Delivered messages are deleted after OUTBOX_RETENTION_HOURS.
+    OUTBOX_SINK_URL: Optional[str] = None
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_RETENTION_HOURS: float = 24.0
+    
+    # Deferred versioning: updates and rollbacks only store the changed fields;
+    # a background writer turns them into versions and changelog entries.
+    # History reads expand an event's outstanding changes first.
+    DEFERRED_VERSIONING: bool = False
+    VERSIONING_BATCH_SIZE: int = 100
+    VERSIONING_POLL_INTERVAL: float = 0.5
+    
+    # Soft delete: deleted events can be restored for SOFT_DELETE_RETENTION_HOURS,
+    # after which a background worker (when PURGE_ENABLED) purges them and
+    # their history, at most PURGE_BATCH_SIZE rows per transaction.
+    SOFT_DELETE_RETENTION_HOURS: float = 72.0
+    PURGE_ENABLED: bool = False
+    PURGE_BATCH_SIZE: int = 1000
+    PURGE_POLL_INTERVAL: float = 60.0
+    
+    # Cold storage: `python -m app.cli archive` moves the data of versions older
+    # than ARCHIVE_AFTER_DAYS (except each event's latest) into compressed
+    # segment files of up to ARCHIVE_SEGMENT_SIZE versions under ARCHIVE_DIR,
+    # which every worker must be able to read.
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_SEGMENT_SIZE: int = 10000
+    
+    # Idempotency: retries of IDEMPOTENT_ROUTES (route names) that carry the
+    # same Idempotency-Key get the first response back for
+    # IDEMPOTENCY_TTL_HOURS. Recent responses are also kept in memory, up to
+    # IDEMPOTENCY_CACHE_SIZE per worker.
+    IDEMPOTENT_ROUTES: list[str] = ["create_event", "share_event", "rollback_event"]
+    IDEMPOTENCY_TTL_HOURS: float = 24.0
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    
+    # Bulk import
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+    
+    # Server
+    WEB_CONCURRENCY: int = 1
+    WORKER_MAX_REQUESTS: int = 10000
+    WORKER_MAX_REQUESTS_JITTER: int = 1000
+    WORKER_GRACEFUL_TIMEOUT: int = 30
     
     # Redis
     REDIS_URL: Optional[str] = None
     
+    # Rate limiting: token buckets per route name and client, where a client
+    # is the authenticated user or else the remote address. Limits read
+    # "<requests>/<second|minute|hour|day>" and allow bursts of that size.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMITS: dict[str, str] = {
+        "register_user": "5/minute",
+        "login": "10/minute",
+        "create_event": "60/minute",
+        "update_event": "60/minute",
+        "rollback_event": "30/minute",
+        "import_events": "5/minute",
+    }
+    
+    # Change feed: "memory" delivers within this process, "redis" fans out
+    # across workers through REDIS_URL.
+    CHANGE_FEED_BACKEND: str = "memory"
+    CHANGE_FEED_KEEPALIVE_SECONDS: float = 15.0
+    
+    # Observability
+    METRICS_ENABLED: bool = True
+    # Requests carrying "X-Profile: <PROFILING_TOKEN>" are profiled, as is a
+    # random PROFILING_SAMPLE_RATE fraction of all requests.
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = ".profiles"
+    PROFILING_MAX_ENTRIES: int = 50
+    
+    # Response compression: bodies of at least COMPRESSION_MINIMUM_SIZE bytes
+    # are compressed with the best of COMPRESSION_ENCODINGS the client
+    # accepts; br and zstd need the brotli / zstandard packages.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
     
@@ -33,4 +132,18 @@ def get_settings() -> Settings:
     return Settings()
 
 
-settings = get_settings() 
\ No newline at end of file
+class _LazySettings:
+    """
+    Stand-in for the settings instance that only reads the environment on first
+    attribute access, so importing a module that uses ``settings`` stays cheap
+    and each process resolves its own configuration.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+
+settings = _LazySettings() 
\ No newline at end of file
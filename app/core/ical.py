@@ -0,0 +1,182 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.recurrence import from_rrule, parse_pattern, to_rrule
+
+PRODID = "-//NeoFi//Event Management System//EN"
+CHUNK_SIZE = 16 * 1024
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line to 75 octets as required by RFC 5545."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 sequence.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(event: Any, uid_domain: str = "neofi", stamp: Optional[datetime] = None) -> str:
+    """Render one event (an ORM object or a row with the same attributes) as a VEVENT."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event.id}@{uid_domain}",
+        f"DTSTAMP:{format_datetime(stamp or event.updated_at or event.created_at or datetime.now(timezone.utc))}",
+        f"DTSTART:{format_datetime(event.start_time)}",
+        f"DTEND:{format_datetime(event.end_time)}",
+        f"SUMMARY:{escape_text(event.title or '')}",
+    ]
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    if event.location:
+        lines.append(f"LOCATION:{escape_text(event.location)}")
+    if event.is_recurring:
+        rule = parse_pattern(event.recurrence_pattern)
+        if rule is not None:
+            lines.append(f"RRULE:{to_rrule(rule)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def iter_calendar(events: Iterable[Any], name: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream a VCALENDAR built from ``events`` in chunks of roughly
+    ``CHUNK_SIZE`` characters; memory use is independent of calendar size.
+    """
+    header = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN"]
+    if name:
+        header.append(f"X-WR-CALNAME:{escape_text(name)}")
+    buffer = ["".join(fold_line(line) for line in header)]
+    size = len(buffer[0])
+    for event in events:
+        block = vevent(event)
+        buffer.append(block)
+        size += len(block)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    buffer.append(fold_line("END:VCALENDAR"))
+    yield "".join(buffer)
+
+
+_DURATION = re.compile(r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$")
+
+
+def unescape_text(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def unfold_lines(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Yield ``(line_number, logical_line)`` with RFC 5545 continuation lines joined."""
+    current, start = None, 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def parse_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(p.split("=", 1) for p in params if "=" in p), value
+
+
+def parse_datetime(value: str, params: Dict[str, str]) -> datetime:
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        day = datetime.strptime(value, "%Y%m%d").date()
+        return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+    parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    try:
+        tz = ZoneInfo(params["TZID"].strip('"')) if "TZID" in params else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = timezone.utc
+    return parsed.replace(tzinfo=tz)
+
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    delta = timedelta(**parts)
+    return -delta if match.group("sign") == "-" else delta
+
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Parse VEVENT components from an iCalendar stream one at a time, yielding
+    ``(line_number, fields)`` where ``fields`` uses the ``EventCreate`` names.
+    Malformed properties are reported through an ``"error"`` key.
+    """
+    fields: Optional[Dict[str, Any]] = None
+    start_line, duration, all_day = 0, None, False
+    for number, line in unfold_lines(lines):
+        if not line:
+            continue
+        name, params, value = parse_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            fields, start_line, duration, all_day = {}, number, None, False
+        elif name == "END" and value.upper() == "VEVENT" and fields is not None:
+            if "end_time" not in fields and "start_time" in fields:
+                if duration is None:
+                    duration = timedelta(days=1) if all_day else timedelta(0)
+                fields["end_time"] = fields["start_time"] + duration
+            yield start_line, fields
+            fields = None
+        elif fields is not None and "error" not in fields:
+            try:
+                if name == "SUMMARY":
+                    fields["title"] = unescape_text(value)
+                elif name == "DESCRIPTION":
+                    fields["description"] = unescape_text(value)
+                elif name == "LOCATION":
+                    fields["location"] = unescape_text(value)
+                elif name == "DTSTART":
+                    fields["start_time"] = parse_datetime(value, params)
+                    all_day = params.get("VALUE") == "DATE" or len(value) == 8
+                elif name == "DTEND":
+                    fields["end_time"] = parse_datetime(value, params)
+                elif name == "DURATION":
+                    duration = parse_duration(value)
+                elif name == "RRULE":
+                    pattern = from_rrule(value)
+                    if pattern:
+                        fields["is_recurring"] = True
+                        fields["recurrence_pattern"] = pattern
+            except ValueError as exc:
+                fields["error"] = f"{name}: {exc}"
@@ -0,0 +1,276 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, event, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.profiling import ProfilingRoute
+from app.core.security import bearer_subject
+from app.db.models import IdempotencyKey
+from app.db.session import RoutingSession, SessionLocal
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# A request that has held its key this long without finishing is presumed
+# dead. A retry may run it again, unless it had already committed.
+ABANDONED_AFTER = timedelta(minutes=5)
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+
+class Claim(NamedTuple):
+    """A key held by the running request, identified by when it was taken."""
+    user_id: int
+    key: str
+    created_at: datetime
+
+
+def _aware(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class ResponseCache:
+    """Completed responses by (user, key), least recently used first, in front of the table."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[StoredResponse, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+            if entry[1] <= datetime.now(timezone.utc):
+                del self._entries[(user_id, key)]
+                return None
+            self._entries.move_to_end((user_id, key))
+            return entry[0]
+
+    def put(self, user_id: int, key: str, stored: StoredResponse, expires_at: datetime) -> None:
+        with self._lock:
+            self._entries[(user_id, key)] = (stored, _aware(expires_at))
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache()
+def get_cache() -> ResponseCache:
+    return ResponseCache(settings.IDEMPOTENCY_CACHE_SIZE)
+
+
+def fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.url.path.encode(), request.url.query.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _check(stored: StoredResponse, request_fingerprint: str) -> StoredResponse:
+    if stored.fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{HEADER} was already used for a different request",
+        )
+    return stored
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"A request with this {HEADER} is in progress")
+
+
+def begin(user_id: int, key: str, route: str, request_fingerprint: str) -> Union[StoredResponse, Claim]:
+    """
+    Claim ``key`` for this request. Returns the stored response if the key
+    was already completed; raises 409 while another request holds it, or
+    if an abandoned request had committed before losing its response.
+    """
+    stored = get_cache().get(user_id, key)
+    record_cache("idempotency", stored is not None)
+    if stored is not None:
+        return _check(stored, request_fingerprint)
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        row = db.get(IdempotencyKey, (user_id, key))
+        if row is not None and _aware(row.expires_at) <= now:
+            db.delete(row)
+            db.flush()
+            row = None
+        if row is not None:
+            if row.status_code is not None:
+                stored = StoredResponse(row.fingerprint, row.status_code, row.response.encode())
+                get_cache().put(user_id, key, stored, row.expires_at)
+                return _check(stored, request_fingerprint)
+            if row.fingerprint != request_fingerprint:
+                _check(StoredResponse(row.fingerprint, 0, b""), request_fingerprint)
+            if _aware(row.created_at) > now - ABANDONED_AFTER:
+                raise _in_progress()
+            if row.applied_at is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"A request with this {HEADER} was already applied, but its response was not saved",
+                )
+            # Take over, unless the old request commits (see _mark_applied)
+            # or another retry takes over first.
+            taken = db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.created_at == row.created_at,
+                    IdempotencyKey.applied_at.is_(None),
+                )
+                .values(created_at=now)
+            ).rowcount
+            db.commit()
+            if not taken:
+                raise _in_progress()
+            return Claim(user_id, key, now)
+        db.add(IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            route=route,
+            fingerprint=request_fingerprint,
+            created_at=now,
+            expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            raise _in_progress()
+        return Claim(user_id, key, now)
+    finally:
+        db.close()
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _mark_applied(session):
+    """
+    Runs in the endpoint's own transaction, at its first commit: records that
+    the claimed request has taken effect, so that it is never run again even
+    if the response is lost before ``complete``. Fails the commit if a retry
+    has taken the key over in the meantime.
+    """
+    claim = session.info.pop("idempotency_claim", None)
+    if claim is None:
+        return
+    marked = session.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == claim.user_id,
+            IdempotencyKey.key == claim.key,
+            IdempotencyKey.created_at == claim.created_at,
+        )
+        .values(applied_at=datetime.now(timezone.utc))
+    ).rowcount
+    if not marked:
+        raise _in_progress()
+
+
+def complete(claim: Claim, response: Response) -> None:
+    db = SessionLocal()
+    try:
+        row = db.get(IdempotencyKey, (claim.user_id, claim.key))
+        if row is None:
+            return
+        row.status_code = response.status_code
+        row.response = response.body.decode()
+        db.commit()
+        get_cache().put(claim.user_id, claim.key, StoredResponse(row.fingerprint, row.status_code, response.body), row.expires_at)
+    finally:
+        db.close()
+
+
+def release(claim: Claim) -> None:
+    """Forget a key whose request failed without committing, so that a retry runs it again."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == claim.user_id,
+            IdempotencyKey.key == claim.key,
+            IdempotencyKey.created_at == claim.created_at,
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.applied_at.is_(None),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def purge_expired(db: Session, now: Optional[datetime] = None) -> int:
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < (now or datetime.now(timezone.utc))))
+    db.commit()
+    return result.rowcount
+
+
+class IdempotentRoute(ProfilingRoute):
+    """
+    Route class that makes the endpoints listed in ``IDEMPOTENT_ROUTES`` honour
+    an ``Idempotency-Key`` header: the first request with a key runs, and
+    later ones from the same user get its response back (with an
+    ``Idempotent-Replayed`` header) without running the endpoint again. Only
+    successful responses are kept; after an error the key can be retried.
+    The endpoint's first commit marks the key as applied, so a request that
+    dies before its response is stored is never run a second time.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(HEADER)
+            if not key or self.name not in settings.IDEMPOTENT_ROUTES:
+                return await handler(request)
+            subject = bearer_subject(request.headers.get("authorization", ""))
+            if subject is None or not subject.isdigit():
+                # Unauthenticated: let the endpoint reject it.
+                return await handler(request)
+            if len(key) > MAX_KEY_LENGTH:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{HEADER} is longer than {MAX_KEY_LENGTH} characters")
+            user_id = int(subject)
+            request_fingerprint = fingerprint(request, await request.body())
+            claim = await run_in_threadpool(begin, user_id, key, self.name, request_fingerprint)
+            if isinstance(claim, StoredResponse):
+                return Response(
+                    claim.body,
+                    status_code=claim.status_code,
+                    media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"},
+                )
+            # Picked up by get_db, for _mark_applied.
+            request.state.idempotency_claim = claim
+            try:
+                response = await handler(request)
+            except BaseException:
+                await run_in_threadpool(release, claim)
+                raise
+            if 200 <= response.status_code < 300 and hasattr(response, "body"):
+                await run_in_threadpool(complete, claim, response)
+            else:
+                await run_in_threadpool(release, claim)
+            return response
+
+        return idempotent_handler
@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.core.ical import iter_vevents
+from app.core.recurrence import from_rrule
+from app.db.models import Event, EventStats, EventVersion, ImportJob, OutboxMessage, UserEventAccess, UserRole
+from app.schemas.event import EventCreate
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {".ics": "ics", ".ical": "ics", ".ifb": "ics", ".csv": "csv"}
+_EVENT_COLUMNS = (
+    "id", "title", "description", "start_time", "end_time", "location",
+    "is_recurring", "recurrence_pattern", "owner_id", "created_at",
+)
+_VERSION_COLUMNS = ("event_id", "version_number", "data", "created_by", "change_description", "created_at")
+_ACCESS_COLUMNS = ("user_id", "event_id", "role", "start_time")
+_STATS_COLUMNS = ("event_id", "version_count", "collaborator_count", "last_modified_by", "last_modified_at")
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    return FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield ``(line_number, fields)`` per CSV row. Columns match ``EventCreate``;
+    ``recurrence_pattern`` may hold JSON and an ``rrule`` column is accepted
+    as an alternative.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        fields: Dict[str, Any] = {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+        try:
+            if "is_recurring" in fields:
+                fields["is_recurring"] = fields["is_recurring"].strip().lower() in ("1", "true", "yes", "y")
+            if "recurrence_pattern" in fields:
+                fields["recurrence_pattern"] = json.loads(fields["recurrence_pattern"])
+            elif "rrule" in fields:
+                fields["recurrence_pattern"] = from_rrule(fields.pop("rrule"))
+                fields.setdefault("is_recurring", fields["recurrence_pattern"] is not None)
+        except ValueError as exc:
+            fields = {"error": f"recurrence_pattern: {exc}"}
+        yield reader.line_num, fields
+
+
+def iter_records(f, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    return iter_vevents(f) if fmt == "ics" else iter_csv_records(f)
+
+
+def validate(fields: Dict[str, Any]) -> EventCreate:
+    if "error" in fields:
+        raise ValueError(fields["error"])
+    fields.setdefault("description", "")
+    try:
+        event = EventCreate(**fields)
+    except ValidationError as exc:
+        raise ValueError("; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+    if event.end_time < event.start_time:
+        raise ValueError("end_time is before start_time")
+    return event
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, UserRole):
+        value = value.name
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(cursor, table: str, columns: Tuple[str, ...], rows: List[Dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[c]) for c in columns) + "\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def insert_batch(db: Session, owner_id: int, events: List[EventCreate]) -> List[int]:
+    """
+    Write ``events``, their initial versions and stats and the owner's access rows with
+    one statement per table
+    (``COPY`` on Postgres, a multi-row ``INSERT ... RETURNING`` elsewhere).
+    The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [{**e.model_dump(), "owner_id": owner_id, "created_at": now} for e in events]
+    conn = db.connection()
+    postgres = conn.dialect.name == "postgresql"
+    if postgres:
+        ids = conn.execute(
+            text("SELECT nextval(pg_get_serial_sequence('events', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(rows)},
+        ).scalars().all()
+        for row, event_id in zip(rows, ids):
+            row["id"] = event_id
+    else:
+        ids = db.execute(
+            insert(Event).returning(Event.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars().all()
+        for row, event_id in zip(rows, ids):
+            row["id"] = event_id
+    versions = [
+        {
+            "event_id": row["id"],
+            "version_number": 1,
+            "data": jsonable_encoder({**row, "updated_at": None}),
+            "created_by": owner_id,
+            "change_description": "Imported",
+            "created_at": now,
+        }
+        for row in rows
+    ]
+    grants = [
+        {"user_id": owner_id, "event_id": row["id"], "role": UserRole.OWNER, "start_time": row["start_time"]}
+        for row in rows
+    ]
+    summaries = [
+        {"event_id": row["id"], "version_count": 1, "collaborator_count": 0, "last_modified_by": owner_id, "last_modified_at": now}
+        for row in rows
+    ]
+    if postgres:
+        cursor = conn.connection.cursor()
+        try:
+            _copy_rows(cursor, "events", _EVENT_COLUMNS, rows)
+            _copy_rows(cursor, "event_versions", _VERSION_COLUMNS, versions)
+            _copy_rows(cursor, "user_event_access", _ACCESS_COLUMNS, grants)
+            _copy_rows(cursor, "event_stats", _STATS_COLUMNS, summaries)
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(EventVersion), versions)
+        db.execute(insert(UserEventAccess), grants)
+        db.execute(insert(EventStats), summaries)
+    return list(ids)
+
+
+def run_import(session_factory: Callable[[], Session], job_id: int, path: str, batch_size: int = 1000, max_errors: int = 1000) -> None:
+    """
+    Stream records from ``path`` into the job owner's calendar. Valid rows are
+    written in batches of ``batch_size``, each in its own transaction, and the
+    job row is updated with progress after every batch. Invalid rows are
+    skipped and recorded (up to ``max_errors``) with their line number.
+    """
+    db = session_factory()
+    job = db.get(ImportJob, job_id)
+    errors: List[Dict[str, Any]] = []
+    batch: List[EventCreate] = []
+
+    def flush() -> None:
+        if batch:
+            ids = insert_batch(db, job.owner_id, batch)
+            db.add(OutboxMessage(
+                topic="events_imported",
+                payload={"type": "events_imported", "job_id": job.id, "owner_id": job.owner_id, "event_ids": ids},
+            ))
+            job.imported_rows += len(ids)
+            batch.clear()
+        job.errors = list(errors)
+        db.commit()
+
+    try:
+        job.status = "running"
+        job.processed_rows = job.imported_rows = job.failed_rows = 0
+        db.commit()
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for line_number, fields in iter_records(f, job.format):
+                job.processed_rows += 1
+                try:
+                    batch.append(validate(fields))
+                except ValueError as exc:
+                    job.failed_rows += 1
+                    if len(errors) < max_errors:
+                        errors.append({"row": line_number, "error": str(exc)})
+                if len(batch) >= batch_size:
+                    flush()
+        flush()
+        job.status = "completed"
+    except Exception as exc:
+        logger.exception("Import job %s failed", job_id)
+        db.rollback()
+        job.status = "failed"
+        job.error = str(exc)[:500]
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,338 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class _Shards:
+    """
+    Per-thread value slots. Each thread only ever writes to its own list, so the
+    hot path takes no lock; the lock is only used once per thread to register
+    its slots and when a scrape sums them up.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._all: List[list] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> list:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self._size
+            with self._lock:
+                self._all.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self) -> list:
+        totals = [0] * self._size
+        with self._lock:
+            shards = list(self._all)
+        for values in shards:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._shards.get()[0] += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._shards.get()[0] -= amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class _HistogramChild:
+    __slots__ = ("_buckets", "_shards")
+
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf and a trailing slot for the sum.
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.get()
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        totals = self._shards.totals()
+        return totals[:-1], totals[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    if len(key) != len(self.labelnames):
+                        raise ValueError(f"{self.name} expects labels {self.labelnames}")
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _label_str(self, key: tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._children[()].inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{self._label_str(key)} {_fmt(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1) -> None:
+        self._children[()].dec(amount)
+
+
+class GaugeFunc(_Metric):
+    """Gauge whose value is computed by a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, func: Callable[[], Iterable[Tuple[tuple, float]]], labelnames: Sequence[str] = ()):
+        self._func = func
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return None
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._func():
+            yield f"{self.name}{self._label_str(key)} {_fmt(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def samples(self) -> Iterable[str]:
+        for key, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _fmt(bound)
+                yield f"{self.name}_bucket{self._label_str(key, ('le', le))} {cumulative}"
+            yield f"{self.name}_sum{self._label_str(key)} {_fmt(total)}"
+            yield f"{self.name}_count{self._label_str(key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "Total HTTP requests by route and status code.", ("method", "route", "status")
+))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+))
+HTTP_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served."
+))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Database statement execution time by operation.", ("operation",), buckets=DB_BUCKETS
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by cache name and result.", ("cache", "result")
+))
+
+UNMATCHED_ROUTE = "<unmatched>"
+_DB_OPERATIONS = ("select", "insert", "update", "delete", "other")
+_engines: List[Engine] = []
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _cache_hit_ratios():
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), child in list(CACHE_REQUESTS._children.items()):
+        totals.setdefault(cache, [0, 0])[0 if result == "hit" else 1] += child.value
+    for cache, (hits, misses) in totals.items():
+        if hits + misses:
+            yield (cache,), hits / (hits + misses)
+
+
+def _pool_stats(attr: str):
+    def collect():
+        for index, engine in enumerate(list(_engines)):
+            value = getattr(engine.pool, attr, None)
+            if callable(value):
+                yield (str(index), engine.url.get_backend_name()), value()
+    return collect
+
+
+REGISTRY.register(GaugeFunc(
+    "cache_hit_ratio", "Fraction of cache lookups that were hits.", _cache_hit_ratios, ("cache",)
+))
+REGISTRY.register(GaugeFunc(
+    "db_pool_checked_out", "Connections currently checked out of the pool.", _pool_stats("checkedout"), ("engine", "backend")
+))
+REGISTRY.register(GaugeFunc(
+    "db_pool_size", "Configured size of the connection pool.", _pool_stats("size"), ("engine", "backend")
+))
+REGISTRY.register(GaugeFunc(
+    "db_pool_overflow", "Connections opened beyond the pool size.", _pool_stats("overflow"), ("engine", "backend")
+))
+
+_db_children = {op: DB_QUERY_LATENCY.labels(op) for op in _DB_OPERATIONS}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_start
+    operation = statement.lstrip()[:6].lower()
+    _db_children.get(operation, _db_children["other"]).observe(elapsed)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Record statement timings and pool usage for ``engine``."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _engines.append(engine)
+    return engine
+
+
+def uninstrument_engine(engine: Engine) -> None:
+    if engine in _engines:
+        _engines.remove(engine)
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def register_routes(routes) -> None:
+    """Pre-create latency series for every route so the hot path never allocates."""
+    for route in routes:
+        for method in getattr(route, "methods", None) or ():
+            HTTP_LATENCY.labels(method, route.path)
+            HTTP_REQUESTS.labels(method, route.path, "200")
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get("route")
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, path).observe(elapsed)
+            HTTP_REQUESTS.labels(method, path, str(status_code)).inc()
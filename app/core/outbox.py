@@ -0,0 +1,259 @@
+import json
+import logging
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.metrics import Counter, GaugeFunc, Histogram, REGISTRY
+from app.db.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 300
+# How often a dispatcher deletes delivered messages past their retention.
+CLEANUP_INTERVAL_SECONDS = 60.0
+
+OUTBOX_DISPATCHED = REGISTRY.register(Counter(
+    "outbox_messages_dispatched_total", "Outbox messages delivered to the sink."
+))
+OUTBOX_FAILURES = REGISTRY.register(Counter(
+    "outbox_dispatch_failures_total", "Outbox batches the sink rejected."
+))
+OUTBOX_BATCH_LATENCY = REGISTRY.register(Histogram(
+    "outbox_batch_duration_seconds", "Time to claim, deliver and acknowledge one outbox batch."
+))
+_lag = {"seconds": 0.0, "pending": 0}
+REGISTRY.register(GaugeFunc(
+    "outbox_lag_seconds", "Age of the oldest undelivered outbox message.", lambda: [((), _lag["seconds"])]
+))
+REGISTRY.register(GaugeFunc(
+    "outbox_pending_messages", "Undelivered outbox messages.", lambda: [((), _lag["pending"])]
+))
+
+
+class FileSink:
+    """Appends each message as a JSON line; a stand-in for a real broker."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, messages: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a") as f:
+            for message in messages:
+                f.write(json.dumps(message) + "\n")
+
+
+class HttpSink:
+    """POSTs each batch as a JSON array; any non-2xx response fails the batch."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, messages: List[Dict[str, Any]]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(messages).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise RuntimeError(f"Sink returned HTTP {response.status}")
+
+
+def sink_from_url(url: str):
+    if url.startswith("file://"):
+        return FileSink(url[len("file://"):])
+    if url.startswith(("http://", "https://")):
+        return HttpSink(url)
+    raise ValueError(f"Unsupported outbox sink: {url}")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def claim_batch(db: Session, batch_size: int, lease_seconds: float) -> List[Dict[str, Any]]:
+    """
+    Lease up to ``batch_size`` deliverable messages, oldest first, a whole
+    event at a time. Only an event's oldest undelivered message can start a
+    claim, and those rows are taken with ``FOR UPDATE SKIP LOCKED`` on
+    Postgres. The dispatcher that holds that row also takes the event's later
+    messages, in order, so another dispatcher never delivers them early,
+    even while the first lease is not yet committed.
+    """
+    now = _utcnow()
+    earlier = aliased(OutboxMessage)
+    undelivered_before = exists().where(
+        earlier.event_id == OutboxMessage.event_id,
+        earlier.id < OutboxMessage.id,
+        earlier.dispatched_at.is_(None),
+    )
+    heads = (
+        db.query(OutboxMessage)
+        .filter(
+            OutboxMessage.dispatched_at.is_(None),
+            OutboxMessage.available_at <= now,
+            (OutboxMessage.locked_until.is_(None)) | (OutboxMessage.locked_until <= now),
+            ~undelivered_before,
+        )
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    messages = list(heads)
+    first_ids = {m.event_id: m.id for m in heads if m.event_id is not None}
+    if first_ids and len(messages) < batch_size:
+        followers = (
+            db.query(OutboxMessage)
+            .filter(
+                OutboxMessage.event_id.in_(list(first_ids)),
+                OutboxMessage.dispatched_at.is_(None),
+            )
+            .order_by(OutboxMessage.id)
+            .limit(batch_size - len(messages) + len(first_ids))
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        stopped = set()
+        for m in followers:
+            if len(messages) >= batch_size:
+                break
+            if m.id <= first_ids[m.event_id] or m.event_id in stopped:
+                continue
+            # Stop at the first message that is not deliverable yet.
+            if _as_utc(m.available_at) > now or (m.locked_until is not None and _as_utc(m.locked_until) > now):
+                stopped.add(m.event_id)
+                continue
+            messages.append(m)
+    batch = [
+        {"id": m.id, "topic": m.topic, "payload": m.payload, "attempts": m.attempts or 0}
+        for m in sorted(messages, key=lambda m: m.id)
+    ]
+    _mark(db, batch, locked_until=now + timedelta(seconds=lease_seconds))
+    db.commit()
+    return batch
+
+
+def _mark(db: Session, batch: List[Dict[str, Any]], **values) -> None:
+    if batch:
+        db.query(OutboxMessage).filter(OutboxMessage.id.in_([m["id"] for m in batch])).update(
+            values, synchronize_session=False
+        )
+
+
+def update_lag(db: Session) -> None:
+    oldest, pending = (
+        db.query(func.min(OutboxMessage.created_at), func.count(OutboxMessage.id))
+        .filter(OutboxMessage.dispatched_at.is_(None))
+        .one()
+    )
+    _lag["pending"] = pending
+    _lag["seconds"] = max((_utcnow() - _as_utc(oldest)).total_seconds(), 0.0) if oldest else 0.0
+
+
+def dispatch_once(db: Session, sink, batch_size: int = 100, lease_seconds: float = 60.0) -> int:
+    """Deliver one batch. Returns the number of messages delivered."""
+    start = time.perf_counter()
+    batch = claim_batch(db, batch_size, lease_seconds)
+    if not batch:
+        update_lag(db)
+        return 0
+    try:
+        sink.send([{"id": m["id"], "topic": m["topic"], "payload": m["payload"]} for m in batch])
+    except Exception as exc:
+        OUTBOX_FAILURES.inc()
+        logger.warning("Outbox batch of %d failed: %s", len(batch), exc)
+        # The whole batch is retried together, which keeps per-event order.
+        attempts = max(m["attempts"] for m in batch) + 1
+        _mark(
+            db,
+            batch,
+            attempts=OutboxMessage.attempts + 1,
+            available_at=_utcnow() + timedelta(seconds=min(2 ** attempts, MAX_BACKOFF_SECONDS)),
+            locked_until=None,
+            last_error=str(exc)[:500],
+        )
+        db.commit()
+        return 0
+    _mark(db, batch, dispatched_at=_utcnow(), locked_until=None)
+    db.commit()
+    OUTBOX_DISPATCHED.inc(len(batch))
+    OUTBOX_BATCH_LATENCY.observe(time.perf_counter() - start)
+    update_lag(db)
+    return len(batch)
+
+
+def purge_dispatched(db: Session, batch_size: int = 1000, now: Optional[datetime] = None) -> int:
+    """
+    Delete messages delivered more than ``OUTBOX_RETENTION_HOURS`` ago,
+    ``batch_size`` rows per transaction. Returns the messages deleted.
+    """
+    cutoff = (now or _utcnow()) - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+    removed = 0
+    while True:
+        ids = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.dispatched_at.is_not(None), OutboxMessage.dispatched_at < cutoff)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        deleted = db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(ids))).rowcount
+        db.commit()
+        removed += deleted
+        if deleted < batch_size:
+            return removed
+
+
+class OutboxDispatcher:
+    """
+    Background thread that drains the outbox while there is work, then polls.
+    Every ``CLEANUP_INTERVAL_SECONDS`` it also deletes delivered messages past
+    their retention.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], sink, batch_size: int = 100, poll_interval: float = 1.0):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> None:
+        next_cleanup = time.monotonic()
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                delivered = dispatch_once(db, self.sink, self.batch_size)
+                if time.monotonic() >= next_cleanup:
+                    next_cleanup = time.monotonic() + CLEANUP_INTERVAL_SECONDS
+                    purge_dispatched(db)
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                delivered = 0
+            finally:
+                db.close()
+            if delivered < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
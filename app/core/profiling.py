@@ -0,0 +1,208 @@
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import secrets
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import anyio
+from fastapi.routing import APIRoute, request_response
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, reason: str):
+        self.id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.profiles: List[cProfile.Profile] = []
+        self.route: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.duration: float = 0.0
+        self.endpoint_duration: float = 0.0
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "reason": self.reason,
+            "duration_ms": round(self.duration * 1000, 3),
+            "endpoint_duration_ms": round(self.endpoint_duration * 1000, 3),
+            "created_at": self.id.split("-")[0],
+        }
+
+
+class ProfileStore:
+    """
+    Bounded ring buffer of profiles on disk. Each entry is a ``<id>.prof`` pstats
+    dump plus a ``<id>.json`` metadata file; ids sort by creation time, so the
+    oldest entries are pruned first once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def save(self, profile: RequestProfile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if profile.profiles:
+            stats = pstats.Stats(profile.profiles[0])
+            for extra in profile.profiles[1:]:
+                stats.add(extra)
+            stats.dump_stats(self._path(profile.id, "prof"))
+        with open(self._path(profile.id, "json"), "w") as f:
+            json.dump(profile.metadata(), f)
+        self._prune()
+
+    def list(self) -> List[Dict[str, Any]]:
+        entries = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, "json")) as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if profile_id not in self._ids():
+            return None
+        with open(self._path(profile_id, "json")) as f:
+            entry = json.load(f)
+        entry["report"] = self.report(profile_id)
+        return entry
+
+    def report(self, profile_id: str, limit: int = 50) -> str:
+        path = self._path(profile_id, "prof")
+        if not os.path.exists(path):
+            return ""
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def _ids(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def _prune(self) -> None:
+        ids = self._ids()
+        for profile_id in ids[: max(len(ids) - self.max_entries, 0)]:
+            for ext in ("json", "prof"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:
+                    pass
+
+    def _path(self, profile_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+
+class ProfilingMiddleware:
+    """
+    Marks a request for profiling when it carries ``X-Profile: <PROFILING_TOKEN>``
+    or wins the ``sample_rate`` draw. Only marked requests pay for cProfile; the
+    route handlers pick the profile up through a context variable.
+    """
+
+    def __init__(self, app, store: ProfileStore, token: Optional[str] = None, sample_rate: float = 0.0):
+        self.app = app
+        self.store = store
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+
+    def _reason(self, scope) -> Optional[str]:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER.encode() and secrets.compare_digest(value, self.token):
+                    return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        reason = self._reason(scope) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], reason)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile.id.encode())]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration = time.perf_counter() - start
+            _current_profile.reset(token)
+            route = scope.get("route")
+            profile.route = route.path if route is not None else None
+            await anyio.to_thread.run_sync(self.store.save, profile)
+
+
+def _profiled(call):
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            profile = _current_profile.get()
+            if profile is None:
+                return await call(*args, **kwargs)
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                profiler.disable()
+                profile.endpoint_duration += time.perf_counter() - start
+                profile.profiles.append(profiler)
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(call, *args, **kwargs)
+        finally:
+            profile.endpoint_duration += time.perf_counter() - start
+            profile.profiles.append(profiler)
+    return wrapper
+
+
+class ProfilingRoute(APIRoute):
+    """
+    Route class that runs the endpoint under cProfile when the current request
+    was selected by ``ProfilingMiddleware``. Sync endpoints execute in the
+    threadpool, which inherits the request's context, so the profiler is
+    started in the thread that actually does the work.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dependant.call = _profiled(self.dependant.call)
+        self.app = request_response(self.get_route_handler())
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.core.config import settings
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Subscription:
+    def __init__(self, broker: "InProcessBroker", channel: str):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _deliver(self, message: Dict[str, Any]) -> None:
+        # Runs on the subscriber's loop. A subscriber that cannot keep up is
+        # cut off rather than allowed to buffer without bound.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.broker._remove(self)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker._remove(self)
+
+
+class InProcessBroker:
+    """
+    Fan-out to subscribers in this process. ``publish`` is called from the sync
+    endpoints running in the threadpool, so delivery is handed to each
+    subscriber's event loop with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, message)
+            except RuntimeError:  # loop already closed
+                self._remove(subscription)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Publishes through Redis so that subscribers connected to any worker receive
+    every message. Each process runs one listener that relays Redis messages to
+    its local subscribers.
+    """
+
+    def __init__(self, url: str, prefix: str = "neofi:feed:"):
+        import redis
+
+        super().__init__()
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{f"{prefix}*": self._relay})
+        self._listener = self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self._redis.publish(self.prefix + channel, json.dumps(message))
+
+    def _relay(self, raw: Dict[str, Any]) -> None:
+        channel = raw["channel"].decode()[len(self.prefix):]
+        super().publish(channel, json.loads(raw["data"]))
+
+
+@lru_cache()
+def get_broker() -> InProcessBroker:
+    if settings.CHANGE_FEED_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("CHANGE_FEED_BACKEND=redis requires REDIS_URL")
+        return RedisBroker(settings.REDIS_URL)
+    return InProcessBroker()
+
+
+def event_channel(event_id: int) -> str:
+    return f"event:{event_id}"
+
+
+async def iter_messages(subscription: Subscription, keepalive: float) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield messages as they arrive, or ``None`` after ``keepalive`` seconds of silence."""
+    while not subscription.overflowed:
+        yield await subscription.get(timeout=keepalive)
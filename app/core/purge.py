@@ -0,0 +1,110 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core import idempotency
+from app.core.config import settings
+from app.db.models import Event, EventChangeLog, EventVersion
+
+logger = logging.getLogger(__name__)
+
+
+def retention() -> timedelta:
+    return timedelta(hours=settings.SOFT_DELETE_RETENTION_HOURS)
+
+
+def restore_deadline(deleted_at: datetime) -> datetime:
+    if deleted_at.tzinfo is None:
+        deleted_at = deleted_at.replace(tzinfo=timezone.utc)
+    return deleted_at + retention()
+
+
+def _delete_batch(db: Session, model, event_id: int, batch_size: int) -> int:
+    ids = select(model.id).where(model.event_id == event_id).limit(batch_size).scalar_subquery()
+    deleted = db.execute(delete(model).where(model.id.in_(ids))).rowcount
+    db.commit()
+    return deleted
+
+
+def _expired(db: Session, event_id: int, cutoff: datetime) -> bool:
+    """Lock the event if it was deleted before ``cutoff``, so that it cannot be restored meanwhile."""
+    return db.execute(
+        select(Event.id)
+        .where(Event.id == event_id, Event.deleted_at.is_not(None), Event.deleted_at < cutoff)
+        .with_for_update()
+    ).first() is not None
+
+
+def purge_event(db: Session, event_id: int, batch_size: int = 1000, now: Optional[datetime] = None) -> int:
+    """
+    Remove a deleted event's changelog and versions ``batch_size`` rows per
+    transaction, then the event itself (its permissions, access rows and
+    pending changes go with it by cascade). Every transaction first checks,
+    under a row lock, that the event is still deleted and past the retention
+    period; a live or restorable event is left alone. Returns the rows deleted.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - retention()
+    removed = 0
+    for model in (EventChangeLog, EventVersion):
+        while True:
+            if not _expired(db, event_id, cutoff):
+                db.rollback()
+                return removed
+            deleted = _delete_batch(db, model, event_id, batch_size)
+            removed += deleted
+            if deleted < batch_size:
+                break
+    if _expired(db, event_id, cutoff):
+        removed += db.execute(delete(Event).where(Event.id == event_id)).rowcount
+    db.commit()
+    return removed
+
+
+def purge_deleted(db: Session, batch_size: int = 1000, now: Optional[datetime] = None) -> int:
+    """Purge every event deleted longer ago than the retention period. Returns the events purged."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - retention()
+    event_ids = db.execute(
+        select(Event.id).where(Event.deleted_at.is_not(None), Event.deleted_at < cutoff).order_by(Event.deleted_at)
+    ).scalars().all()
+    for event_id in event_ids:
+        purge_event(db, event_id, batch_size, now)
+    return len(event_ids)
+
+
+class PurgeWorker:
+    """Background thread that purges expired deleted events and idempotency keys every ``poll_interval`` seconds."""
+
+    def __init__(self, session_factory: Callable[[], Session], batch_size: int = 1000, poll_interval: float = 60.0):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                purged = purge_deleted(db, self.batch_size)
+                if purged:
+                    logger.info("Purged %d deleted events", purged)
+                idempotency.purge_expired(db)
+            except Exception:
+                logger.exception("Purge of deleted events failed")
+            finally:
+                db.close()
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="event-purge", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
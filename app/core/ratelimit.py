@@ -0,0 +1,134 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import Counter, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MAX_MEMORY_BUCKETS = 100_000
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+RATE_LIMITED = REGISTRY.register(Counter(
+    "rate_limited_requests_total", "Requests rejected with 429 by the rate limiter.", ["route"]
+))
+
+
+class Rate(NamedTuple):
+    capacity: float
+    refill: float  # tokens per second
+
+
+@lru_cache(maxsize=None)
+def parse_rate(spec: str) -> Rate:
+    """Parse ``"<requests>/<period>"``, where period is second, minute, hour, day or a number of seconds."""
+    try:
+        count, period = spec.split("/")
+        count = float(count)
+        period = period.strip().lower()
+        seconds = PERIODS.get(period) or PERIODS.get(period[:-1]) or float(period)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit {spec!r}, expected e.g. '10/minute'")
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit {spec!r}")
+    return Rate(count, count / seconds)
+
+
+class MemoryBuckets:
+    """
+    Token buckets held in this process, least recently used first. Once
+    ``max_keys`` is exceeded the idlest bucket is dropped, which at worst lets
+    that client start again with a full bucket.
+    """
+
+    def __init__(self, max_keys: int = MAX_MEMORY_BUCKETS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate) -> float:
+        """Take one token. Returns 0 if allowed, else the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (rate.capacity, now))
+            tokens = min(rate.capacity, tokens + (now - updated) * rate.refill)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate.refill
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * refill)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """
+    Token buckets shared by every worker, updated atomically by a Lua script.
+    If Redis is unreachable requests are let through rather than rejected.
+    """
+
+    def __init__(self, url: str, prefix: str = "neofi:ratelimit:"):
+        import redis
+
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, rate: Rate) -> float:
+        try:
+            return float(self._take(keys=[self.prefix + key], args=[rate.capacity, rate.refill, time.time()]))
+        except Exception as exc:
+            logger.warning("Rate limiter unavailable, allowing request: %s", exc)
+            return 0.0
+
+
+@lru_cache()
+def get_limiter():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires REDIS_URL")
+        return RedisBuckets(settings.REDIS_URL)
+    return MemoryBuckets()
+
+
+def check(route: str, identity: str) -> Optional[int]:
+    """
+    Charge one request by ``identity`` against the limit configured for
+    ``route`` in ``RATE_LIMITS``. Returns the Retry-After seconds if the
+    request must be rejected, else None.
+    """
+    spec = settings.RATE_LIMITS.get(route)
+    if not spec or not settings.RATE_LIMIT_ENABLED:
+        return None
+    wait = get_limiter().take(f"{route}:{identity}", parse_rate(spec))
+    if wait <= 0:
+        return None
+    RATE_LIMITED.labels(route).inc()
+    return max(1, math.ceil(wait))
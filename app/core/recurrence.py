@@ -0,0 +1,165 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+FREQUENCIES = {
+    "daily": "DAILY",
+    "weekly": "WEEKLY",
+    "monthly": "MONTHLY",
+    "yearly": "YEARLY",
+    "annually": "YEARLY",
+}
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+_WEEKDAY_NAMES = {
+    "monday": "MO", "tuesday": "TU", "wednesday": "WE", "thursday": "TH",
+    "friday": "FR", "saturday": "SA", "sunday": "SU",
+}
+
+
+class RecurrenceRule(NamedTuple):
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    by_day: tuple = ()
+
+
+def _parse_until(value: Any) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        until = value
+    elif isinstance(value, date):
+        until = datetime(value.year, value.month, value.day, 23, 59, 59)
+    else:
+        until = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+
+
+def _parse_days(value: Any) -> tuple:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    days = []
+    for day in value:
+        day = str(day).strip().lower()
+        code = _WEEKDAY_NAMES.get(day) or _WEEKDAY_NAMES.get(day[:3] + "day") or day[:2].upper()
+        if code in WEEKDAYS and code not in days:
+            days.append(code)
+    return tuple(sorted(days, key=WEEKDAYS.index))
+
+
+def parse_pattern(pattern: Optional[Dict[str, Any]]) -> Optional[RecurrenceRule]:
+    """
+    Normalise an event's free-form ``recurrence_pattern``. Accepts
+    ``frequency``/``freq``/``repeat`` (daily, weekly, monthly, yearly),
+    ``interval``, ``count``, ``until`` and ``by_day``/``byday``/``days``.
+    Returns ``None`` for non-recurring or unrecognised patterns.
+    """
+    if not pattern:
+        return None
+    freq = pattern.get("frequency") or pattern.get("freq") or pattern.get("repeat")
+    freq = FREQUENCIES.get(str(freq).lower()) if freq else None
+    if freq is None:
+        return None
+    try:
+        interval = max(int(pattern.get("interval") or 1), 1)
+        count = int(pattern["count"]) if pattern.get("count") else None
+        until = _parse_until(pattern.get("until"))
+    except (TypeError, ValueError):
+        return None
+    by_day = _parse_days(pattern.get("by_day") or pattern.get("byday") or pattern.get("days"))
+    return RecurrenceRule(freq, interval, count, until, by_day)
+
+
+def to_rrule(rule: RecurrenceRule) -> str:
+    parts: List[str] = [f"FREQ={rule.freq}"]
+    if rule.interval != 1:
+        parts.append(f"INTERVAL={rule.interval}")
+    if rule.by_day:
+        parts.append("BYDAY=" + ",".join(rule.by_day))
+    if rule.count:
+        parts.append(f"COUNT={rule.count}")
+    elif rule.until:
+        parts.append("UNTIL=" + rule.until.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+    return ";".join(parts)
+
+
+def from_rrule(value: str) -> Optional[Dict[str, Any]]:
+    """Convert an RFC 5545 RRULE value into a ``recurrence_pattern`` dict."""
+    parts = dict(part.split("=", 1) for part in value.strip().split(";") if "=" in part)
+    freq = parts.get("FREQ", "").upper()
+    frequency = next((name for name, code in FREQUENCIES.items() if code == freq), None)
+    if frequency is None:
+        return None
+    pattern: Dict[str, Any] = {"frequency": frequency}
+    if parts.get("INTERVAL", "1") != "1":
+        pattern["interval"] = int(parts["INTERVAL"])
+    if parts.get("BYDAY"):
+        # Drop ordinal prefixes such as "1MO"; they are not supported.
+        pattern["by_day"] = [day[-2:] for day in parts["BYDAY"].split(",")]
+    if parts.get("COUNT"):
+        pattern["count"] = int(parts["COUNT"])
+    if parts.get("UNTIL"):
+        until = parts["UNTIL"]
+        fmt = "%Y%m%dT%H%M%SZ" if "T" in until else "%Y%m%d"
+        pattern["until"] = datetime.strptime(until, fmt).replace(tzinfo=timezone.utc).isoformat()
+    return pattern
+
+
+def _add_months(value: datetime, months: int) -> Optional[datetime]:
+    year, month = divmod(value.month - 1 + months, 12)
+    try:
+        return value.replace(year=value.year + year, month=month + 1)
+    except ValueError:  # e.g. the 31st in a 30-day month: no occurrence
+        return None
+
+
+def _candidates(start: datetime, rule: RecurrenceRule, first_period: int):
+    period = first_period
+    if rule.freq == "WEEKLY":
+        days = [WEEKDAYS.index(d) for d in rule.by_day] or [start.weekday()]
+        week_start = start - timedelta(days=start.weekday())
+    while True:
+        step = period * rule.interval
+        if rule.freq == "DAILY":
+            yield start + timedelta(days=step)
+        elif rule.freq == "WEEKLY":
+            week = week_start + timedelta(weeks=step)
+            for day in days:
+                yield week + timedelta(days=day)
+        elif rule.freq == "MONTHLY":
+            yield _add_months(start, step)
+        else:
+            yield _add_months(start, 12 * step)
+        period += 1
+
+
+def occurrences(start: datetime, rule: RecurrenceRule, after: datetime, before: datetime) -> Iterator[datetime]:
+    """
+    Start times of the series beginning at ``start`` that fall in
+    ``[after, before)``, in order. Without a ``count`` the series is
+    fast-forwarded to ``after`` instead of walked from its first occurrence.
+    """
+    first_period = 0
+    if rule.count is None and after > start:
+        if rule.freq == "DAILY":
+            elapsed = (after - start).days
+        elif rule.freq == "WEEKLY":
+            elapsed = (after - start).days // 7
+        elif rule.freq == "MONTHLY":
+            elapsed = (after.year - start.year) * 12 + after.month - start.month
+        else:
+            elapsed = after.year - start.year
+        first_period = max(elapsed // rule.interval - 1, 0)
+    seen = 0
+    for occurrence in _candidates(start, rule, first_period):
+        if occurrence is None or occurrence < start:
+            continue
+        if occurrence >= before or (rule.until and occurrence > rule.until):
+            return
+        seen += 1
+        if rule.count and seen > rule.count:
+            return
+        if occurrence >= after:
+            yield occurrence
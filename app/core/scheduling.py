@@ -0,0 +1,115 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core.recurrence import occurrences, parse_pattern
+
+# Intervals are (start, end) pairs of POSIX timestamps: comparing and sorting
+# floats is several times cheaper than aware datetimes, which matters when
+# merging a year of events for dozens of people.
+Interval = Tuple[float, float]
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _timestamp(value: datetime) -> float:
+    # Naive values are UTC (as SQLite returns them).
+    return value.timestamp() if value.tzinfo else (value - _EPOCH).total_seconds()
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def busy_intervals(events: Iterable[Any], start: datetime, end: datetime) -> List[Interval]:
+    """
+    Busy time of ``events`` (rows with start_time, end_time, is_recurring and
+    recurrence_pattern) inside ``[start, end)``, with recurrences expanded.
+    """
+    lo, hi = _timestamp(start), _timestamp(end)
+    busy: List[Interval] = []
+    append = busy.append
+    for event in events:
+        event_start, event_end = _timestamp(event.start_time), _timestamp(event.end_time)
+        rule = parse_pattern(event.recurrence_pattern) if event.is_recurring else None
+        if rule is None:
+            if event_start < hi and event_end > lo:
+                append((max(event_start, lo), min(event_end, hi)))
+            continue
+        duration = event_end - event_start
+        first = _utc(event.start_time)
+        for occurrence in occurrences(first, rule, start - timedelta(seconds=duration), end):
+            occurrence_start = occurrence.timestamp()
+            append((max(occurrence_start, lo), min(occurrence_start + duration, hi)))
+    return busy
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching intervals."""
+    merged: List[Interval] = []
+    for interval_start, interval_end in sorted(intervals):
+        if merged and interval_start <= merged[-1][1]:
+            if interval_end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], interval_end)
+        else:
+            merged.append((interval_start, interval_end))
+    return merged
+
+
+def working_intervals(
+    start: datetime, end: datetime, day_start: time, day_end: time, tz: ZoneInfo, weekdays: Sequence[int]
+) -> Iterator[Interval]:
+    """Working hours of each allowed weekday in ``tz``, clipped to ``[start, end)``."""
+    lo, hi = start.timestamp(), end.timestamp()
+    day: date = start.astimezone(tz).date()
+    last = end.astimezone(tz).date()
+    while day <= last:
+        if day.weekday() in weekdays:
+            work_start = max(datetime.combine(day, day_start, tz).timestamp(), lo)
+            work_end = min(datetime.combine(day, day_end, tz).timestamp(), hi)
+            if work_start < work_end:
+                yield work_start, work_end
+        day += timedelta(days=1)
+
+
+def free_slots(busy: List[Interval], working: Iterable[Interval], duration: float, limit: Optional[int] = None) -> List[Interval]:
+    """
+    Sweep the merged, sorted ``busy`` list against the working intervals and
+    return the gaps of at least ``duration``.
+    """
+    slots: List[Interval] = []
+    i = 0
+    for work_start, work_end in working:
+        while i < len(busy) and busy[i][1] <= work_start:
+            i += 1
+        cursor = work_start
+        j = i
+        while j < len(busy) and busy[j][0] < work_end:
+            if busy[j][0] - cursor >= duration:
+                slots.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if work_end - cursor >= duration:
+            slots.append((cursor, work_end))
+        if limit is not None and len(slots) >= limit:
+            return slots[:limit]
+    return slots
+
+
+def find_free_slots(
+    events: Iterable[Any],
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    day_start: time = time(9),
+    day_end: time = time(17),
+    tz: str = "UTC",
+    weekdays: Sequence[int] = (0, 1, 2, 3, 4),
+    limit: Optional[int] = None,
+) -> List[Dict[str, datetime]]:
+    start, end = _utc(start), _utc(end)
+    busy = merge(busy_intervals(events, start, end))
+    working = working_intervals(start, end, day_start, day_end, ZoneInfo(tz), weekdays)
+    return [
+        {"start": datetime.fromtimestamp(s, timezone.utc), "end": datetime.fromtimestamp(e, timezone.utc)}
+        for s, e in free_slots(busy, working, duration.total_seconds(), limit)
+    ]
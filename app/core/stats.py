@@ -0,0 +1,101 @@
+from typing import Dict, List
+
+from sqlalchemy import and_, delete, except_, func, insert, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Event, EventPermission, EventStats, EventVersion, PendingChange
+
+
+def init(db: Session, event_id: int, user_id: int) -> None:
+    """Stats of a new event; add in the transaction that writes its first version."""
+    db.add(EventStats(event_id=event_id, version_count=1, collaborator_count=0, last_modified_by=user_id, last_modified_at=func.now()))
+
+
+def record_version(db: Session, event_id: int, user_id: int) -> None:
+    """
+    Count a new version (or pending change) by ``user_id``. Must run in the
+    transaction that writes it, whose start time the version gets as
+    ``created_at``.
+    """
+    db.execute(
+        update(EventStats)
+        .where(EventStats.event_id == event_id)
+        .values(version_count=EventStats.version_count + 1, last_modified_by=user_id, last_modified_at=func.now())
+    )
+
+
+def add_collaborators(db: Session, event: Event, user_id: int, delta: int) -> None:
+    # Sharing an event with its owner does not make them a collaborator.
+    if user_id == event.owner_id:
+        return
+    db.execute(
+        update(EventStats)
+        .where(EventStats.event_id == event.id)
+        .values(collaborator_count=EventStats.collaborator_count + delta)
+    )
+
+
+def summaries(db: Session, event_ids: List[int]) -> Dict[int, EventStats]:
+    return {stats.event_id: stats for stats in db.query(EventStats).filter(EventStats.event_id.in_(event_ids))}
+
+
+def expected_rows():
+    """The stats derived from versions, pending changes and permissions."""
+    history = union_all(
+        select(EventVersion.event_id, EventVersion.version_number, EventVersion.created_by, EventVersion.created_at),
+        select(PendingChange.event_id, PendingChange.version_number, PendingChange.created_by, PendingChange.created_at),
+    ).subquery()
+    latest = select(
+        history.c.event_id,
+        history.c.created_by,
+        history.c.created_at,
+        func.count().over(partition_by=history.c.event_id).label("version_count"),
+        func.row_number().over(partition_by=history.c.event_id, order_by=history.c.version_number.desc()).label("rank"),
+    ).subquery()
+    collaborators = (
+        select(EventPermission.event_id, func.count().label("collaborator_count"))
+        .join(Event, Event.id == EventPermission.event_id)
+        .where(EventPermission.user_id != Event.owner_id)
+        .group_by(EventPermission.event_id)
+        .subquery()
+    )
+    return (
+        select(
+            Event.id,
+            func.coalesce(latest.c.version_count, 0),
+            func.coalesce(collaborators.c.collaborator_count, 0),
+            latest.c.created_by,
+            latest.c.created_at,
+        )
+        .outerjoin(latest, and_(latest.c.event_id == Event.id, latest.c.rank == 1))
+        .outerjoin(collaborators, collaborators.c.event_id == Event.id)
+    )
+
+
+def check(db: Session) -> Dict[str, int]:
+    """
+    Compare the table with what the history and permissions imply. Rows with
+    wrong values count as both missing and unexpected.
+    """
+    actual = select(
+        EventStats.event_id, EventStats.version_count, EventStats.collaborator_count,
+        EventStats.last_modified_by, EventStats.last_modified_at,
+    )
+    expected = select(expected_rows().subquery())
+
+    def count(query) -> int:
+        return db.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+
+    return {"missing": count(except_(expected, actual)), "unexpected": count(except_(actual, expected))}
+
+
+def rebuild(db: Session) -> int:
+    """Replace the whole table in one transaction. Returns the number of rows written."""
+    db.execute(delete(EventStats))
+    result = db.execute(
+        insert(EventStats).from_select(
+            ["event_id", "version_count", "collaborator_count", "last_modified_by", "last_modified_at"], expected_rows()
+        )
+    )
+    db.commit()
+    return result.rowcount
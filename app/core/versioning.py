@@ -0,0 +1,227 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import DateTime, exists, func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pubsub import event_channel, get_broker
+from app.db.models import Event, EventChangeLog, EventVersion, OutboxMessage, PendingChange
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def changelog_message(version: EventVersion, changelogs: List[EventChangeLog]) -> Dict[str, Any]:
+    return {
+        "type": "changelog",
+        "version_id": version.id,
+        "version_number": version.version_number,
+        "created_by": version.created_by,
+        "changes": [
+            {"field_name": c.field_name, "old_value": c.old_value, "new_value": c.new_value}
+            for c in changelogs
+        ],
+    }
+
+
+def current_version_number(db: Session, event_id: int) -> int:
+    """Latest version number of an event, counting changes not yet expanded."""
+    numbers = union_all(
+        select(EventVersion.version_number).where(EventVersion.event_id == event_id),
+        select(PendingChange.version_number).where(PendingChange.event_id == event_id),
+    ).subquery()
+    return db.execute(select(func.max(numbers.c.version_number))).scalar() or 1
+
+
+def current_version_numbers(db: Session, event_ids: List[int]) -> Dict[int, int]:
+    """``current_version_number`` for many events in one query."""
+    numbers = union_all(
+        select(EventVersion.event_id, EventVersion.version_number).where(EventVersion.event_id.in_(event_ids)),
+        select(PendingChange.event_id, PendingChange.version_number).where(PendingChange.event_id.in_(event_ids)),
+    ).subquery()
+    rows = db.execute(
+        select(numbers.c.event_id, func.max(numbers.c.version_number)).group_by(numbers.c.event_id)
+    ).all()
+    return {event_id: number or 1 for event_id, number in rows}
+
+
+def snapshot_value(field: str, value: Any) -> Any:
+    """A value from a version snapshot (JSON) as the event column expects it."""
+    column = Event.__table__.columns.get(field)
+    if isinstance(value, str) and column is not None and isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def lock_event(db: Session, event_id: int) -> None:
+    """
+    Lock the event's row until the transaction ends, so that concurrent
+    writers of one event take version numbers one after the other.
+    """
+    db.query(Event.id).filter(Event.id == event_id).with_for_update().first()
+
+
+def record_change(db: Session, event: Event, changes: Dict[str, Any], description: str, user_id: int) -> int:
+    """
+    Stage ``changes`` to be versioned later and return the version number they
+    will get. Only the changed fields are stored; the caller commits.
+    """
+    lock_event(db, event.id)
+    version_number = current_version_number(db, event.id) + 1
+    db.add(PendingChange(
+        event_id=event.id,
+        version_number=version_number,
+        changes=jsonable_encoder(changes),
+        description=description,
+        created_by=user_id,
+    ))
+    return version_number
+
+
+def _expand(db: Session, event_id: int, changes: List[PendingChange]) -> List[Dict[str, Any]]:
+    """
+    Turn an event's pending changes (oldest first) into versions and changelog
+    rows, stage their outbox messages and delete the pending rows. Returns the
+    payloads to publish once the caller has committed.
+    """
+    previous = (
+        db.query(EventVersion)
+        .filter(EventVersion.event_id == event_id)
+        .order_by(EventVersion.version_number.desc())
+        .first()
+    )
+    snapshot = dict(previous.data) if previous else {}
+    expanded = []
+    for change in changes:
+        old = snapshot
+        snapshot = {**old, **change.changes, "updated_at": jsonable_encoder(change.created_at)}
+        version = EventVersion(
+            event_id=event_id,
+            version_number=change.version_number,
+            data=snapshot,
+            created_by=change.created_by,
+            change_description=change.description,
+            created_at=change.created_at,
+        )
+        db.add(version)
+        expanded.append((change, old, version))
+    db.flush()
+    payloads = []
+    for change, old, version in expanded:
+        changelogs = [
+            EventChangeLog(
+                event_id=event_id,
+                version_id=version.id,
+                field_name=field,
+                old_value=old.get(field),
+                new_value=value,
+                created_by=change.created_by,
+                created_at=change.created_at,
+            )
+            for field, value in change.changes.items()
+            if old.get(field) != value
+        ]
+        db.add_all(changelogs)
+        payload = jsonable_encoder({"event_id": event_id, **changelog_message(version, changelogs)})
+        db.add(OutboxMessage(event_id=event_id, topic="changelog", payload=payload))
+        payloads.append(payload)
+        db.delete(change)
+    return payloads
+
+
+def _pending(db: Session, event_id: int) -> List[PendingChange]:
+    return db.query(PendingChange).filter(PendingChange.event_id == event_id).order_by(PendingChange.id).all()
+
+
+def _publish(payloads: List[Dict[str, Any]]) -> None:
+    for payload in payloads:
+        get_broker().publish(event_channel(payload["event_id"]), payload)
+
+
+def flush_event(db: Session, event_id: int) -> None:
+    """
+    Expand an event's pending changes now, so that history reads see every
+    committed write. Waits for the changelog writer if it holds the event.
+    """
+    if settings.DEFERRED_VERSIONING:
+        # Pending changes are written to the primary; a lagging replica would
+        # hide them. The history reads that follow go to the primary as well.
+        db.info["read_only"] = False
+    if db.query(PendingChange.id).filter(PendingChange.event_id == event_id).first() is None:
+        return
+    db.info["read_only"] = False
+    # In a session of its own, so that the caller's transaction (and what
+    # its commit stands for, such as an idempotency key being applied) is
+    # left alone.
+    flush_db = SessionLocal()
+    try:
+        if flush_db.query(Event.id).filter(Event.id == event_id).with_for_update().first() is None:
+            return
+        payloads = _expand(flush_db, event_id, _pending(flush_db, event_id))
+        flush_db.commit()
+    finally:
+        flush_db.close()
+    _publish(payloads)
+
+
+def expand_pending(db: Session, batch_size: int = 100) -> int:
+    """
+    Expand the pending changes of up to ``batch_size`` events, oldest first, in
+    one transaction. Events locked by a concurrent writer or reader are left
+    for the next round. Returns the number of changes expanded.
+    """
+    event_ids = db.execute(
+        select(PendingChange.event_id)
+        .group_by(PendingChange.event_id)
+        .order_by(func.min(PendingChange.id))
+        .limit(batch_size)
+    ).scalars().all()
+    payloads = []
+    for event_id in event_ids:
+        if db.query(Event.id).filter(Event.id == event_id).with_for_update(skip_locked=True).first() is None:
+            # Either locked, or deleted without a database-side cascade.
+            db.query(PendingChange).filter(
+                PendingChange.event_id == event_id, ~exists().where(Event.id == event_id)
+            ).delete(synchronize_session=False)
+            continue
+        payloads.extend(_expand(db, event_id, _pending(db, event_id)))
+    db.commit()
+    _publish(payloads)
+    return len(payloads)
+
+
+class ChangelogWriter:
+    """Background thread that expands pending changes while there are any, then polls."""
+
+    def __init__(self, session_factory: Callable[[], Session], batch_size: int = 100, poll_interval: float = 0.5):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                expanded = expand_pending(db, self.batch_size)
+            except Exception:
+                logger.exception("Changelog expansion failed")
+                expanded = 0
+            finally:
+                db.close()
+            if not expanded:
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="changelog-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,50 @@
+"""
+SQL helpers for filtering inside JSON columns, so that the database does the
+matching (with the indexes declared in app.db.models on Postgres) instead of
+rows being loaded and inspected in Python.
+"""
+from typing import Any
+
+from sqlalchemy import Boolean, cast, func, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+def recurrence_frequency(pattern):
+    """
+    Lower-cased frequency of a ``recurrence_pattern``, read from the same keys
+    as ``app.core.recurrence.parse_pattern`` (``frequency``, ``freq``,
+    ``repeat``). Postgres has an expression index on exactly this.
+    """
+    return func.lower(func.coalesce(
+        pattern["frequency"].as_string(),
+        pattern["freq"].as_string(),
+        pattern["repeat"].as_string(),
+    ))
+
+
+class json_matches(FunctionElement):
+    """
+    ``column`` contains ``value``: JSONB containment (``@>``, served by a GIN
+    index) on Postgres. Other databases compare the stored document with the
+    serialised value, which agrees for scalars.
+    """
+    inherit_cache = True
+    type = Boolean()
+    name = "json_matches"
+
+    def __init__(self, column, value: Any):
+        super().__init__(column, literal(value, column.type))
+
+
+@compiles(json_matches, "postgresql")
+def _json_matches_postgresql(element, compiler, **kw):
+    column, value = element.clauses
+    return f"({compiler.process(column, **kw)} @> {compiler.process(cast(value, JSONB), **kw)})"
+
+
+@compiles(json_matches)
+def _json_matches(element, compiler, **kw):
+    column, value = element.clauses
+    return f"({compiler.process(column, **kw)} = {compiler.process(value, **kw)})"
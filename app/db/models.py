@@ -1,10 +1,16 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, JSON, Enum
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime, JSON, Enum, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from datetime import datetime
 
 from app.db.base_class import Base
+from app.db.documents import recurrence_frequency
+
+# JSON documents that are queried into: binary, indexable JSONB on Postgres,
+# plain JSON elsewhere.
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
 
 
 class UserRole(str, enum.Enum):
@@ -25,8 +31,8 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    owned_events = relationship("Event", back_populates="owner", cascade="all, delete-orphan")
-    event_permissions = relationship("EventPermission", back_populates="user", cascade="all, delete-orphan")
+    owned_events = relationship("Event", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    event_permissions = relationship("EventPermission", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Event(Base):
@@ -39,18 +45,21 @@ class Event(Base):
     end_time = Column(DateTime(timezone=True))
     location = Column(String, nullable=True)
     is_recurring = Column(Boolean, default=False)
-    recurrence_pattern = Column(JSON, nullable=True)
+    recurrence_pattern = Column(JSONDocument, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set when the event is deleted; the purge worker removes it for good
+    # once SOFT_DELETE_RETENTION_HOURS have passed.
+    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
     
     # Foreign Keys
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     
     # Relationships
     owner = relationship("User", back_populates="owned_events")
-    permissions = relationship("EventPermission", back_populates="event", cascade="all, delete-orphan")
-    versions = relationship("EventVersion", back_populates="event", cascade="all, delete-orphan")
-    changelogs = relationship("EventChangeLog", back_populates="event", cascade="all, delete-orphan")
+    permissions = relationship("EventPermission", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
+    versions = relationship("EventVersion", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
+    changelogs = relationship("EventChangeLog", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class EventPermission(Base):
@@ -68,13 +77,49 @@ class EventPermission(Base):
     user = relationship("User", back_populates="event_permissions")
 
 
+class UserEventAccess(Base):
+    """
+    One row per (user, event) the user can see: the owner plus every shared
+    user. Kept in step with events and event_permissions by the endpoints so
+    that listing a user's events is a single index range scan.
+    """
+    __tablename__ = "user_event_access"
+    __table_args__ = (Index("ix_user_event_access_user_start", "user_id", "start_time", "event_id"),)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True, index=True)
+    role = Column(Enum(UserRole), nullable=False)
+    start_time = Column(DateTime(timezone=True))
+
+
+class EventStats(Base):
+    """
+    Version count, collaborator count and last change of an event, kept up to
+    date by the write endpoints (see app.core.stats) so that summaries do not
+    count event_versions and event_permissions per event.
+    """
+    __tablename__ = "event_stats"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    version_count = Column(Integer, nullable=False, default=1)
+    collaborator_count = Column(Integer, nullable=False, default=0)
+    last_modified_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    last_modified_at = Column(DateTime(timezone=True))
+
+
 class EventVersion(Base):
     __tablename__ = "event_versions"
+    __table_args__ = (
+        Index("ix_event_versions_event_id_created_at", "event_id", "created_at"),
+        Index("ix_event_versions_event_id_version_number", "event_id", "version_number", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"))
     version_number = Column(Integer)
-    data = Column(JSON)  # Stores the complete event data at this version
+    data = Column(JSONDocument)  # Stores the complete event data at this version
+    # Set once ``data`` has been moved to this cold storage segment (see app.core.archive).
+    archived_segment = Column(Integer, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     change_description = Column(String, nullable=True)
@@ -82,22 +127,103 @@ class EventVersion(Base):
     # Relationships
     event = relationship("Event", back_populates="versions")
     user = relationship("User")
-    changelogs = relationship("EventChangeLog", back_populates="version", cascade="all, delete-orphan")
+    changelogs = relationship("EventChangeLog", back_populates="version", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class EventChangeLog(Base):
     __tablename__ = "event_changelog"
+    __table_args__ = (Index("ix_event_changelog_event_id_field_name", "event_id", "field_name"),)
 
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"))
     version_id = Column(Integer, ForeignKey("event_versions.id", ondelete="CASCADE"))
     field_name = Column(String)
-    old_value = Column(JSON, nullable=True)
-    new_value = Column(JSON, nullable=True)
+    old_value = Column(JSONDocument, nullable=True)
+    new_value = Column(JSONDocument, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
 
     # Relationships
     event = relationship("Event", back_populates="changelogs")
     version = relationship("EventVersion", back_populates="changelogs")
-    user = relationship("User") 
\ No newline at end of file
+    user = relationship("User") 
+
+
+# Postgres-only indexes into JSONB documents, for the filters in app.db.documents.
+Index("ix_events_recurrence_frequency", recurrence_frequency(Event.recurrence_pattern)).ddl_if(dialect="postgresql")
+Index(
+    "ix_event_changelog_new_value", EventChangeLog.new_value,
+    postgresql_using="gin", postgresql_ops={"new_value": "jsonb_path_ops"},
+).ddl_if(dialect="postgresql")
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (Index("ix_outbox_pending", "dispatched_at", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Not a foreign key: the "event_deleted" message must outlive its event.
+    event_id = Column(Integer, index=True)
+    topic = Column(String)
+    payload = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    available_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+
+
+class PendingChange(Base):
+    """
+    Compact record of an update written on the request path when versioning is
+    deferred; the changelog writer expands it into an EventVersion and its
+    EventChangeLog rows.
+    """
+    __tablename__ = "pending_changes"
+    __table_args__ = (Index("ix_pending_changes_event_id_version_number", "event_id", "version_number", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), index=True)
+    version_number = Column(Integer)
+    changes = Column(JSON)  # {field: new value}
+    description = Column(String, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    filename = Column(String)
+    format = Column(String)
+    status = Column(String, default="pending")
+    processed_rows = Column(Integer, default=0)
+    imported_rows = Column(Integer, default=0)
+    failed_rows = Column(Integer, default=0)
+    errors = Column(JSON, default=list)  # [{"row": line number, "error": message}, ...]
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class IdempotencyKey(Base):
+    """
+    Outcome of a request sent with an ``Idempotency-Key`` header. A row with
+    no status_code is a request still running (or that died mid-way);
+    applied_at is set in the same transaction as the request's first commit.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    route = Column(String)
+    fingerprint = Column(String(64))  # sha256 of method, path and body
+    status_code = Column(Integer, nullable=True)
+    response = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    applied_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), index=True)
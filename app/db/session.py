@@ -1,15 +1,243 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import logging
 import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
 
-DATABASE_URL = os.environ["DATABASE_URL"]
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine, uninstrument_engine
+
+logger = logging.getLogger(__name__)
+
+_engine: Optional[Engine] = None
+_replicas: Optional["ReplicaPool"] = None
+_recent_writes: Optional["RecentWrites"] = None
+_engine_lock = threading.Lock()
+
+
+def pool_options(url: str) -> Dict[str, Any]:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    if settings.DB_CONNECTION_BUDGET:
+        per_worker = max(1, settings.DB_CONNECTION_BUDGET // max(1, settings.WEB_CONCURRENCY))
+        return {"pool_size": per_worker, "max_overflow": 0, "pool_pre_ping": True}
+    return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW, "pool_pre_ping": True}
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    # Deletes rely on ON DELETE CASCADE, which SQLite only enforces when asked.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(url, **pool_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    return instrument_engine(engine)
+
+
+class ReplicaPool:
+    """
+    Round-robin over replica engines. A replica that fails to connect is taken
+    out of rotation for ``retry_after`` seconds and must pass a ``SELECT 1``
+    before it is used again.
+    """
+
+    def __init__(self, engines: List[Engine], retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        self._down_until: Dict[Engine, float] = {}
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine: Engine) -> None:
+        self._down_until[engine] = time.monotonic() + self.retry_after
+
+    def _healthy(self, engine: Engine) -> bool:
+        down_until = self._down_until.get(engine)
+        if down_until is None:
+            return True
+        if down_until > time.monotonic():
+            return False
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_down(engine)
+            return False
+        self._down_until.pop(engine, None)
+        return True
+
+    def choose(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._counter) % len(self.engines)]
+            if self._healthy(engine):
+                return engine
+        return None
+
+    def dispose(self, close: bool = True) -> None:
+        for engine in self.engines:
+            uninstrument_engine(engine)
+            engine.dispose(close=close)
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.DATABASE_URL)
+    return _engine
+
+
+def get_replicas() -> Optional[ReplicaPool]:
+    global _replicas
+    if _replicas is None and settings.DATABASE_REPLICA_URLS:
+        with _engine_lock:
+            if _replicas is None:
+                _replicas = ReplicaPool(
+                    [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+                    settings.REPLICA_RETRY_SECONDS,
+                )
+    return _replicas
+
+
+def dispose_engine(close: bool = True) -> None:
+    """Drop the engines so the next ``get_engine()`` call builds fresh pools."""
+    global _engine, _replicas
+    with _engine_lock:
+        if _engine is not None:
+            uninstrument_engine(_engine)
+            _engine.dispose(close=close)
+        if _replicas is not None:
+            _replicas.dispose(close=close)
+        _engine = None
+        _replicas = None
+
+
+def _after_fork_in_child() -> None:
+    # Pooled connections belong to the parent; closing them here would shut
+    # the parent's sockets, so just forget them and start new pools.
+    global _engine_lock
+    _engine_lock = threading.Lock()
+    dispose_engine(close=False)
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class RecentWrites:
+    """Time of each user's last committed write, within this process."""
+
+    def __init__(self):
+        self._written_at: Dict[int, float] = {}
+
+    def record(self, user_id: int) -> None:
+        now = time.monotonic()
+        if len(self._written_at) > 10000:
+            for other, written_at in list(self._written_at.items()):
+                if now - written_at >= settings.REPLICA_STICKY_SECONDS:
+                    self._written_at.pop(other, None)
+        self._written_at[user_id] = now
+
+    def recent(self, user_id: int) -> bool:
+        written_at = self._written_at.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < settings.REPLICA_STICKY_SECONDS
+
+
+class RedisRecentWrites:
+    """Shared by every worker: a key per user that expires after REPLICA_STICKY_SECONDS."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def record(self, user_id: int) -> None:
+        try:
+            self._redis.set(f"neofi:recent_write:{user_id}", 1, px=max(1, int(settings.REPLICA_STICKY_SECONDS * 1000)))
+        except Exception:
+            logger.exception("Could not record write of user %s", user_id)
+
+    def recent(self, user_id: int) -> bool:
+        try:
+            return bool(self._redis.exists(f"neofi:recent_write:{user_id}"))
+        except Exception:
+            # Unknown, so read from the primary.
+            return True
+
+
+def get_recent_writes() -> "RecentWrites":
+    global _recent_writes
+    if _recent_writes is None:
+        with _engine_lock:
+            if _recent_writes is None:
+                if settings.REPLICA_STICKY_BACKEND == "redis":
+                    if not settings.REDIS_URL:
+                        raise RuntimeError("REPLICA_STICKY_BACKEND=redis requires REDIS_URL")
+                    _recent_writes = RedisRecentWrites(settings.REDIS_URL)
+                else:
+                    _recent_writes = RecentWrites()
+    return _recent_writes
+
+
+def recently_wrote(user_id: Optional[int]) -> bool:
+    return user_id is not None and get_recent_writes().recent(user_id)
+
+
+class RoutingSession(Session):
+    """
+    Sends flushes, DML and every query of a non read-only session to the
+    primary. Sessions marked ``info["read_only"]`` read from one replica,
+    chosen at their first query, unless ``info["user_id"]`` committed a
+    write recently (read-your-writes).
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and not self._flushing and not getattr(clause, "is_dml", False):
+            if "replica" not in self.info:
+                # Pinned for the session, so all of a request's reads see the
+                # same replica lag.
+                replicas = get_replicas()
+                use_replica = replicas is not None and not recently_wrote(self.info.get("user_id"))
+                self.info["replica"] = replicas.choose() if use_replica else None
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return get_engine()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        get_recent_writes().record(session.info["user_id"])
+
+
+# Engines are resolved per statement by RoutingSession, and only created on
+# first use so that importing the app (CLI tools, test collection, pre-fork
+# masters) never opens a pool.
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -1,33 +1,125 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
-from app.api.v1.endpoints import auth, events
-
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-)
-
-# Set all CORS enabled origins
-if settings.BACKEND_CORS_ORIGINS:
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+
+@asynccontextmanager
+async def lifespan(app: "FastAPI"):
+    # Background workers start per process, after any pre-fork.
+    from app.core.config import settings
+
+    workers = []
+    if settings.OUTBOX_SINK_URL:
+        from app.core.outbox import OutboxDispatcher, sink_from_url
+        from app.db.session import SessionLocal
+
+        workers.append(OutboxDispatcher(
+            SessionLocal,
+            sink_from_url(settings.OUTBOX_SINK_URL),
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL,
+        ))
+    if settings.DEFERRED_VERSIONING:
+        from app.core.versioning import ChangelogWriter
+        from app.db.session import SessionLocal
+
+        workers.append(ChangelogWriter(
+            SessionLocal,
+            batch_size=settings.VERSIONING_BATCH_SIZE,
+            poll_interval=settings.VERSIONING_POLL_INTERVAL,
+        ))
+    if settings.PURGE_ENABLED:
+        from app.core.purge import PurgeWorker
+        from app.db.session import SessionLocal
+
+        workers.append(PurgeWorker(
+            SessionLocal,
+            batch_size=settings.PURGE_BATCH_SIZE,
+            poll_interval=settings.PURGE_POLL_INTERVAL,
+        ))
+    for worker in workers:
+        worker.start()
+    try:
+        yield
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+def create_app() -> "FastAPI":
+    # Imports live here so that importing app.main (pre-fork masters, CLI
+    # tools, test collection) does not pay for FastAPI, the ORM or settings.
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse
+    from app.core.config import settings
+    from app.core import metrics
+    from app.api.deps import get_profile_store
+    from app.api.v1.endpoints import admin, auth, events
+    from app.core.compression import CompressionMiddleware
+    from app.core.profiling import ProfilingMiddleware
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version=settings.VERSION,
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
-# Include routers
-app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-app.include_router(events.router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
+    # Set all CORS enabled origins
+    if settings.BACKEND_CORS_ORIGINS:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+    # Include routers
+    app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
+    app.include_router(events.router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
+    app.include_router(admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
+
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            encodings=settings.COMPRESSION_ENCODINGS,
+        )
+
+    if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=get_profile_store(),
+            token=settings.PROFILING_TOKEN,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+        )
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(metrics.MetricsMiddleware)
+        metrics.register_routes(app.routes)
+
+        @app.get("/metrics", include_in_schema=False)
+        def prometheus_metrics():
+            return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/")
+    def root():
+        return {
+            "message": "Welcome to NeoFi Event Management System API",
+            "docs_url": "/docs",
+            "redoc_url": "/redoc",
+        }
+
+    return app
 
 
-@app.get("/")
-def root():
-    return {
-        "message": "Welcome to NeoFi Event Management System API",
-        "docs_url": "/docs",
-        "redoc_url": "/redoc",
-    } 
\ No newline at end of file
+def __getattr__(name):
+    # Keeps `uvicorn app.main:app` working: the app is built on first access.
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, time
 from app.db.models import UserRole
 
 
@@ -33,6 +33,7 @@ class EventInDBBase(EventBase):
     owner_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
     version_number: Optional[int] = None
 
     class Config:
@@ -43,6 +44,41 @@ class Event(EventInDBBase):
     pass
 
 
+class EventBatchItem(BaseModel):
+    id: int
+    status: str  # "found", "forbidden" or "missing"
+    role: Optional[UserRole] = None
+    event: Optional[Event] = None
+
+
+class EventSummary(BaseModel):
+    event_id: int
+    version_count: int
+    collaborator_count: int
+    last_modified_by: Optional[int] = None
+    last_modified_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FreeSlotQuery(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=100)
+    start: datetime
+    end: datetime
+    duration_minutes: int = Field(..., gt=0)
+    working_hours_start: time = time(9)
+    working_hours_end: time = time(17)
+    timezone: str = "UTC"
+    weekdays: List[int] = [0, 1, 2, 3, 4]  # Monday is 0
+    limit: int = Field(50, gt=0, le=1000)
+
+
+class FreeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+
 class EventPermissionBase(BaseModel):
     user_id: int
     role: UserRole
@@ -86,6 +122,20 @@ class EventVersion(EventVersionBase):
         from_attributes = True
 
 
+class EventVersionSummary(BaseModel):
+    version_number: int
+    created_by: int
+    created_at: datetime
+    change_description: Optional[str] = None
+    changed_fields: List[str] = []
+
+
+class EventHistoryPage(BaseModel):
+    versions: List[EventVersionSummary]
+    # Pass as ``before`` to get the next (older) page; None on the last page.
+    next_cursor: Optional[int] = None
+
+
 class EventChangeLogBase(BaseModel):
     field_name: str
     old_value: Optional[Any] = None
@@ -107,4 +157,26 @@ class EventDiff(BaseModel):
     field_name: str
     old_value: Optional[Any] = None
     new_value: Optional[Any] = None
-    change_type: str 
\ No newline at end of file
+    change_type: str 
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportJob(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    format: str
+    status: str
+    processed_rows: int = 0
+    imported_rows: int = 0
+    failed_rows: int = 0
+    errors: List[ImportRowError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,60 @@
+"""
+Multi-process server entry point.
+
+    python -m app.server --workers 4 --bind 0.0.0.0:8000
+
+Runs gunicorn as a pre-fork master with uvicorn workers. The app is built once
+in the master (``create_app`` does not touch the database) and each forked
+worker creates its own engine on first use; ``app.db.session`` also discards
+any engine inherited across ``fork()``. Workers are recycled gracefully after
+``WORKER_MAX_REQUESTS`` (+ jitter) requests, and ``kill -HUP <master>`` rolls
+all workers without dropping in-flight requests.
+"""
+import argparse
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import settings
+
+
+class Server(BaseApplication):
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import create_app
+
+        return create_app()
+
+
+def build_options(workers: int, bind: str) -> Dict[str, Any]:
+    # Pool sizing reads WEB_CONCURRENCY, so keep it in step with --workers.
+    settings.WEB_CONCURRENCY = workers
+    return {
+        "bind": bind,
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.WORKER_GRACEFUL_TIMEOUT,
+        "raw_env": [f"WEB_CONCURRENCY={workers}"],
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes.")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to WEB_CONCURRENCY")
+    parser.add_argument("--bind", default="0.0.0.0:8000")
+    args = parser.parse_args(argv)
+    Server(build_options(args.workers or settings.WEB_CONCURRENCY, args.bind)).run()
+
+
+if __name__ == "__main__":
+    main()
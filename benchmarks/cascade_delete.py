@@ -0,0 +1,127 @@
+"""
+Cost of deleting a heavily edited event.
+
+    python benchmarks/cascade_delete.py --versions 10000
+
+Seeds an event with ``--versions`` versions, each with a changelog row, then
+deletes it three ways: with its collections loaded first, which is what the
+ORM did before the relationships were marked ``passive_deletes``; with a
+single ``DELETE`` that leaves the children to ``ON DELETE CASCADE``; and the
+way the purge worker does, ``--batch-size`` rows per transaction. Reports
+wall time, peak Python memory and statements sent. ``DATABASE_URL`` defaults
+to a temporary SQLite file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+START = datetime(2030, 1, 7, 9, tzinfo=timezone.utc)
+
+
+def seed(db, owner_id: int, versions: int) -> int:
+    from sqlalchemy import insert
+    from app.db.models import Event, EventChangeLog, EventPermission, EventVersion, UserEventAccess, UserRole
+
+    event_id = db.execute(
+        insert(Event).returning(Event.id),
+        {
+            "title": "v0", "description": "", "owner_id": owner_id, "start_time": START, "end_time": START + timedelta(hours=1),
+            "deleted_at": datetime(2000, 1, 1, tzinfo=timezone.utc),  # past the retention period
+        },
+    ).scalar_one()
+    version_ids = db.execute(
+        insert(EventVersion).returning(EventVersion.id, sort_by_parameter_order=True),
+        [
+            {"event_id": event_id, "version_number": n, "data": {"title": f"v{n}", "description": "x" * 200}, "created_by": owner_id}
+            for n in range(1, versions + 1)
+        ],
+    ).scalars().all()
+    db.execute(insert(EventChangeLog), [
+        {"event_id": event_id, "version_id": version_id, "field_name": "title", "old_value": f"v{n}", "new_value": f"v{n + 1}", "created_by": owner_id}
+        for n, version_id in enumerate(version_ids)
+    ])
+    db.execute(insert(EventPermission), {"event_id": event_id, "user_id": owner_id, "role": UserRole.OWNER})
+    db.execute(insert(UserEventAccess), {"user_id": owner_id, "event_id": event_id, "role": UserRole.OWNER, "start_time": START})
+    db.commit()
+    return event_id
+
+
+def measure(db, event_id: int, mode: str, batch_size: int):
+    from sqlalchemy import event as sa_event
+    from app.core.purge import purge_event
+    from app.db.models import Event
+    from app.db.session import get_engine
+
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    engine = get_engine()
+    sa_event.listen(engine, "before_cursor_execute", count)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        if mode == "purge":
+            purge_event(db, event_id, batch_size)
+        else:
+            event = db.get(Event, event_id)
+            if mode == "loaded":
+                for version in event.versions:
+                    version.changelogs
+                event.changelogs, event.permissions
+            db.delete(event)
+            db.commit()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        sa_event.remove(engine, "before_cursor_execute", count)
+    return elapsed * 1000, peak / 2**20, statements
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--versions", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from sqlalchemy import func, select
+    from app.db.base_class import Base
+    from app.db.models import EventChangeLog, EventVersion, User
+    from app.db.session import SessionLocal, get_engine
+
+    Base.metadata.create_all(get_engine())
+    db = SessionLocal()
+    try:
+        owner = User(email="cascade@bench", username="cascade", hashed_password="x", is_active=True)
+        db.add(owner)
+        db.commit()
+        print(f"{args.versions} versions and changelog rows per event")
+        print(f"{'delete':>8} {'ms':>9} {'peak MiB':>9} {'statements':>11}")
+        for mode in ("loaded", "passive", "purge"):
+            event_id = seed(db, owner.id, args.versions)
+            elapsed, peak, statements = measure(db, event_id, mode, args.batch_size)
+            left = db.execute(select(func.count()).select_from(EventVersion).where(EventVersion.event_id == event_id)).scalar()
+            left += db.execute(select(func.count()).select_from(EventChangeLog).where(EventChangeLog.event_id == event_id)).scalar()
+            assert left == 0, f"{left} child rows left behind"
+            print(f"{mode:>8} {elapsed:>9.1f} {peak:>9.1f} {statements:>11}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
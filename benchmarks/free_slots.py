@@ -0,0 +1,148 @@
+"""
+Latency of the common free slot finder.
+
+    python benchmarks/free_slots.py --users 50 --days 365 --runs 20
+
+Seeds ``--users`` users with four meetings per working day plus a few weekly
+recurring series over ``--days`` days, then times ``POST /api/events/free-slots``
+for all of them over a two-week and the largest allowed (31-day) window, and
+the in-memory computation on the same events on its own. ``DATABASE_URL`` defaults to a temporary SQLite file.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+START = datetime(2030, 1, 7, tzinfo=timezone.utc)  # a Monday
+
+
+def seed(users: int, days: int):
+    from sqlalchemy import insert
+    from app.db.base_class import Base
+    from app.db.models import Event, User, UserEventAccess, UserRole
+    from app.db.session import SessionLocal, get_engine
+
+    Base.metadata.create_all(get_engine())
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        user_ids = db.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [{"email": f"slots{i}@bench", "username": f"slots{i}", "hashed_password": "x", "is_active": True} for i in range(users)],
+        ).scalars().all()
+        rows = []
+        for user_id in user_ids:
+            for day in range(days):
+                date = START + timedelta(days=day)
+                if date.weekday() >= 5:
+                    continue
+                for hour in rng.sample(range(8, 18), 4):
+                    start = date + timedelta(hours=hour, minutes=rng.choice((0, 15, 30)))
+                    rows.append({"owner_id": user_id, "start": start, "end": start + timedelta(minutes=rng.choice((30, 45, 60)))})
+            for weekday in rng.sample(["MO", "TU", "WE", "TH", "FR"], 3):
+                start = START + timedelta(hours=rng.randrange(8, 18))
+                rows.append({"owner_id": user_id, "start": start, "end": start + timedelta(minutes=30), "by_day": weekday})
+        event_ids = db.execute(
+            insert(Event).returning(Event.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": "Busy", "description": "", "owner_id": r["owner_id"],
+                    "start_time": r["start"], "end_time": r["end"],
+                    "is_recurring": "by_day" in r,
+                    "recurrence_pattern": {"frequency": "weekly", "by_day": [r["by_day"]]} if "by_day" in r else None,
+                }
+                for r in rows
+            ],
+        ).scalars().all()
+        access = [
+            {"user_id": r["owner_id"], "event_id": event_id, "role": UserRole.OWNER, "start_time": r["start"]}
+            for r, event_id in zip(rows, event_ids)
+        ]
+        # The first user is shared one event of everyone else, which is what
+        # allows them to query everyone's free time.
+        first_event = {}
+        for r, event_id in zip(rows, event_ids):
+            first_event.setdefault(r["owner_id"], (event_id, r["start"]))
+        access += [
+            {"user_id": user_ids[0], "event_id": event_id, "role": UserRole.VIEWER, "start_time": start}
+            for owner_id, (event_id, start) in first_event.items()
+            if owner_id != user_ids[0]
+        ]
+        db.execute(insert(UserEventAccess), access)
+        db.commit()
+    finally:
+        db.close()
+    return list(user_ids), len(rows)
+
+
+def utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def timed(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+    from app.api.v1.endpoints.events import MAX_FREE_SLOT_WINDOW
+    from app.core.config import settings
+    from app.core.scheduling import find_free_slots
+    from app.core.security import create_access_token
+    from app.db.models import Event
+    from app.db.session import SessionLocal
+    from app.main import create_app
+
+    settings.RATE_LIMIT_ENABLED = False
+    user_ids, events = seed(args.users, args.days)
+    print(f"{args.users} users, {events} events over {args.days} days")
+
+    client = TestClient(create_app())
+    headers = {"Authorization": f"Bearer {create_access_token(user_ids[0])}"}
+    db = SessionLocal()
+    all_rows = db.execute(select(Event.start_time, Event.end_time, Event.is_recurring, Event.recurrence_pattern)).all()
+    db.close()
+
+    print(f"{'window':>10} {'what':>10} {'p50 ms':>8} {'p95 ms':>8} {'slots':>6}")
+    for label, window in (("2 weeks", timedelta(days=14)), (f"{MAX_FREE_SLOT_WINDOW.days} days", MAX_FREE_SLOT_WINDOW)):
+        end = START + window
+        # What the endpoint fetches for the window (SQLite returns naive UTC).
+        rows = [
+            r for r in all_rows
+            if utc(r.start_time) < end and (utc(r.end_time) > START or r.is_recurring)
+        ]
+        slots = find_free_slots(rows, START, end, timedelta(minutes=30), limit=1000)
+        p50, p95 = timed(lambda: find_free_slots(rows, START, end, timedelta(minutes=30), limit=1000), args.runs)
+        print(f"{label:>10} {'compute':>10} {p50:>8.1f} {p95:>8.1f} {len(slots):>6}")
+        query = {"user_ids": user_ids, "start": START.isoformat(), "end": end.isoformat(), "duration_minutes": 30, "limit": 1000}
+        p50, p95 = timed(lambda: client.post("/api/events/free-slots", json=query, headers=headers).raise_for_status(), args.runs)
+        print(f"{label:>10} {'endpoint':>10} {p50:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
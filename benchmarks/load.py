@@ -0,0 +1,391 @@
+"""
+End-to-end load benchmark for every auth and events route.
+
+    python benchmarks/load.py --profile small --concurrency 8 --requests 100
+    python benchmarks/load.py --save benchmarks/baselines/sqlite-small.json
+    python benchmarks/load.py --compare benchmarks/baselines/sqlite-small.json
+
+Seeds a dataset with ``benchmarks/seed.py``, then for each route counts the
+SQL statements of a single request and sends ``--requests`` requests from
+``--concurrency`` client threads to the app in-process, reporting p50, p95
+and p99 latency and the number of failed requests. ``--save`` writes the
+results as a baseline; ``--compare`` exits with status 1 when a route's p95
+grew by more than ``--tolerance`` or it sends more statements than the
+baseline. ``DATABASE_URL`` defaults to a temporary SQLite file; point it at
+an empty Postgres database to measure that instead.
+
+``GET /events/{id}/feed`` is left out: it streams until the event changes.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+sys.path.insert(0, BENCHMARKS)
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import seed  # noqa: E402
+
+CSV = "title,description,start_time,end_time,location\n" + "".join(
+    f"Imported {i},Load test,2031-02-{i + 1:02d}T09:00:00Z,2031-02-{i + 1:02d}T10:00:00Z,Room {i}\n" for i in range(10)
+)
+
+
+class Scenario(NamedTuple):
+    name: str
+    run: Callable[[Any, "Context", Any], Any]
+    # Builds one target per request (e.g. a fresh event to delete).
+    prepare: Optional[Callable[["Context", int], List[Any]]] = None
+    status: int = 200
+
+
+class Context:
+    def __init__(self, dataset: Dict[str, Any], emails: Dict[int, str], shares: Dict[int, List[int]]):
+        from app.core.security import create_access_token
+
+        self.user_ids = dataset["user_ids"]
+        self.event_ids = dataset["event_ids"]
+        self.owners = dataset["owners"]
+        self.versions = dataset["versions"] // len(self.event_ids)
+        self.emails = emails
+        self.shares = shares
+        self.tokens = {user_id: create_access_token(user_id) for user_id in self.user_ids}
+        self.slots = itertools.count()
+        self.lock = threading.Lock()
+        self.import_job: Optional[int] = None
+
+    def headers(self, user_id: int) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+    def free_time(self) -> datetime:
+        # Every call gets its own hour far from the seeded events, so creates never conflict.
+        with self.lock:
+            slot = next(self.slots)
+        return datetime(2040, 1, 1, tzinfo=timezone.utc) + timedelta(hours=slot)
+
+
+def new_events(ctx: Context, count: int, deleted: bool = False, share: bool = False) -> List[tuple]:
+    """Insert ``count`` events (with their first version and access rows); returns (event, owner, other user)."""
+    from sqlalchemy import insert
+    from app.db.models import Event, EventPermission, EventStats, EventVersion, UserEventAccess, UserRole
+    from app.db.session import SessionLocal
+
+    rng = random.Random(count)
+    rows = []
+    for _ in range(count):
+        start = ctx.free_time()
+        owner, other = rng.sample(ctx.user_ids, 2)
+        rows.append({
+            "title": "Pool", "description": "", "owner_id": owner, "start_time": start, "end_time": start + timedelta(minutes=30),
+            "deleted_at": datetime.now(timezone.utc) if deleted else None, "other": other,
+        })
+    db = SessionLocal()
+    try:
+        ids = db.execute(
+            insert(Event).returning(Event.id, sort_by_parameter_order=True),
+            [{k: v for k, v in row.items() if k != "other"} for row in rows],
+        ).scalars().all()
+        db.execute(insert(EventVersion), [
+            {"event_id": event_id, "version_number": 1, "data": {"title": "Pool"}, "created_by": row["owner_id"]}
+            for row, event_id in zip(rows, ids)
+        ])
+        access_rows = [
+            {"user_id": row["owner_id"], "event_id": event_id, "role": UserRole.OWNER, "start_time": row["start_time"]}
+            for row, event_id in zip(rows, ids)
+        ]
+        if share:
+            db.execute(insert(EventPermission), [
+                {"event_id": event_id, "user_id": row["other"], "role": UserRole.VIEWER} for row, event_id in zip(rows, ids)
+            ])
+            access_rows += [
+                {"user_id": row["other"], "event_id": event_id, "role": UserRole.VIEWER, "start_time": row["start_time"]}
+                for row, event_id in zip(rows, ids)
+            ]
+        db.execute(insert(UserEventAccess), access_rows)
+        db.execute(insert(EventStats), [
+            {"event_id": event_id, "version_count": 1, "collaborator_count": 1 if share else 0, "last_modified_by": row["owner_id"]}
+            for row, event_id in zip(rows, ids)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return [(event_id, row["owner_id"], row["other"]) for row, event_id in zip(rows, ids)]
+
+
+def register(client, ctx, rng):
+    unique = f"{threading.get_ident()}-{time.perf_counter_ns()}"
+    return client.post("/api/auth/register", json={"email": f"load{unique}@example.com", "username": f"load{unique}", "password": seed.PASSWORD})
+
+
+def login(client, ctx, rng):
+    return client.post("/api/auth/login", data={"username": ctx.emails[rng.choice(ctx.user_ids)], "password": seed.PASSWORD})
+
+
+def create_event(client, ctx, rng):
+    start = ctx.free_time()
+    event = {"title": "Load", "description": "Load test", "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=30)).isoformat()}
+    return client.post("/api/events", json=event, headers=ctx.headers(rng.choice(ctx.user_ids)))
+
+
+def free_slots(client, ctx, rng):
+    # The owner of an event and everyone it is shared with.
+    event_id = rng.choice(ctx.event_ids)
+    owner = ctx.owners[event_id]
+    query = {"user_ids": [owner, *ctx.shares.get(event_id, [])], **WINDOW, "duration_minutes": 30}
+    return client.post("/api/events/free-slots", json=query, headers=ctx.headers(owner))
+
+
+def batch(client, ctx, rng):
+    ids = ",".join(map(str, rng.sample(ctx.event_ids, 20)))
+    return client.get("/api/events/batch", params={"ids": ids}, headers=ctx.headers(rng.choice(ctx.user_ids)))
+
+
+def import_events(client, ctx, rng):
+    return client.post("/api/events/import", files={"file": ("load.csv", CSV, "text/csv")}, headers=ctx.headers(rng.choice(ctx.user_ids)))
+
+
+def import_job(client, ctx, rng):
+    return client.get(f"/api/events/import/{ctx.import_job}", headers=ctx.headers(ctx.user_ids[0]))
+
+
+def as_user(method: str, path: str, **kwargs):
+    """Request ``path`` as a random seeded user."""
+    def run(client, ctx, rng):
+        return client.request(method, path, headers=ctx.headers(rng.choice(ctx.user_ids)), **kwargs)
+    return run
+
+
+def as_owner(method: str, path: str, **kwargs):
+    """Request ``path`` for a random seeded ``{event}`` (and ``{version}``) as its owner."""
+    def run(client, ctx, rng):
+        event_id = rng.choice(ctx.event_ids)
+        url = path.format(event=event_id, version=rng.randrange(1, ctx.versions + 1), last=ctx.versions)
+        return client.request(method, url, headers=ctx.headers(ctx.owners[event_id]), **kwargs)
+    return run
+
+
+def on_target(method: str, path: str, body: Optional[Callable[[tuple], Any]] = None):
+    """Request ``path`` for a prepared (``{event}``, owner, ``{other}`` user) target as the owner."""
+    def run(client, ctx, rng, target):
+        event_id, owner, other = target
+        url = path.format(event=event_id, other=other)
+        return client.request(method, url, headers=ctx.headers(owner), json=body(target) if body else None)
+    run.takes_target = True
+    return run
+
+
+WINDOW = {"start": seed.START.isoformat(), "end": (seed.START + timedelta(days=14)).isoformat()}
+
+SCENARIOS = [
+    Scenario("auth.register", register),
+    Scenario("auth.login", login),
+    Scenario("auth.refresh", as_user("POST", "/api/auth/refresh")),
+    Scenario("auth.logout", as_user("POST", "/api/auth/logout")),
+    Scenario("events.create", create_event),
+    Scenario("events.list", as_user("GET", "/api/events", params={"limit": 100})),
+    Scenario("events.list_fields", as_user("GET", "/api/events", params={"limit": 100, "fields": "title,start_time,end_time"})),
+    Scenario("events.export", as_user("GET", "/api/events/export.ics", params=WINDOW)),
+    Scenario("events.batch", batch),
+    Scenario("events.free_slots", free_slots),
+    Scenario("events.as_of", as_user("GET", "/api/events/as-of", params={"at": seed.START.isoformat()})),
+    Scenario("events.import", import_events, status=202),
+    Scenario("events.import_job", import_job),
+    Scenario("events.get", as_owner("GET", "/api/events/{event}")),
+    Scenario("events.update", as_owner("PUT", "/api/events/{event}", json={"title": "Updated by load test"})),
+    Scenario("events.delete", on_target("DELETE", "/api/events/{event}"), prepare=lambda ctx, n: new_events(ctx, n)),
+    Scenario("events.restore", on_target("POST", "/api/events/{event}/restore"), prepare=lambda ctx, n: new_events(ctx, n, deleted=True)),
+    Scenario(
+        "events.share",
+        on_target("POST", "/api/events/{event}/share", body=lambda t: {"user_id": t[2], "role": "viewer"}),
+        prepare=lambda ctx, n: new_events(ctx, n),
+    ),
+    Scenario("events.permissions", as_owner("GET", "/api/events/{event}/permissions")),
+    Scenario(
+        "events.update_permission",
+        on_target("PUT", "/api/events/{event}/permissions/{other}", body=lambda t: {"role": "editor"}),
+        prepare=lambda ctx, n: new_events(ctx, n, share=True),
+    ),
+    Scenario(
+        "events.delete_permission",
+        on_target("DELETE", "/api/events/{event}/permissions/{other}"),
+        prepare=lambda ctx, n: new_events(ctx, n, share=True),
+    ),
+    Scenario("events.summary", as_owner("GET", "/api/events/{event}/summary")),
+    Scenario("events.history_page", as_owner("GET", "/api/events/{event}/history")),
+    Scenario("events.history", as_owner("GET", "/api/events/{event}/history/{version}")),
+    Scenario("events.rollback", as_owner("POST", "/api/events/{event}/rollback/1")),
+    Scenario("events.changelog", as_owner("GET", "/api/events/{event}/changelog")),
+    Scenario("events.diff", as_owner("GET", "/api/events/{event}/diff/1/{last}")),
+]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+
+
+def run_scenario(app, ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event as sa_event
+    from app.db.session import get_engine
+
+    takes_target = getattr(scenario.run, "takes_target", False)
+    targets = scenario.prepare(ctx, requests + 1) if scenario.prepare else []
+
+    def call(client, rng, i):
+        return scenario.run(client, ctx, rng, targets[i]) if takes_target else scenario.run(client, ctx, rng)
+
+    # Statements of one request, measured alone so nothing else is counted.
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    engine = get_engine()
+    client = TestClient(app, raise_server_exceptions=False)
+    sa_event.listen(engine, "before_cursor_execute", count)
+    try:
+        call(client, random.Random(0), requests)
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count)
+
+    work: "queue.Queue[int]" = queue.Queue()
+    for i in range(requests):
+        work.put(i)
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(n):
+        nonlocal errors
+        client = TestClient(app, raise_server_exceptions=False)
+        rng = random.Random(n)
+        while True:
+            try:
+                i = work.get_nowait()
+            except queue.Empty:
+                return
+            started = time.perf_counter()
+            try:
+                ok = call(client, rng, i).status_code == scenario.status
+            except Exception:
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50": round(statistics.median(latencies), 2),
+        "p95": round(percentile(latencies, 0.95), 2),
+        "p99": round(percentile(latencies, 0.99), 2),
+        "rps": round(len(latencies) / wall, 1),
+        "queries": statements,
+        "errors": errors,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline["routes"].get(name)
+        if base is None:
+            continue
+        if result["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95']:.1f} ms vs {base['p95']:.1f} ms")
+        if result["queries"] > base["queries"]:
+            regressions.append(f"{name}: {result['queries']} statements vs {base['queries']}")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors vs {base['errors']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=seed.PROFILES, default="small")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="requests per route")
+    parser.add_argument("--routes", nargs="*", help="only these scenarios, e.g. events.list auth.login")
+    parser.add_argument("--save", help="write the results to this baseline file")
+    parser.add_argument("--compare", help="baseline file to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.db.base_class import Base
+    from app.db.models import EventPermission, User
+    from app.db.session import SessionLocal, get_engine
+    from app.main import create_app
+
+    settings.RATE_LIMIT_ENABLED = False
+    Base.metadata.create_all(get_engine())
+    db = SessionLocal()
+    try:
+        dataset = seed.generate(db, *seed.PROFILES[args.profile])
+        emails = dict(db.execute(select(User.id, User.email).where(User.id.in_(dataset["user_ids"]))).all())
+        shares: Dict[int, List[int]] = {}
+        for event_id, user_id in db.execute(select(EventPermission.event_id, EventPermission.user_id)):
+            shares.setdefault(event_id, []).append(user_id)
+    finally:
+        db.close()
+    ctx = Context(dataset, emails, shares)
+    app = create_app()
+
+    from fastapi.testclient import TestClient
+    ctx.import_job = TestClient(app).post(
+        "/api/events/import", files={"file": ("load.csv", CSV, "text/csv")}, headers=ctx.headers(ctx.user_ids[0])
+    ).json()["id"]
+
+    backend = get_engine().dialect.name
+    print(f"{backend}, profile {args.profile}: {len(ctx.user_ids)} users, {len(ctx.event_ids)} events, "
+          f"{dataset['versions']} versions, {dataset['permissions']} shares; concurrency {args.concurrency}")
+    print(f"{'route':<26} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'errors':>7}")
+    results = {}
+    for scenario in SCENARIOS:
+        if args.routes and scenario.name not in args.routes:
+            continue
+        result = results[scenario.name] = run_scenario(app, ctx, scenario, args.requests, args.concurrency)
+        print(f"{scenario.name:<26} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['p99']:>8.1f} "
+              f"{result['rps']:>8.1f} {result['queries']:>8} {result['errors']:>7}")
+
+    if args.save:
+        meta = {
+            "backend": backend, "profile": args.profile, "concurrency": args.concurrency, "requests": args.requests,
+            "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+        }
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "routes": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Throughput scaling of the pre-fork server across worker counts.
+
+    python benchmarks/prefork_scaling.py --workers 1 2 4 --concurrency 32 --duration 10
+
+For each worker count this starts ``python -m app.server`` against a fresh
+database, drives ``GET /api/events/{id}`` from a pool of client threads and
+reports requests per second. ``DATABASE_URL`` defaults to a temporary SQLite
+file; point it at Postgres to include real pool behaviour.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare_database(url: str) -> None:
+    from sqlalchemy import create_engine
+    from app.db.base_class import Base
+    import app.db.models  # noqa: F401
+
+    Base.metadata.create_all(create_engine(url))
+
+
+def wait_until_up(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base_url + "/", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def seed(base_url: str):
+    unique = uuid.uuid4().hex[:8]
+    user = {"email": f"bench_{unique}@example.com", "username": f"bench_{unique}", "password": "benchpass"}
+    httpx.post(base_url + "/api/auth/register", json=user).raise_for_status()
+    token = httpx.post(base_url + "/api/auth/login", data={"username": user["email"], "password": user["password"]}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    event = {"title": "Bench", "description": "Desc", "start_time": "2030-01-01T10:00:00Z", "end_time": "2030-01-01T11:00:00Z"}
+    event_id = httpx.post(base_url + "/api/events", json=event, headers=headers).json()["id"]
+    return headers, event_id
+
+
+def drive(base_url: str, headers, event_id: int, concurrency: int, duration: float) -> float:
+    stop = time.monotonic() + duration
+    counts = [0] * concurrency
+
+    def worker(i):
+        with httpx.Client(base_url=base_url, headers=headers) as client:
+            while time.monotonic() < stop:
+                if client.get(f"/api/events/{event_id}").status_code == 200:
+                    counts[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"cpu cores: {os.cpu_count()}")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        db_url = os.environ.get("DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+        prepare_database(db_url)
+        port = free_port()
+        env = {
+            **os.environ,
+            "DATABASE_URL": db_url,
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "bench-secret"),
+            "ALGORITHM": os.environ.get("ALGORITHM", "HS256"),
+            "ACCESS_TOKEN_EXPIRE_MINUTES": os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "60"),
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.server", "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_up(base_url)
+            headers, event_id = seed(base_url)
+            rps = drive(base_url, headers, event_id, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        baseline = baseline or rps
+        print(f"{workers:>8} {rps:>10.1f} {rps / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Synthetic dataset generator.
+
+    python benchmarks/seed.py --profile medium
+    python benchmarks/seed.py --users 5000 --events-per-user 40 --versions 30 --shares 8
+
+Fills ``DATABASE_URL`` with users, events whose times overlap within and
+across users, deep version histories with their changelog rows, and a dense
+share graph (permissions plus the matching ``user_event_access`` rows), with
+their ``event_stats`` summaries, all with bulk inserts. Every user's password
+is ``benchpass``. The tables are created if missing; existing rows are left
+alone, so run it against an empty database to get exactly the requested
+volumes.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+PASSWORD = "benchpass"
+START = datetime(2030, 1, 7, tzinfo=timezone.utc)  # a Monday
+# users, events per user, versions per event, shares per event
+PROFILES = {
+    "small": (200, 20, 10, 3),
+    "medium": (2000, 40, 20, 6),
+    "large": (10000, 100, 30, 10),
+}
+CHUNK = 10000
+TITLES = ("Standup", "Planning", "1:1", "Design review", "Retro", "Interview", "Lunch", "Customer call", "Offsite")
+LOCATIONS = ("Room 1", "Room 2", "Room 3", "Video call", None)
+
+
+def _chunks(rows: List[Dict[str, Any]]) -> Iterable[List[Dict[str, Any]]]:
+    for i in range(0, len(rows), CHUNK):
+        yield rows[i:i + CHUNK]
+
+
+def _insert_returning_ids(db, model, rows: List[Dict[str, Any]]) -> List[int]:
+    from sqlalchemy import insert
+
+    ids: List[int] = []
+    for chunk in _chunks(rows):
+        ids.extend(db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), chunk).scalars())
+    return ids
+
+
+def _insert(db, model, rows: List[Dict[str, Any]]) -> None:
+    from sqlalchemy import insert
+
+    for chunk in _chunks(rows):
+        db.execute(insert(model), chunk)
+
+
+def _snapshot(event: Dict[str, Any], event_id: int, title: str, updated_at: datetime) -> Dict[str, Any]:
+    return {
+        "id": event_id,
+        "title": title,
+        "description": event["description"],
+        "start_time": event["start_time"].isoformat(),
+        "end_time": event["end_time"].isoformat(),
+        "location": event["location"],
+        "is_recurring": event["is_recurring"],
+        "recurrence_pattern": event["recurrence_pattern"],
+        "owner_id": event["owner_id"],
+        "created_at": event["created_at"].isoformat(),
+        "updated_at": updated_at.isoformat(),
+        "deleted_at": None,
+    }
+
+
+def generate(db, users: int, events_per_user: int, versions: int, shares: int, seed: int = 42) -> Dict[str, Any]:
+    """
+    Insert the dataset and commit. Returns the ids of the new users and
+    events so that callers can pick realistic targets.
+    """
+    from app.core.security import get_password_hash
+    from app.db.models import Event, EventChangeLog, EventPermission, EventStats, EventVersion, User, UserEventAccess, UserRole
+
+    rng = random.Random(seed)
+    tag = f"{seed}-{int(time.time() * 1000)}"
+    hashed = get_password_hash(PASSWORD)
+    user_ids = _insert_returning_ids(db, User, [
+        {"email": f"seed{i}-{tag}@example.com", "username": f"seed{i}-{tag}", "hashed_password": hashed, "is_active": True}
+        for i in range(users)
+    ])
+
+    # Events fall on working hours over ~13 weeks, so many overlap with
+    # events of other users and some with the owner's own.
+    events: List[Dict[str, Any]] = []
+    for owner_id in user_ids:
+        for _ in range(events_per_user):
+            start = START + timedelta(days=rng.randrange(91), hours=rng.randrange(8, 18), minutes=rng.choice((0, 15, 30, 45)))
+            recurring = rng.random() < 0.1
+            events.append({
+                "title": rng.choice(TITLES),
+                "description": f"Synthetic event for load testing ({rng.randrange(10**6)})",
+                "start_time": start,
+                "end_time": start + timedelta(minutes=rng.choice((15, 30, 45, 60, 90, 120))),
+                "location": rng.choice(LOCATIONS),
+                "is_recurring": recurring,
+                "recurrence_pattern": {"frequency": "weekly", "count": rng.randrange(4, 20)} if recurring else None,
+                "owner_id": owner_id,
+                "created_at": START - timedelta(days=rng.randrange(30, 400)),
+            })
+    event_ids = _insert_returning_ids(db, Event, events)
+
+    version_rows: List[Dict[str, Any]] = []
+    for event, event_id in zip(events, event_ids):
+        created = event["created_at"]
+        for number in range(1, versions + 1):
+            title = event["title"] if number == 1 else f"{event['title']} (rev {number})"
+            version_rows.append({
+                "event_id": event_id,
+                "version_number": number,
+                "data": _snapshot(event, event_id, title, created),
+                "created_by": event["owner_id"],
+                "created_at": created,
+                "change_description": "Initial version" if number == 1 else "Event updated",
+            })
+            created += timedelta(hours=rng.randrange(1, 72))
+    version_ids = _insert_returning_ids(db, EventVersion, version_rows)
+    _insert(db, EventChangeLog, [
+        {
+            "event_id": row["event_id"],
+            "version_id": version_id,
+            "field_name": "title",
+            "old_value": version_rows[i - 1]["data"]["title"],
+            "new_value": row["data"]["title"],
+            "created_by": row["created_by"],
+            "created_at": row["created_at"],
+        }
+        for i, (row, version_id) in enumerate(zip(version_rows, version_ids))
+        if row["version_number"] > 1
+    ])
+
+    permissions: List[Dict[str, Any]] = []
+    access_rows: List[Dict[str, Any]] = []
+    stats_rows: List[Dict[str, Any]] = []
+    for i, (event, event_id) in enumerate(zip(events, event_ids)):
+        access_rows.append({"user_id": event["owner_id"], "event_id": event_id, "role": UserRole.OWNER, "start_time": event["start_time"]})
+        sampled = rng.sample(user_ids, min(shares + 1, len(user_ids)))
+        collaborators = [u for u in sampled if u != event["owner_id"]][:shares]
+        for user_id in collaborators:
+            role = UserRole.EDITOR if rng.random() < 0.3 else UserRole.VIEWER
+            permissions.append({"event_id": event_id, "user_id": user_id, "role": role})
+            access_rows.append({"user_id": user_id, "event_id": event_id, "role": role, "start_time": event["start_time"]})
+        latest = version_rows[(i + 1) * versions - 1] if versions else None
+        stats_rows.append({
+            "event_id": event_id,
+            "version_count": versions,
+            "collaborator_count": len(collaborators),
+            "last_modified_by": latest["created_by"] if latest else None,
+            "last_modified_at": latest["created_at"] if latest else None,
+        })
+    _insert(db, EventPermission, permissions)
+    _insert(db, UserEventAccess, access_rows)
+    _insert(db, EventStats, stats_rows)
+    db.commit()
+    return {
+        "user_ids": user_ids,
+        "event_ids": event_ids,
+        "owners": {event_id: event["owner_id"] for event, event_id in zip(events, event_ids)},
+        "versions": len(version_rows),
+        "permissions": len(permissions),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=PROFILES, default="small")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--events-per-user", type=int)
+    parser.add_argument("--versions", type=int, help="versions per event")
+    parser.add_argument("--shares", type=int, help="users each event is shared with")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    users, events_per_user, versions, shares = PROFILES[args.profile]
+
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, get_engine
+    import app.db.models  # noqa: F401
+
+    Base.metadata.create_all(get_engine())
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        dataset = generate(
+            db,
+            args.users or users,
+            args.events_per_user or events_per_user,
+            args.versions or versions,
+            args.shares if args.shares is not None else shares,
+            args.seed,
+        )
+    finally:
+        db.close()
+    print(
+        f"{len(dataset['user_ids'])} users, {len(dataset['event_ids'])} events, {dataset['versions']} versions, "
+        f"{dataset['permissions']} shares in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+from app.core.config import settings
+from app.main import create_app
 import uuid
 
+@pytest.fixture(scope="session", autouse=True)
+def disable_rate_limits():
+    # Every test registers and logs in from the same client address.
+    settings.RATE_LIMIT_ENABLED = False
+
 @pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    return TestClient(create_app())
 
 @pytest.fixture
 def user_data():
@@ -0,0 +1,75 @@
+import uuid
+
+from app import cli
+from app.core import access
+from app.db.models import UserEventAccess
+from app.db.session import SessionLocal
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "AccessEvent",
+        "description": "Desc",
+        "start_time": "2025-11-01T09:00:00Z",
+        "end_time": "2025-11-01T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def register(client):
+    unique = str(uuid.uuid4())[:8]
+    data = {"email": f"access_{unique}@example.com", "username": f"access_{unique}", "password": "accesspass"}
+    user_id = client.post("/api/auth/register", json=data).json()["id"]
+    resp = client.post("/api/auth/login", data={"username": data["email"], "password": data["password"]})
+    return user_id, {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+def listed_ids(client, headers):
+    return {e["id"] for e in client.get("/api/events", params={"limit": 10000}, headers=headers).json()}
+
+def access_row(event_id, user_id):
+    db = SessionLocal()
+    try:
+        return db.get(UserEventAccess, (user_id, event_id))
+    finally:
+        db.close()
+
+def test_access_follows_sharing_and_updates(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    user_id, headers = register(client)
+    assert event_id not in listed_ids(client, headers)
+
+    client.post(f"/api/events/{event_id}/share", json={"user_id": user_id, "role": "viewer"}, headers=auth_headers)
+    assert event_id in listed_ids(client, headers)
+    client.put(f"/api/events/{event_id}/permissions/{user_id}", json={"role": "editor"}, headers=auth_headers)
+    assert access_row(event_id, user_id).role.value == "editor"
+
+    client.put(f"/api/events/{event_id}", json={"start_time": "2025-11-01T08:00:00Z"}, headers=auth_headers)
+    assert access_row(event_id, user_id).start_time.hour == 8
+
+    client.delete(f"/api/events/{event_id}/permissions/{user_id}", headers=auth_headers)
+    assert event_id not in listed_ids(client, headers)
+    assert event_id in listed_ids(client, auth_headers)
+
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    assert event_id not in listed_ids(client, auth_headers)
+
+def test_check_and_rebuild(client, auth_headers, capsys):
+    event_id = create_event_and_get_id(client, auth_headers)
+    db = SessionLocal()
+    try:
+        assert access.check(db) == {"missing": 0, "unexpected": 0}
+        db.query(UserEventAccess).filter(UserEventAccess.event_id == event_id).delete()
+        db.commit()
+        assert access.check(db) == {"missing": 1, "unexpected": 0}
+    finally:
+        db.close()
+
+    assert cli.main(["access", "check"]) == 1
+    assert cli.main(["access", "rebuild"]) == 0
+    assert cli.main(["access", "check"]) == 0
+    assert "0 missing, 0 unexpected" in capsys.readouterr().out
+    assert event_id in listed_ids(client, auth_headers)
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+
+from app import cli
+from app.core import archive
+from app.db.models import EventVersion
+from app.db.session import SessionLocal
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "ArchivedEvent",
+        "description": "Desc",
+        "start_time": "2025-10-01T09:00:00Z",
+        "end_time": "2025-10-01T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def backdate_versions(event_id):
+    db = SessionLocal()
+    try:
+        db.query(EventVersion).filter(EventVersion.event_id == event_id).update(
+            {EventVersion.created_at: datetime(2000, 1, 1, tzinfo=timezone.utc)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def stored_versions(event_id):
+    db = SessionLocal()
+    try:
+        return {
+            v.version_number: (v.data, v.archived_segment)
+            for v in db.query(EventVersion).filter(EventVersion.event_id == event_id)
+        }
+    finally:
+        db.close()
+
+def test_segment_round_trip(tmp_path):
+    documents = [(version_id, {"title": f"v{version_id}"}) for version_id in (7, 3, 12, 5)]
+    segment = archive.write_segment(str(tmp_path), documents)
+    assert archive.write_segment(str(tmp_path), documents[:1]) == segment + 1
+    reader = archive.ArchiveReader(str(tmp_path), max_open=1)
+    try:
+        for version_id, data in documents:
+            assert reader.read(segment, version_id) == data
+        assert reader.read(segment, 4) is None
+        assert reader.read(segment + 1, 7) == {"title": "v7"}
+    finally:
+        reader.close()
+
+def test_archived_versions_are_read_from_segments(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive.settings, "ARCHIVE_DIR", str(tmp_path))
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Second"}, headers=auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Third"}, headers=auth_headers)
+    before = {n: client.get(f"/api/events/{event_id}/history/{n}", headers=auth_headers).json()["data"] for n in (1, 2, 3)}
+    backdate_versions(event_id)
+
+    assert cli.main(["archive", "--older-than-days", str((datetime.now(timezone.utc) - datetime(2001, 1, 1, tzinfo=timezone.utc)).days)]) == 0
+    stored = stored_versions(event_id)
+    assert stored[1][0] is None and stored[2][0] is None and stored[1][1] is not None
+    assert stored[3][0]["title"] == "Third" and stored[3][1] is None  # the latest stays hot
+
+    for n in (1, 2, 3):
+        assert client.get(f"/api/events/{event_id}/history/{n}", headers=auth_headers).json()["data"] == before[n]
+    diffs = client.get(f"/api/events/{event_id}/diff/1/2", headers=auth_headers).json()
+    assert {"field_name": "title", "old_value": "ArchivedEvent", "new_value": "Second", "change_type": "modified"} in diffs
+    as_of = client.get("/api/events/as-of", params={"at": "2000-06-01T00:00:00Z", "limit": 10000}, headers=auth_headers).json()
+    assert [v["data"]["title"] for v in as_of if v["event_id"] == event_id] == ["Third"]
+    # Reading must not write the data back.
+    assert stored_versions(event_id)[1][0] is None
+
+def test_missing_segment_is_service_unavailable(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive.settings, "ARCHIVE_DIR", str(tmp_path / "segments"))
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Second"}, headers=auth_headers)
+    backdate_versions(event_id)
+    assert cli.main(["archive", "--older-than-days", str((datetime.now(timezone.utc) - datetime(2001, 1, 1, tzinfo=timezone.utc)).days)]) == 0
+    # As if the segments had not been restored with the database.
+    monkeypatch.setattr(archive.settings, "ARCHIVE_DIR", str(tmp_path / "empty"))
+    assert client.get(f"/api/events/{event_id}/history/1", headers=auth_headers).status_code == 503
+    assert client.get(f"/api/events/{event_id}/diff/1/2", headers=auth_headers).status_code == 503
+    assert client.post(f"/api/events/{event_id}/rollback/1", headers=auth_headers).status_code == 503
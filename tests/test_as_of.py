@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from app.db.models import EventVersion
+from app.db.session import SessionLocal
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "AsOfEvent",
+        "description": "Desc",
+        "start_time": "2025-10-01T09:00:00Z",
+        "end_time": "2025-10-01T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def set_version_times(event_id, *times):
+    db = SessionLocal()
+    try:
+        for number, created_at in enumerate(times, start=1):
+            db.query(EventVersion).filter(
+                EventVersion.event_id == event_id, EventVersion.version_number == number
+            ).update({"created_at": created_at})
+        db.commit()
+    finally:
+        db.close()
+
+def as_of(client, auth_headers, event_id, at):
+    resp = client.get("/api/events/as-of", params={"at": at, "limit": 10000}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    return [v for v in resp.json() if v["event_id"] == event_id]
+
+def test_as_of_returns_version_current_at_time(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "AsOfEvent v2"}, headers=auth_headers)
+    set_version_times(event_id, datetime(2020, 1, 1), datetime(2020, 6, 1))
+
+    assert as_of(client, auth_headers, event_id, "2019-12-31T00:00:00Z") == []
+    [version] = as_of(client, auth_headers, event_id, "2020-03-01T00:00:00Z")
+    assert version["version_number"] == 1
+    assert version["data"]["title"] == "AsOfEvent"
+    [version] = as_of(client, auth_headers, event_id, "2020-06-01T02:00:00+02:00")
+    assert version["version_number"] == 2
+    assert version["data"]["title"] == "AsOfEvent v2"
+
+def test_as_of_requires_timestamp(client, auth_headers):
+    resp = client.get("/api/events/as-of", headers=auth_headers)
+    assert resp.status_code == 422
@@ -0,0 +1,50 @@
+import uuid
+
+
+def create_event_and_get_id(client, auth_headers, title="BatchEvent", day=1):
+    event_data = {
+        "title": title,
+        "description": "Desc",
+        "start_time": f"2026-03-{day:02d}T09:00:00Z",
+        "end_time": f"2026-03-{day:02d}T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def other_user(client):
+    unique = str(uuid.uuid4())[:8]
+    data = {"email": f"batch_{unique}@example.com", "username": f"batch_{unique}", "password": "batchpass"}
+    user_id = client.post("/api/auth/register", json=data).json()["id"]
+    resp = client.post("/api/auth/login", data={"username": data["email"], "password": data["password"]})
+    return user_id, {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+def test_batch_reports_each_id(client):
+    user_id, auth_headers = other_user(client)
+    _, headers = other_user(client)
+    own = create_event_and_get_id(client, auth_headers)
+    shared = create_event_and_get_id(client, headers, title="Shared")
+    hidden = create_event_and_get_id(client, headers, title="Hidden", day=2)
+    client.post(f"/api/events/{shared}/share", json={"user_id": user_id, "role": "viewer"}, headers=headers)
+    client.put(f"/api/events/{shared}", json={"title": "Shared v2"}, headers=headers)
+
+    resp = client.get("/api/events/batch", params={"ids": f"{hidden},{own},999999,{shared},{own}"}, headers=auth_headers)
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [(r["id"], r["status"], r["role"]) for r in results] == [
+        (hidden, "forbidden", None),
+        (own, "found", "owner"),
+        (999999, "missing", None),
+        (shared, "found", "viewer"),
+    ]
+    assert results[1]["event"]["version_number"] == 1
+    assert results[3]["event"]["title"] == "Shared v2"
+    assert results[3]["event"]["version_number"] == 2
+    assert results[0]["event"] is None
+
+def test_batch_validates_ids(client, auth_headers):
+    assert client.get("/api/events/batch", params={"ids": "1,x"}, headers=auth_headers).status_code == 400
+    assert client.get("/api/events/batch", params={"ids": ",".join(map(str, range(101)))}, headers=auth_headers).status_code == 400
@@ -1,3 +1,5 @@
+import json
+
 def create_event_and_get_id(client, auth_headers):
     event_data = {
         "title": "ChangelogEvent",
@@ -26,4 +28,19 @@ def test_get_event_changelog(client, auth_headers):
 
 def test_changelog_not_found(client, auth_headers):
     resp = client.get("/api/events/99999/changelog", headers=auth_headers)
-    assert resp.status_code in (403, 404) 
\ No newline at end of file
+    assert resp.status_code in (403, 404)
+
+def test_filter_changelog_by_field_and_value(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "First", "location": "Room 1"}, headers=auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Second"}, headers=auth_headers)
+    client.put(f"/api/events/{event_id}", json={"recurrence_pattern": {"frequency": "weekly", "count": 3}}, headers=auth_headers)
+
+    titles = client.get(f"/api/events/{event_id}/changelog", params={"field": "title"}, headers=auth_headers).json()
+    assert [c["new_value"] for c in titles] == ["Second", "First"]
+    moved = client.get(f"/api/events/{event_id}/changelog", params={"value": "Room 1"}, headers=auth_headers).json()
+    assert [(c["field_name"], c["new_value"]) for c in moved] == [("location", "Room 1")]
+    assert client.get(f"/api/events/{event_id}/changelog", params={"field": "title", "value": "Room 1"}, headers=auth_headers).json() == []
+    pattern = {"frequency": "weekly", "count": 3}
+    resp = client.get(f"/api/events/{event_id}/changelog", params={"value": json.dumps(pattern)}, headers=auth_headers)
+    assert [c["new_value"] for c in resp.json()] == [pattern]
@@ -0,0 +1,50 @@
+from app.core.compression import choose_encoding
+
+
+def create_events(client, auth_headers, count):
+    for i in range(count):
+        event_data = {
+            "title": f"CompressedEvent {i}",
+            "description": "A fairly repetitive description " * 4,
+            "start_time": f"2026-01-{i + 1:02d}T09:00:00Z",
+            "end_time": f"2026-01-{i + 1:02d}T10:00:00Z",
+            "location": "Test",
+            "is_recurring": False,
+            "recurrence_pattern": {"repeat": "none"}
+        }
+        resp = client.post("/api/events", json=event_data, headers=auth_headers)
+        assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+
+def test_large_responses_are_compressed(client, auth_headers):
+    create_events(client, auth_headers, 10)
+    resp = client.get("/api/events", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert len(resp.json()) >= 10
+    assert "http_response_compression_ratio_count{encoding=\"gzip\"}" in client.get("/metrics").text
+
+def test_small_and_unaccepted_responses_are_not_compressed(client, auth_headers):
+    resp = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+    create_events(client, auth_headers, 10)
+    resp = client.get("/api/events", headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in resp.headers
+    resp = client.get("/api/events", headers={**auth_headers, "Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in resp.headers
+
+def test_streamed_export_is_compressed(client, auth_headers):
+    create_events(client, auth_headers, 10)
+    resp = client.get("/api/events/export.ics", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    assert resp.text.endswith("END:VCALENDAR\r\n")
+
+def test_choose_encoding():
+    encodings = ["zstd", "br", "gzip"]
+    assert choose_encoding("gzip, deflate, br", encodings) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", encodings) == "gzip"
+    assert choose_encoding("*", encodings) == "zstd"
+    assert choose_encoding("*, zstd;q=0", encodings) == "br"
+    assert choose_encoding("deflate", encodings) is None
+    assert choose_encoding("", encodings) is None
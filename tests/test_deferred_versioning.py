@@ -0,0 +1,88 @@
+import pytest
+
+from app.core.config import settings
+from app.core.versioning import expand_pending
+from app.db.models import EventChangeLog, EventVersion, PendingChange
+from app.db.session import SessionLocal
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "DeferredEvent",
+        "description": "Desc",
+        "start_time": "2025-12-01T09:00:00Z",
+        "end_time": "2025-12-01T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+@pytest.fixture
+def deferred(monkeypatch):
+    monkeypatch.setattr(settings, "DEFERRED_VERSIONING", True)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def counts(db, event_id):
+    db.expire_all()
+    return (
+        db.query(PendingChange).filter(PendingChange.event_id == event_id).count(),
+        db.query(EventVersion).filter(EventVersion.event_id == event_id).count(),
+    )
+
+def test_update_defers_versioning_until_changelog_is_read(client, auth_headers, deferred, db):
+    event_id = create_event_and_get_id(client, auth_headers)
+    resp = client.put(f"/api/events/{event_id}", json={"title": "Renamed"}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "Renamed"
+    assert resp.json()["version_number"] == 2
+    resp = client.put(f"/api/events/{event_id}", json={"location": "Elsewhere"}, headers=auth_headers)
+    assert resp.json()["version_number"] == 3
+    assert counts(db, event_id) == (2, 1)
+    assert client.get(f"/api/events/{event_id}", headers=auth_headers).json()["version_number"] == 3
+
+    changelog = client.get(f"/api/events/{event_id}/changelog", headers=auth_headers).json()
+    assert {(c["field_name"], c["old_value"], c["new_value"]) for c in changelog} == {
+        ("title", "DeferredEvent", "Renamed"),
+        ("location", "Test", "Elsewhere"),
+    }
+    assert counts(db, event_id) == (0, 3)
+    version = client.get(f"/api/events/{event_id}/history/3", headers=auth_headers).json()
+    assert version["data"]["title"] == "Renamed"
+    assert version["data"]["location"] == "Elsewhere"
+
+def test_background_expansion(client, auth_headers, deferred, db):
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"description": "Changed"}, headers=auth_headers)
+    assert counts(db, event_id) == (1, 1)
+    while expand_pending(db, batch_size=10):
+        pass
+    assert counts(db, event_id) == (0, 2)
+    [entry] = db.query(EventChangeLog).filter(EventChangeLog.event_id == event_id).all()
+    assert (entry.field_name, entry.old_value, entry.new_value) == ("description", "Desc", "Changed")
+
+def test_changelog_old_values_match_inline_versioning(client, auth_headers, monkeypatch):
+    changelogs = {}
+    for deferred_mode in (False, True):
+        monkeypatch.setattr(settings, "DEFERRED_VERSIONING", deferred_mode)
+        event_id = create_event_and_get_id(client, auth_headers)
+        client.put(f"/api/events/{event_id}", json={"title": "Renamed", "location": "Test"}, headers=auth_headers)
+        resp = client.get(f"/api/events/{event_id}/changelog", headers=auth_headers)
+        changelogs[deferred_mode] = [(c["field_name"], c["old_value"], c["new_value"]) for c in resp.json()]
+        client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    assert changelogs[False] == changelogs[True] == [("title", "DeferredEvent", "Renamed")]
+
+def test_deferred_rollback_returns_new_version_number(client, auth_headers, deferred, db):
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"location": "Elsewhere"}, headers=auth_headers)
+    resp = client.post(f"/api/events/{event_id}/rollback/1", headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["version_number"] == 3
+    assert resp.json()["location"] == "Test"
@@ -65,4 +65,23 @@ def test_event_not_found(client, auth_headers):
     resp = client.put("/api/events/99999", json={"title": "X"}, headers=auth_headers)
     assert resp.status_code in (403, 404)
     resp = client.delete("/api/events/99999", headers=auth_headers)
-    assert resp.status_code in (403, 404) 
\ No newline at end of file
+    assert resp.status_code in (403, 404)
+
+def test_list_events_by_recurrence(client, auth_headers):
+    patterns = {"weekly": {"frequency": "weekly"}, "daily": {"freq": "DAILY"}, "none": {"repeat": "none"}}
+    ids = {}
+    for day, (name, pattern) in enumerate(patterns.items(), start=1):
+        resp = client.post("/api/events", json={
+            "title": f"Recurring {name}",
+            "description": "Desc",
+            "start_time": f"2026-06-{day:02d}T09:00:00Z",
+            "end_time": f"2026-06-{day:02d}T10:00:00Z",
+            "is_recurring": name != "none",
+            "recurrence_pattern": pattern,
+        }, headers=auth_headers)
+        ids[name] = resp.json()["id"]
+    weekly = client.get("/api/events", params={"recurrence": "weekly"}, headers=auth_headers).json()
+    assert [e["id"] for e in weekly] == [ids["weekly"]]
+    daily = client.get("/api/events", params={"recurrence": "daily", "fields": "id,title"}, headers=auth_headers).json()
+    assert daily == [{"id": ids["daily"], "title": "Recurring daily"}]
+    assert client.get("/api/events", params={"recurrence": "none"}, headers=auth_headers).status_code == 400
@@ -0,0 +1,61 @@
+from app.core.ical import fold_line
+from app.core.recurrence import parse_pattern, to_rrule
+
+
+def create_event(client, auth_headers, **overrides):
+    event_data = {
+        "title": "ExportEvent",
+        "description": "Line one\nLine two; with, punctuation",
+        "start_time": "2025-08-01T09:00:00Z",
+        "end_time": "2025-08-01T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    event_data.update(overrides)
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def test_export_calendar(client, auth_headers):
+    single_id = create_event(client, auth_headers)
+    weekly_id = create_event(
+        client, auth_headers, title="Standup", start_time="2025-08-04T09:00:00Z", end_time="2025-08-04T09:15:00Z",
+        is_recurring=True, recurrence_pattern={"frequency": "weekly", "by_day": ["monday", "wed"], "count": 10},
+    )
+    resp = client.get("/api/events/export.ics", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/calendar")
+    body = resp.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n")
+    assert body.endswith("END:VCALENDAR\r\n")
+    assert f"UID:event-{single_id}@neofi" in body
+    assert "DESCRIPTION:Line one\\nLine two\\; with\\, punctuation" in body
+    assert f"UID:event-{weekly_id}@neofi" in body
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10" in body
+
+def test_export_time_window(client, auth_headers):
+    create_event(client, auth_headers, title="Early", start_time="2025-09-01T09:00:00Z", end_time="2025-09-01T10:00:00Z")
+    create_event(client, auth_headers, title="Late", start_time="2025-09-10T09:00:00Z", end_time="2025-09-10T10:00:00Z")
+    resp = client.get(
+        "/api/events/export.ics",
+        params={"start": "2025-09-05T00:00:00Z", "end": "2025-09-20T00:00:00Z"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+    assert "SUMMARY:Late" in resp.text
+    assert "SUMMARY:Early" not in resp.text
+    resp = client.get(
+        "/api/events/export.ics",
+        params={"start": "2025-09-20T00:00:00Z", "end": "2025-09-05T00:00:00Z"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 400
+
+def test_fold_and_rrule_helpers():
+    folded = fold_line("DESCRIPTION:" + "é" * 80)
+    assert all(len(line.encode()) <= 75 for line in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "") == "DESCRIPTION:" + "é" * 80 + "\r\n"
+    assert parse_pattern({"repeat": "none"}) is None
+    rule = parse_pattern({"freq": "daily", "interval": 2, "until": "2025-12-31T00:00:00Z"})
+    assert to_rrule(rule) == "FREQ=DAILY;INTERVAL=2;UNTIL=20251231T000000Z"
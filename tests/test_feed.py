@@ -0,0 +1,51 @@
+import threading
+import time
+
+from app.core.pubsub import event_channel, get_broker
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "FeedEvent",
+        "description": "Desc",
+        "start_time": "2025-06-22T21:40:47.551Z",
+        "end_time": "2025-06-22T22:40:47.551Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def wait_for_subscriber(event_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while get_broker().subscriber_count(event_channel(event_id)) == 0:
+        assert time.monotonic() < deadline, "feed never subscribed"
+        time.sleep(0.01)
+
+def test_feed_streams_changes_until_event_is_deleted(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    result = {}
+
+    def listen():
+        result["resp"] = client.get(f"/api/events/{event_id}/feed", headers=auth_headers)
+
+    listener = threading.Thread(target=listen)
+    listener.start()
+    wait_for_subscriber(event_id)
+    client.put(f"/api/events/{event_id}", json={"title": "Live"}, headers=auth_headers)
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    listener.join(timeout=10)
+    resp = result["resp"]
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    body = resp.text
+    assert "event: changelog" in body
+    assert '"new_value": "Live"' in body
+    assert "event: event_deleted" in body
+    assert get_broker().subscriber_count(event_channel(event_id)) == 0
+
+def test_feed_requires_permission(client, auth_headers):
+    resp = client.get("/api/events/99999/feed", headers=auth_headers)
+    assert resp.status_code in (403, 404)
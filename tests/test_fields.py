@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.db.session import get_engine
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "SparseEvent",
+        "description": "Desc",
+        "start_time": "2026-02-01T09:00:00Z",
+        "end_time": "2026-02-01T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+@contextmanager
+def captured_sql():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+def test_list_events_with_fields(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    with captured_sql() as statements:
+        resp = client.get("/api/events", params={"fields": "title,start_time,end_time"}, headers=auth_headers)
+    assert resp.status_code == 200
+    [row] = [e for e in resp.json() if e["id"] == event_id]
+    assert row == {"id": event_id, "title": "SparseEvent", "start_time": row["start_time"], "end_time": row["end_time"]}
+    event_selects = [s for s in statements if "FROM events" in s and "events.title" in s]
+    assert event_selects
+    assert not any("events.description" in s or "events.recurrence_pattern" in s for s in event_selects)
+
+def test_get_event_with_fields(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    resp = client.get(f"/api/events/{event_id}", params={"fields": "title,version_number"}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"id": event_id, "title": "SparseEvent", "version_number": 1}
+
+def test_unknown_fields_are_rejected(client, auth_headers):
+    resp = client.get("/api/events", params={"fields": "title,secret"}, headers=auth_headers)
+    assert resp.status_code == 400
+    assert "secret" in resp.json()["detail"]
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+
+from app.core.scheduling import find_free_slots, merge
+
+
+def register(client):
+    unique = str(uuid.uuid4())[:8]
+    data = {"email": f"slots_{unique}@example.com", "username": f"slots_{unique}", "password": "slotspass"}
+    user_id = client.post("/api/auth/register", json=data).json()["id"]
+    resp = client.post("/api/auth/login", data={"username": data["email"], "password": data["password"]})
+    return user_id, {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+def create_event(client, headers, start, end, **extra):
+    event_data = {
+        "title": "Busy",
+        "description": "Desc",
+        "start_time": start,
+        "end_time": end,
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"},
+        **extra,
+    }
+    resp = client.post("/api/events", json=event_data, headers=headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def test_common_free_slots(client):
+    alice, alice_headers = register(client)
+    bob, bob_headers = register(client)
+    stranger, _ = register(client)
+    # 2026-04-06 is a Monday.
+    shared = create_event(client, alice_headers, "2026-04-06T09:00:00Z", "2026-04-06T10:00:00Z")
+    client.post(f"/api/events/{shared}/share", json={"user_id": bob, "role": "viewer"}, headers=alice_headers)
+    create_event(
+        client, bob_headers, "2026-03-02T12:00:00Z", "2026-03-02T13:00:00Z",
+        is_recurring=True, recurrence_pattern={"frequency": "weekly", "by_day": ["MO", "TU"]},
+    )
+    create_event(client, bob_headers, "2026-04-06T14:30:00Z", "2026-04-06T16:30:00Z")
+    query = {
+        "user_ids": [alice, bob],
+        "start": "2026-04-06T00:00:00Z",
+        "end": "2026-04-07T00:00:00Z",
+        "duration_minutes": 60,
+    }
+    resp = client.post("/api/events/free-slots", json=query, headers=alice_headers)
+    assert resp.status_code == 200, resp.text
+    assert [(s["start"][11:16], s["end"][11:16]) for s in resp.json()] == [("10:00", "12:00"), ("13:00", "14:30")]
+
+    resp = client.post("/api/events/free-slots", json={**query, "duration_minutes": 100}, headers=alice_headers)
+    assert [(s["start"][11:16], s["end"][11:16]) for s in resp.json()] == [("10:00", "12:00")]
+
+    resp = client.post("/api/events/free-slots", json={**query, "user_ids": [alice, stranger]}, headers=alice_headers)
+    assert resp.status_code == 403
+    resp = client.post("/api/events/free-slots", json={**query, "timezone": "Mars/Olympus"}, headers=alice_headers)
+    assert resp.status_code == 400
+    resp = client.post("/api/events/free-slots", json={**query, "end": "2026-05-08T00:00:00Z"}, headers=alice_headers)
+    assert resp.status_code == 400
+
+def test_deleted_shared_event_does_not_make_collaborators(client):
+    alice, alice_headers = register(client)
+    bob, _ = register(client)
+    shared = create_event(client, alice_headers, "2026-04-06T09:00:00Z", "2026-04-06T10:00:00Z")
+    client.post(f"/api/events/{shared}/share", json={"user_id": bob, "role": "viewer"}, headers=alice_headers)
+    query = {
+        "user_ids": [alice, bob],
+        "start": "2026-04-06T00:00:00Z",
+        "end": "2026-04-07T00:00:00Z",
+        "duration_minutes": 60,
+    }
+    assert client.post("/api/events/free-slots", json=query, headers=alice_headers).status_code == 200
+    assert client.delete(f"/api/events/{shared}", headers=alice_headers).status_code in (200, 204)
+    resp = client.post("/api/events/free-slots", json=query, headers=alice_headers)
+    assert resp.status_code == 403
+
+def test_working_hours_follow_timezone_and_weekdays():
+    start = datetime(2026, 4, 10, tzinfo=timezone.utc)  # Friday
+    slots = find_free_slots(
+        [], start, start + timedelta(days=3), timedelta(minutes=30),
+        day_start=time(9), day_end=time(17), tz="America/New_York",
+    )
+    assert slots == [{"start": datetime(2026, 4, 10, 13, tzinfo=timezone.utc), "end": datetime(2026, 4, 10, 21, tzinfo=timezone.utc)}]
+
+def test_recurrence_until_and_merge():
+    start = datetime(2026, 4, 6, tzinfo=timezone.utc)
+    daily = SimpleNamespace(
+        start_time=datetime(2026, 4, 1, 9), end_time=datetime(2026, 4, 1, 12),
+        is_recurring=True, recurrence_pattern={"frequency": "daily", "until": "2026-04-07T00:00:00Z"},
+    )
+    slots = find_free_slots([daily], start, start + timedelta(days=2), timedelta(hours=1))
+    assert [(s["start"].hour, s["end"].hour) for s in slots] == [(12, 17), (9, 17)]
+    assert merge([(10.0, 11.0), (9.0, 10.0), (9.0, 9.5), (12.0, 13.0)]) == [(9.0, 11.0), (12.0, 13.0)]
@@ -0,0 +1,157 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import idempotency
+from app.core.config import settings
+from app.db.models import Event, IdempotencyKey
+from app.db.session import SessionLocal
+
+EVENT = {
+    "title": "IdempotentEvent",
+    "description": "Desc",
+    "start_time": "2026-05-04T09:00:00Z",
+    "end_time": "2026-05-04T10:00:00Z",
+    "location": "Test",
+    "is_recurring": False,
+    "recurrence_pattern": {"repeat": "none"}
+}
+
+def with_key(auth_headers, key=None):
+    return {**auth_headers, "Idempotency-Key": key or str(uuid.uuid4())}
+
+def register(client):
+    unique = str(uuid.uuid4())[:8]
+    data = {"email": f"idem_{unique}@example.com", "username": f"idem_{unique}", "password": "idempass"}
+    return client.post("/api/auth/register", json=data).json()["id"]
+
+def owned_events(user_id):
+    db = SessionLocal()
+    try:
+        return db.query(Event).filter(Event.owner_id == user_id).count()
+    finally:
+        db.close()
+
+def test_retried_create_returns_first_event(client, auth_headers):
+    headers = with_key(auth_headers)
+    first = client.post("/api/events", json=EVENT, headers=headers)
+    assert first.status_code == 200
+    # A second run would be rejected as overlapping the first event.
+    idempotency.get_cache().clear()
+    retry = client.post("/api/events", json=EVENT, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert owned_events(first.json()["owner_id"]) == 1
+
+    again = client.post("/api/events", json=EVENT, headers=headers)
+    assert again.json()["id"] == first.json()["id"]
+
+def test_retried_share_returns_first_response(client, auth_headers):
+    event_id = client.post("/api/events", json=EVENT, headers=auth_headers).json()["id"]
+    user_id = register(client)
+    headers = with_key(auth_headers)
+    first = client.post(f"/api/events/{event_id}/share", json={"user_id": user_id, "role": "viewer"}, headers=headers)
+    assert first.status_code == 200
+    retry = client.post(f"/api/events/{event_id}/share", json={"user_id": user_id, "role": "viewer"}, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    # Without the key the endpoint runs again.
+    plain = client.post(f"/api/events/{event_id}/share", json={"user_id": user_id, "role": "viewer"}, headers=auth_headers)
+    assert plain.status_code == 400
+
+def test_key_reused_for_different_request(client, auth_headers):
+    headers = with_key(auth_headers)
+    assert client.post("/api/events", json=EVENT, headers=headers).status_code == 200
+    resp = client.post("/api/events", json={**EVENT, "title": "Other"}, headers=headers)
+    assert resp.status_code == 422
+
+def test_failed_request_can_be_retried(client, auth_headers):
+    client.post("/api/events", json=EVENT, headers=auth_headers)
+    headers = with_key(auth_headers)
+    # Conflicts with the event above, so nothing is stored for the key.
+    assert client.post("/api/events", json=EVENT, headers=headers).status_code == 400
+    moved = {**EVENT, "start_time": "2026-05-05T09:00:00Z", "end_time": "2026-05-05T10:00:00Z"}
+    assert client.post("/api/events", json=moved, headers=headers).status_code == 200
+
+def test_expired_key_runs_again(client, auth_headers):
+    key = str(uuid.uuid4())
+    headers = with_key(auth_headers, key)
+    first = client.post("/api/events", json=EVENT, headers=headers).json()
+    idempotency.get_cache().clear()
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update(
+            {IdempotencyKey.expires_at: datetime.now(timezone.utc) - timedelta(minutes=1)}
+        )
+        db.commit()
+        assert idempotency.purge_expired(db) >= 1
+        assert db.get(IdempotencyKey, (first["owner_id"], key)) is None
+    finally:
+        db.close()
+    client.delete(f"/api/events/{first['id']}", headers=auth_headers)
+    retry = client.post("/api/events", json=EVENT, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json()["id"] != first["id"]
+
+def test_abandoned_key_is_not_rerun_after_commit(client, auth_headers):
+    key = str(uuid.uuid4())
+    headers = with_key(auth_headers, key)
+    first = client.post("/api/events", json=EVENT, headers=headers).json()
+    idempotency.get_cache().clear()
+    db = SessionLocal()
+    try:
+        row = db.get(IdempotencyKey, (first["owner_id"], key))
+        assert row.applied_at is not None
+        # As if the worker died between the endpoint's commit and complete().
+        row.status_code = None
+        row.response = None
+        row.created_at = datetime.now(timezone.utc) - idempotency.ABANDONED_AFTER - timedelta(minutes=1)
+        db.commit()
+    finally:
+        db.close()
+    client.delete(f"/api/events/{first['id']}", headers=auth_headers)
+    retry = client.post("/api/events", json=EVENT, headers=headers)
+    assert retry.status_code == 409
+    assert owned_events(first["owner_id"]) == 1
+
+def test_takeover_fences_out_the_abandoned_request(client):
+    user_id = register(client)
+    key = str(uuid.uuid4())
+    stale = datetime.now(timezone.utc) - idempotency.ABANDONED_AFTER - timedelta(minutes=1)
+    idempotency.begin(user_id, key, "create_event", "f" * 64)
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update({IdempotencyKey.created_at: stale})
+        db.commit()
+    finally:
+        db.close()
+    retry = idempotency.begin(user_id, key, "create_event", "f" * 64)
+    assert isinstance(retry, idempotency.Claim)
+    # The abandoned request wakes up and tries to commit.
+    db = SessionLocal()
+    db.info["idempotency_claim"] = idempotency.Claim(user_id, key, stale)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            db.commit()
+        assert exc.value.status_code == 409
+    finally:
+        db.close()
+    idempotency.release(retry)
+    db = SessionLocal()
+    try:
+        assert db.get(IdempotencyKey, (user_id, key)) is None
+    finally:
+        db.close()
+
+def test_deferred_rollback_to_missing_version_can_be_retried(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "DEFERRED_VERSIONING", True)
+    moved = {**EVENT, "start_time": "2026-05-07T09:00:00Z", "end_time": "2026-05-07T10:00:00Z"}
+    event_id = client.post("/api/events", json=moved, headers=auth_headers).json()["id"]
+    # Leaves a pending change, which the rollback expands first.
+    client.put(f"/api/events/{event_id}", json={"title": "Pending"}, headers=auth_headers)
+    headers = with_key(auth_headers)
+    assert client.post(f"/api/events/{event_id}/rollback/99", headers=headers).status_code == 404
+    assert client.post(f"/api/events/{event_id}/rollback/99", headers=headers).status_code == 404
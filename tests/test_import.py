@@ -0,0 +1,74 @@
+from app.core.importer import iter_csv_records, validate
+
+
+ICS = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+UID:1@example.com\r
+SUMMARY:Imported\\, weekly\r
+DTSTART:20301001T090000Z\r
+DTEND:20301001T100000Z\r
+RRULE:FREQ=WEEKLY;BYDAY=MO,TU;COUNT=4\r
+DESCRIPTION:Folded descr\r
+ iption\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:All day\r
+DTSTART;VALUE=DATE:20301002\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Broken\r
+DTSTART:not-a-date\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+CSV = """title,description,start_time,end_time,location,is_recurring,recurrence_pattern
+Row one,Desc,2030-11-01T09:00:00Z,2030-11-01T10:00:00Z,Room 1,false,
+Row two,,2030-11-02T09:00:00Z,2030-11-02T10:00:00Z,,true,"{""frequency"": ""daily"", ""count"": 3}"
+Bad row,Desc,2030-11-03T09:00:00Z,2030-11-03T08:00:00Z,,,
+Missing,Desc,,2030-11-04T10:00:00Z,,,
+"""
+
+def upload(client, auth_headers, name, content):
+    resp = client.post("/api/events/import", files={"file": (name, content)}, headers=auth_headers)
+    assert resp.status_code == 202, resp.text
+    # TestClient runs background tasks before returning, so the job is done.
+    job = client.get(f"/api/events/import/{resp.json()['id']}", headers=auth_headers).json()
+    return job
+
+def test_import_ics(client, auth_headers):
+    job = upload(client, auth_headers, "calendar.ics", ICS)
+    assert job["status"] == "completed"
+    assert (job["processed_rows"], job["imported_rows"], job["failed_rows"]) == (3, 2, 1)
+    assert job["errors"][0]["row"] == 16
+    events = {e["title"]: e for e in client.get("/api/events", headers=auth_headers).json()}
+    weekly = events["Imported, weekly"]
+    assert weekly["description"] == "Folded description"
+    assert weekly["recurrence_pattern"] == {"frequency": "weekly", "by_day": ["MO", "TU"], "count": 4}
+    assert weekly["version_number"] == 1
+    assert events["All day"]["end_time"].startswith("2030-10-03T00:00:00")
+    resp = client.get(f"/api/events/{weekly['id']}/history/1", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["data"]["title"] == "Imported, weekly"
+
+def test_import_csv_reports_row_errors(client, auth_headers):
+    job = upload(client, auth_headers, "calendar.csv", CSV)
+    assert job["status"] == "completed"
+    assert job["imported_rows"] == 2
+    assert [e["row"] for e in job["errors"]] == [4, 5]
+    assert "end_time is before start_time" in job["errors"][0]["error"]
+    titles = {e["title"] for e in client.get("/api/events", headers=auth_headers).json()}
+    assert {"Row one", "Row two"} <= titles
+
+def test_import_rejects_unknown_format_and_foreign_jobs(client, auth_headers, user_data):
+    resp = client.post("/api/events/import", files={"file": ("cal.txt", "x")}, headers=auth_headers)
+    assert resp.status_code == 400
+    resp = client.get("/api/events/import/99999", headers=auth_headers)
+    assert resp.status_code == 404
+
+def test_csv_records_accept_rrule_column():
+    rows = list(iter_csv_records(["title,start_time,end_time,rrule\n", "A,2030-01-01T00:00:00Z,2030-01-01T01:00:00Z,FREQ=DAILY;INTERVAL=2\n"]))
+    event = validate(rows[0][1])
+    assert event.is_recurring
+    assert event.recurrence_pattern == {"frequency": "daily", "interval": 2}
@@ -0,0 +1,42 @@
+import threading
+
+from app.core.metrics import Histogram, Counter
+
+
+def test_metrics_endpoint_reports_routes_and_db(client, auth_headers):
+    client.get("/api/events", headers=auth_headers)
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    body = resp.text
+    assert 'http_requests_total{method="GET",route="/api/events",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/events",le="+Inf"}' in body
+    assert "http_requests_in_progress" in body
+    assert 'db_query_duration_seconds_count{operation="select"}' in body
+    assert "db_pool_checked_out" in body
+
+def test_unmatched_routes_share_one_series(client):
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    body = client.get("/metrics").text
+    assert 'route="<unmatched>",status="404"' in body
+    assert "/no/such/path" not in body
+
+def test_counters_and_histograms_sum_across_threads():
+    counter = Counter("test_counter_total", "test")
+    histogram = Histogram("test_latency_seconds", "test", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counter.labels().value == 4000
+    lines = list(histogram.samples())
+    assert 'test_latency_seconds_bucket{le="0.1"} 0' in lines
+    assert 'test_latency_seconds_bucket{le="1"} 4000' in lines
+    assert "test_latency_seconds_count 4000" in lines
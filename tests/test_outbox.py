@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func
+
+from app.core.outbox import FileSink, claim_batch, dispatch_once, purge_dispatched
+from app.db.models import OutboxMessage
+from app.db.session import SessionLocal
+
+
+class FailingSink:
+    def send(self, messages):
+        raise RuntimeError("sink down")
+
+
+def create_event_and_get_id(client, auth_headers):
+    event_data = {
+        "title": "OutboxEvent",
+        "description": "Desc",
+        "start_time": "2025-07-22T21:40:47.551Z",
+        "end_time": "2025-07-22T22:40:47.551Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def delivered_topics(path, event_id, after_id):
+    if not path.exists():
+        return []
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    return [m["topic"] for m in lines if m["payload"].get("event_id") == event_id and m["id"] > after_id]
+
+def test_changes_are_delivered_in_order_with_retries(client, auth_headers, db, tmp_path):
+    sink_path = tmp_path / "sink.jsonl"
+    sink = FileSink(str(sink_path))
+    # SQLite may reuse the ids of deleted events, so only look at new messages.
+    after_id = db.query(func.max(OutboxMessage.id)).scalar() or 0
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Outboxed"}, headers=auth_headers)
+
+    assert dispatch_once(db, FailingSink(), batch_size=10000) == 0
+    failed = db.query(OutboxMessage).filter(OutboxMessage.event_id == event_id, OutboxMessage.id > after_id).all()
+    assert [m.attempts for m in failed] == [1, 1]
+    assert all(m.dispatched_at is None for m in failed)
+
+    # A newer message for the same event must wait for the backed-off ones.
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    dispatch_once(db, sink, batch_size=10000)
+    assert delivered_topics(sink_path, event_id, after_id) == []
+
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.query(OutboxMessage).filter(OutboxMessage.dispatched_at.is_(None)).update({"available_at": past})
+    db.commit()
+    dispatch_once(db, sink, batch_size=10000)
+    assert delivered_topics(sink_path, event_id, after_id) == ["event_created", "changelog", "event_deleted"]
+    pending = db.query(OutboxMessage).filter(OutboxMessage.id > after_id, OutboxMessage.dispatched_at.is_(None)).count()
+    assert pending == 0
+
+def test_outbox_metrics_are_exposed(client):
+    body = client.get("/metrics").text
+    assert "outbox_lag_seconds" in body
+    assert "outbox_messages_dispatched_total" in body
+
+def test_claims_take_events_whole_and_in_order(client, auth_headers, db):
+    after_id = db.query(func.max(OutboxMessage.id)).scalar() or 0
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Claimed"}, headers=auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Claimed again"}, headers=auth_headers)
+    mine = OutboxMessage.id > after_id
+    db.query(OutboxMessage).filter(OutboxMessage.dispatched_at.is_(None), ~mine).update({"dispatched_at": datetime.now(timezone.utc)})
+    db.commit()
+
+    first = claim_batch(db, batch_size=2, lease_seconds=60)
+    assert [m["topic"] for m in first] == ["event_created", "changelog"]
+    # The last message waits behind the leased ones instead of going to another dispatcher.
+    assert claim_batch(db, batch_size=10, lease_seconds=60) == []
+
+def test_delivered_messages_are_purged_after_retention(client, auth_headers, db, tmp_path):
+    after_id = db.query(func.max(OutboxMessage.id)).scalar() or 0
+    event_id = create_event_and_get_id(client, auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Outboxed"}, headers=auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Outboxed again"}, headers=auth_headers)
+    db.query(OutboxMessage).filter(OutboxMessage.dispatched_at.is_(None)).update(
+        {"available_at": datetime.now(timezone.utc) - timedelta(seconds=1)}
+    )
+    db.commit()
+    while dispatch_once(db, FileSink(str(tmp_path / "sink.jsonl")), batch_size=10000):
+        pass
+    ours = db.query(OutboxMessage).filter(OutboxMessage.event_id == event_id, OutboxMessage.id > after_id)
+    assert ours.count() == 3
+    # Still within retention.
+    purge_dispatched(db, batch_size=1)
+    assert ours.count() == 3
+    # Undelivered messages are kept however old they are.
+    client.put(f"/api/events/{event_id}", json={"title": "Not delivered"}, headers=auth_headers)
+    purge_dispatched(db, batch_size=1, now=datetime.now(timezone.utc) + timedelta(days=2))
+    assert [m.dispatched_at for m in ours] == [None]
@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_profile_store
+from app.core.config import settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware
+
+
+def test_profiled_request_is_stored_and_ring_buffer_is_bounded(client, tmp_path, auth_headers):
+    app = client.app
+    store = ProfileStore(str(tmp_path), max_entries=2)
+    profiled = TestClient(ProfilingMiddleware(app, store=store, token="secret"))
+    resp = profiled.get("/api/events", headers=auth_headers)
+    assert resp.status_code == 200
+    assert "x-profile-id" not in resp.headers
+    ids = []
+    for _ in range(3):
+        resp = profiled.get("/api/events", headers={**auth_headers, "X-Profile": "secret"})
+        assert resp.status_code == 200
+        ids.append(resp.headers["x-profile-id"])
+    entries = store.list()
+    assert [e["id"] for e in entries] == ids[:0:-1]
+    assert entries[0]["route"] == "/api/events"
+    assert "list_events" in store.report(ids[-1])
+
+def test_admin_profile_endpoints(client, tmp_path, monkeypatch):
+    app = client.app
+    store = ProfileStore(str(tmp_path), max_entries=5)
+    app.dependency_overrides[get_profile_store] = lambda: store
+    try:
+        resp = client.get("/api/admin/profiles")
+        assert resp.status_code == 404
+        monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+        resp = client.get("/api/admin/profiles", headers={"X-Profile-Token": "wrong"})
+        assert resp.status_code == 403
+        TestClient(ProfilingMiddleware(app, store=store, sample_rate=1.0)).get("/")
+        resp = client.get("/api/admin/profiles", headers={"X-Profile-Token": "secret"})
+        assert resp.status_code == 200
+        profile_id = resp.json()[0]["id"]
+        resp = client.get(f"/api/admin/profiles/{profile_id}", headers={"X-Profile-Token": "secret"})
+        assert resp.status_code == 200
+        assert resp.json()["reason"] == "sampled"
+        resp = client.get("/api/admin/profiles/missing", headers={"X-Profile-Token": "secret"})
+        assert resp.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,56 @@
+import pytest
+
+from app.core import ratelimit
+from app.core.config import settings
+from app.core.ratelimit import MemoryBuckets, Rate, parse_rate
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def configure(**rates):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+        monkeypatch.setattr(settings, "RATE_LIMITS", rates)
+        ratelimit.get_limiter.cache_clear()
+    yield configure
+    ratelimit.get_limiter.cache_clear()
+
+def test_login_is_limited_before_any_work(client, user_data, limits, monkeypatch):
+    client.post("/api/auth/register", json=user_data)
+    limits(login="2/minute")
+    hashed = []
+    monkeypatch.setattr("app.api.v1.endpoints.auth.verify_password", lambda *args: hashed.append(args) or False)
+    form = {"username": user_data["email"], "password": "wrong"}
+    assert client.post("/api/auth/login", data=form).status_code == 401
+    assert client.post("/api/auth/login", data=form).status_code == 401
+    resp = client.post("/api/auth/login", data=form)
+    assert resp.status_code == 429
+    assert 1 <= int(resp.headers["retry-after"]) <= 30
+    assert len(hashed) == 2
+    assert "rate_limited_requests_total{route=\"login\"}" in client.get("/metrics").text
+
+def test_authenticated_writes_are_limited_per_user(client, auth_headers, limits):
+    limits(update_event="1/hour")
+    resp = client.put("/api/events/99999", json={"title": "x"}, headers=auth_headers)
+    assert resp.status_code == 404
+    resp = client.put("/api/events/99999", json={"title": "x"}, headers=auth_headers)
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) > 3000
+    # Routes without a configured limit are not affected.
+    assert client.get("/api/events", headers=auth_headers).status_code == 200
+
+def test_token_bucket_refills():
+    buckets = MemoryBuckets(max_keys=2)
+    rate = Rate(capacity=2, refill=1000.0)
+    assert buckets.take("a", rate) == 0
+    assert buckets.take("a", rate) == 0
+    assert 0 < buckets.take("a", Rate(capacity=2, refill=0.5)) <= 2
+    buckets.take("b", rate)
+    buckets.take("c", rate)
+    assert "a" not in buckets._buckets
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == Rate(10, 10 / 60)
+    assert parse_rate("5/seconds") == Rate(5, 5)
+    assert parse_rate("3/30") == Rate(3, 0.1)
+    with pytest.raises(ValueError):
+        parse_rate("lots")
@@ -0,0 +1,133 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db import session
+from app.db.base_class import Base
+from app.core.versioning import flush_event
+from app.db.models import PendingChange, User
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, username) VALUES (-1, 'replica@example.com', 'replica')"))
+    pool = session.ReplicaPool([engine], retry_after=60)
+    monkeypatch.setattr(session, "_replicas", pool)
+    monkeypatch.setattr(settings, "REPLICA_STICKY_SECONDS", 60)
+    return pool
+
+def make_session(read_only, user_id=None):
+    db = session.SessionLocal()
+    db.info["read_only"] = read_only
+    db.info["user_id"] = user_id
+    return db
+
+def test_read_only_sessions_use_replica(replica):
+    db = make_session(read_only=True, user_id=-100)
+    try:
+        assert db.get_bind() is replica.engines[0]
+        assert db.query(User).filter(User.id == -1).first() is not None
+    finally:
+        db.close()
+    db = make_session(read_only=False)
+    try:
+        assert db.get_bind() is session.get_engine()
+    finally:
+        db.close()
+
+def test_reads_after_write_stick_to_primary(replica):
+    user_id = -200
+    db = make_session(read_only=False, user_id=user_id)
+    try:
+        db.add(User(email="sticky_replica@example.com", username="sticky_replica"))
+        db.commit()
+    finally:
+        db.close()
+    db = make_session(read_only=True, user_id=user_id)
+    try:
+        assert db.get_bind() is session.get_engine()
+    finally:
+        db.close()
+    db = make_session(read_only=True, user_id=-201)
+    try:
+        assert db.get_bind() is replica.engines[0]
+    finally:
+        db.close()
+
+def test_unreachable_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    broken = create_engine(f"sqlite:///{tmp_path}/missing/replica.db")
+    pool = session.ReplicaPool([broken], retry_after=60)
+    monkeypatch.setattr(session, "_replicas", pool)
+    db = make_session(read_only=True, user_id=-300)
+    try:
+        with pytest.raises(Exception):
+            db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+    assert pool.choose() is None
+    db = make_session(read_only=True, user_id=-300)
+    try:
+        assert db.get_bind() is session.get_engine()
+    finally:
+        db.close()
+
+def test_replicas_round_robin(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path}/r{i}.db") for i in range(2)]
+    pool = session.ReplicaPool(engines, retry_after=60)
+    assert [pool.choose() for _ in range(4)] == engines * 2
+
+def test_session_keeps_its_replica(tmp_path, monkeypatch):
+    engines = [create_engine(f"sqlite:///{tmp_path}/r{i}.db") for i in range(2)]
+    monkeypatch.setattr(session, "_replicas", session.ReplicaPool(engines, retry_after=60))
+    db = make_session(read_only=True, user_id=-400)
+    try:
+        assert len({db.get_bind() for _ in range(4)}) == 1
+    finally:
+        db.close()
+
+def test_recent_writes_can_be_shared(monkeypatch):
+    class FakeRedis:
+        def __init__(self):
+            self.keys = {}
+
+        def set(self, key, value, px):
+            self.keys[key] = value
+
+        def exists(self, key):
+            return int(key in self.keys)
+
+    shared = session.RedisRecentWrites.__new__(session.RedisRecentWrites)
+    shared._redis = FakeRedis()
+    monkeypatch.setattr(session, "_recent_writes", shared)
+    shared.record(-500)
+    assert session.recently_wrote(-500)
+    assert not session.recently_wrote(-501)
+
+def test_flush_checks_pending_changes_on_primary(client, auth_headers, replica, monkeypatch):
+    monkeypatch.setattr(settings, "DEFERRED_VERSIONING", True)
+    event = {
+        "title": "LaggingReplica",
+        "description": "Desc",
+        "start_time": "2025-12-03T09:00:00Z",
+        "end_time": "2025-12-03T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    event_id = client.post("/api/events", json=event, headers=auth_headers).json()["id"]
+    client.put(f"/api/events/{event_id}", json={"title": "Pending"}, headers=auth_headers)
+    # A collaborator who has not written anything reads from the replica,
+    # which has none of these rows yet.
+    db = make_session(read_only=True, user_id=-300)
+    try:
+        flush_event(db, event_id)
+    finally:
+        db.close()
+    db = make_session(read_only=False)
+    try:
+        assert db.query(PendingChange).filter(PendingChange.event_id == event_id).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,37 @@
+import os
+
+from app.core.config import settings
+from app.db import session
+from app.server import build_options
+
+
+def test_forked_child_builds_its_own_engine():
+    parent_engine = session.get_engine()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fresh = session._engine is None and session.get_engine() is not parent_engine
+            os.write(write_fd, b"1" if fresh else b"0")
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    assert session.get_engine() is parent_engine
+
+def test_pool_is_sized_from_connection_budget(monkeypatch):
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 40)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    options = session.pool_options("postgresql://localhost/neofi")
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 0
+    assert session.pool_options("sqlite:///./test.db") == {}
+
+def test_server_options_enable_graceful_recycling(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", settings.WEB_CONCURRENCY)
+    options = build_options(workers=3, bind="127.0.0.1:9000")
+    assert options["workers"] == 3
+    assert options["preload_app"] is True
+    assert options["max_requests"] > 0
+    assert settings.WEB_CONCURRENCY == 3
@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app import cli
+from app.core import purge
+from app.db.models import Event, EventChangeLog, EventPermission, EventVersion, UserEventAccess
+from app.db.session import SessionLocal, get_engine
+
+
+def create_event_and_get_id(client, auth_headers, day=1):
+    event_data = {
+        "title": "SoftDeleteEvent",
+        "description": "Desc",
+        "start_time": f"2025-12-{day:02d}T09:00:00Z",
+        "end_time": f"2025-12-{day:02d}T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def register(client):
+    unique = str(uuid.uuid4())[:8]
+    data = {"email": f"soft_{unique}@example.com", "username": f"soft_{unique}", "password": "softpass"}
+    return client.post("/api/auth/register", json=data).json()["id"]
+
+def age_deletion(event_id, hours):
+    db = SessionLocal()
+    try:
+        db.query(Event).filter(Event.id == event_id).update(
+            {Event.deleted_at: datetime.now(timezone.utc) - timedelta(hours=hours)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def test_delete_hides_event_until_restored(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    resp = client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["deleted_at"] is not None
+
+    assert client.get(f"/api/events/{event_id}", headers=auth_headers).status_code == 404
+    assert event_id not in {e["id"] for e in client.get("/api/events", params={"limit": 10000}, headers=auth_headers).json()}
+    assert client.get("/api/events/batch", params={"ids": event_id}, headers=auth_headers).json()[0]["status"] == "missing"
+    assert client.put(f"/api/events/{event_id}", json={"title": "Nope"}, headers=auth_headers).status_code == 404
+    # The slot is free again while the event is deleted.
+    other = create_event_and_get_id(client, auth_headers)
+
+    assert client.post(f"/api/events/{event_id}/restore", headers=auth_headers).status_code == 400
+    client.delete(f"/api/events/{other}", headers=auth_headers)
+    resp = client.post(f"/api/events/{event_id}/restore", headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["deleted_at"] is None
+    assert client.get(f"/api/events/{event_id}", headers=auth_headers).status_code == 200
+    assert client.post(f"/api/events/{event_id}/restore", headers=auth_headers).status_code == 404
+
+def test_restore_window(client, auth_headers, monkeypatch):
+    event_id = create_event_and_get_id(client, auth_headers, day=2)
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    age_deletion(event_id, hours=2)
+    monkeypatch.setattr(purge.settings, "SOFT_DELETE_RETENTION_HOURS", 1.0)
+    assert client.post(f"/api/events/{event_id}/restore", headers=auth_headers).status_code == 410
+
+def test_purge_in_batches(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers, day=3)
+    for i in range(4):
+        client.put(f"/api/events/{event_id}", json={"title": f"Edit {i}"}, headers=auth_headers)
+    client.post(f"/api/events/{event_id}/share", json={"user_id": register(client), "role": "viewer"}, headers=auth_headers)
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+
+    db = SessionLocal()
+    try:
+        assert purge.purge_deleted(db, batch_size=2) == 0  # still restorable
+        age_deletion(event_id, hours=purge.settings.SOFT_DELETE_RETENTION_HOURS + 1)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = get_engine()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            removed = purge.purge_event(db, event_id, batch_size=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        # 5 versions and 4 changelog rows, two per DELETE, then the event.
+        assert removed == 10
+        assert len([s for s in statements if s.lstrip().upper().startswith("DELETE")]) == 3 + 3 + 1
+        for model in (EventVersion, EventChangeLog, EventPermission, UserEventAccess):
+            assert db.query(model).filter(model.event_id == event_id).count() == 0
+        assert db.get(Event, event_id) is None
+    finally:
+        db.close()
+
+def test_purge_command(client, auth_headers, capsys):
+    event_id = create_event_and_get_id(client, auth_headers, day=4)
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    age_deletion(event_id, hours=purge.settings.SOFT_DELETE_RETENTION_HOURS + 1)
+    assert cli.main(["purge"]) == 0
+    assert "purged" in capsys.readouterr().out
+    assert client.post(f"/api/events/{event_id}/restore", headers=auth_headers).status_code == 404
+
+def test_purge_leaves_live_and_restorable_events_alone(client, auth_headers):
+    live = create_event_and_get_id(client, auth_headers, day=5)
+    client.put(f"/api/events/{live}", json={"title": "Edited"}, headers=auth_headers)
+    restorable = create_event_and_get_id(client, auth_headers, day=6)
+    client.delete(f"/api/events/{restorable}", headers=auth_headers)
+    db = SessionLocal()
+    try:
+        for event_id in (live, restorable):
+            assert purge.purge_event(db, event_id, batch_size=1) == 0
+            assert db.query(EventVersion).filter(EventVersion.event_id == event_id).count() >= 1
+            assert db.get(Event, event_id) is not None
+        assert db.query(EventChangeLog).filter(EventChangeLog.event_id == live).count() == 1
+    finally:
+        db.close()
+    assert client.post(f"/api/events/{restorable}/restore", headers=auth_headers).status_code == 200
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+# Importing app.main must stay cheap: it is what pre-fork masters, CLI tools
+# and test collection pay for before any app is built.
+IMPORT_BUDGET_SECONDS = 0.25
+# What a worker pays before serving: importing, create_app() and the first
+# request. Most of it is importing FastAPI and building the routes' models.
+STARTUP_BUDGET_SECONDS = 2.5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, env):
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+def test_import_needs_no_configuration_and_stays_within_budget():
+    env = {k: v for k, v in os.environ.items() if k not in ("SECRET_KEY", "ALGORITHM", "DATABASE_URL", "ACCESS_TOKEN_EXPIRE_MINUTES")}
+    elapsed, loaded = run_python(
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import app.main\n"
+        "print(time.perf_counter() - start)\n"
+        "print(any(m in sys.modules for m in ('fastapi', 'sqlalchemy', 'pydantic_settings')))",
+        env,
+    )
+    assert loaded == "False"
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+def test_cli_import_needs_no_configuration():
+    env = {k: v for k, v in os.environ.items() if k not in ("SECRET_KEY", "ALGORITHM", "DATABASE_URL", "ACCESS_TOKEN_EXPIRE_MINUTES")}
+    (imported,) = run_python("import app.cli\nprint('ok')", env)
+    assert imported == "ok"
+
+def test_create_app_does_not_create_engine():
+    (created,) = run_python(
+        "from app.main import create_app\n"
+        "from app.db import session\n"
+        "create_app()\n"
+        "print(session._engine is not None)",
+        dict(os.environ),
+    )
+    assert created == "False"
+
+def test_create_app_and_first_request_stay_within_budget():
+    import_and_create, first_request, status_code = run_python(
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "from app.main import create_app\n"
+        "app = create_app()\n"
+        "created = time.perf_counter()\n"
+        "from fastapi.testclient import TestClient\n"
+        "status_code = TestClient(app).get('/').status_code\n"
+        "print(created - start, time.perf_counter() - start, status_code)",
+        dict(os.environ),
+    )
+    assert status_code == "200"
+    assert float(first_request) < STARTUP_BUDGET_SECONDS, f"create_app() took {float(import_and_create):.2f}s"
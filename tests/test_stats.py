@@ -0,0 +1,104 @@
+import uuid
+
+from sqlalchemy import select
+
+from app import cli
+from app.core import stats
+from app.core.config import settings
+from app.db.models import EventStats
+from app.db.session import SessionLocal
+
+
+def create_event_and_get_id(client, auth_headers, day=1):
+    event_data = {
+        "title": "StatsEvent",
+        "description": "Desc",
+        "start_time": f"2026-07-{day:02d}T09:00:00Z",
+        "end_time": f"2026-07-{day:02d}T10:00:00Z",
+        "location": "Test",
+        "is_recurring": False,
+        "recurrence_pattern": {"repeat": "none"}
+    }
+    resp = client.post("/api/events", json=event_data, headers=auth_headers)
+    assert resp.status_code == 200, f"Event creation failed: {resp.status_code}, {resp.text}"
+    return resp.json()["id"]
+
+def register(client):
+    unique = str(uuid.uuid4())[:8]
+    data = {"email": f"stats_{unique}@example.com", "username": f"stats_{unique}", "password": "statspass"}
+    user_id = client.post("/api/auth/register", json=data).json()["id"]
+    resp = client.post("/api/auth/login", data={"username": data["email"], "password": data["password"]})
+    return user_id, {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+def expected(event_id):
+    db = SessionLocal()
+    try:
+        query = stats.expected_rows().subquery()
+        row = db.execute(select(query).where(query.c.id == event_id)).one()
+        return {"version_count": row[1], "collaborator_count": row[2], "last_modified_by": row[3]}
+    finally:
+        db.close()
+
+def summary(client, auth_headers, event_id):
+    resp = client.get(f"/api/events/{event_id}/summary", headers=auth_headers)
+    assert resp.status_code == 200
+    return resp.json()
+
+def test_summary_follows_writes(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    first = summary(client, auth_headers, event_id)
+    assert first["version_count"] == 1 and first["collaborator_count"] == 0
+    owner_id = first["last_modified_by"]
+
+    editor_id, editor_headers = register(client)
+    viewer_id, _ = register(client)
+    client.post(f"/api/events/{event_id}/share", json={"user_id": editor_id, "role": "editor"}, headers=auth_headers)
+    client.post(f"/api/events/{event_id}/share", json={"user_id": viewer_id, "role": "viewer"}, headers=auth_headers)
+    client.put(f"/api/events/{event_id}", json={"title": "Edited"}, headers=editor_headers)
+    resp = summary(client, editor_headers, event_id)
+    assert resp["version_count"] == 2
+    assert resp["collaborator_count"] == 2
+    assert resp["last_modified_by"] == editor_id
+
+    client.put(f"/api/events/{event_id}", json={"location": "Elsewhere"}, headers=auth_headers)
+    client.delete(f"/api/events/{event_id}/permissions/{viewer_id}", headers=auth_headers)
+    resp = summary(client, auth_headers, event_id)
+    assert resp["version_count"] == 3
+    assert resp["collaborator_count"] == 1
+    assert resp["last_modified_by"] == owner_id
+    assert {k: resp[k] for k in ("version_count", "collaborator_count", "last_modified_by")} == expected(event_id)
+
+def test_summary_counts_deferred_changes(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "DEFERRED_VERSIONING", True)
+    event_id = create_event_and_get_id(client, auth_headers, day=2)
+    client.put(f"/api/events/{event_id}", json={"title": "Deferred"}, headers=auth_headers)
+    assert summary(client, auth_headers, event_id)["version_count"] == 2
+    assert expected(event_id)["version_count"] == 2
+
+def test_list_events_with_summary_fields(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers, day=3)
+    resp = client.get("/api/events", params={"fields": "title,version_count,collaborator_count"}, headers=auth_headers)
+    assert resp.json() == [{"id": event_id, "title": "StatsEvent", "version_count": 1, "collaborator_count": 0}]
+
+def test_summary_forbidden_for_others(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers, day=4)
+    _, headers = register(client)
+    assert client.get(f"/api/events/{event_id}/summary", headers=headers).status_code == 403
+
+def test_check_and_rebuild(client, auth_headers, capsys):
+    event_id = create_event_and_get_id(client, auth_headers, day=5)
+    assert cli.main(["stats", "rebuild"]) == 0
+    db = SessionLocal()
+    try:
+        assert stats.check(db) == {"missing": 0, "unexpected": 0}
+        db.query(EventStats).filter(EventStats.event_id == event_id).update({EventStats.version_count: 7})
+        db.commit()
+        assert stats.check(db) == {"missing": 1, "unexpected": 1}
+    finally:
+        db.close()
+
+    assert cli.main(["stats", "check"]) == 1
+    assert cli.main(["stats", "rebuild"]) == 0
+    assert cli.main(["stats", "check"]) == 0
+    assert "0 missing, 0 unexpected" in capsys.readouterr().out
+    assert summary(client, auth_headers, event_id)["version_count"] == 1
@@ -40,4 +40,28 @@ def test_version_not_found(client, auth_headers):
     resp = client.get(f"/api/events/{event_id}/diff/1/99999", headers=auth_headers)
     assert resp.status_code == 404
     resp = client.post(f"/api/events/{event_id}/rollback/99999", headers=auth_headers)
-    assert resp.status_code == 404 
\ No newline at end of file
+    assert resp.status_code == 404
+
+def test_list_event_history_pages(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    for i in range(4):
+        client.put(f"/api/events/{event_id}", json={"title": f"Title {i}", "location": f"Room {i}"}, headers=auth_headers)
+    resp = client.get(f"/api/events/{event_id}/history", params={"limit": 2}, headers=auth_headers)
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [v["version_number"] for v in page["versions"]] == [5, 4]
+    assert sorted(page["versions"][0]["changed_fields"]) == ["location", "title"]
+    assert "data" not in page["versions"][0]
+
+    seen = [v["version_number"] for v in page["versions"]]
+    while page["next_cursor"] is not None:
+        page = client.get(f"/api/events/{event_id}/history", params={"limit": 2, "before": page["next_cursor"]}, headers=auth_headers).json()
+        seen += [v["version_number"] for v in page["versions"]]
+    assert seen == [5, 4, 3, 2, 1]
+    assert page["versions"][-1]["changed_fields"] == []
+    assert page["versions"][-1]["change_description"] == "Initial version"
+
+def test_list_event_history_limit(client, auth_headers):
+    event_id = create_event_and_get_id(client, auth_headers)
+    resp = client.get(f"/api/events/{event_id}/history", params={"limit": 0}, headers=auth_headers)
+    assert resp.status_code == 400